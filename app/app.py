@@ -1,70 +1,121 @@
 import sys
 import os
+import logging
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import streamlit as st
 import pandas as pd
 import base64
 import requests
-import re
-from backend.resume_parser import extract_resume_data
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from backend.resume_parser import extract_resume_data, clean_text
 from backend.job_parser import extract_job_description
-from backend.matcher import generate_match_score
+from backend.matcher import (generate_match_score, index_resumes, find_top_candidates, resume_index,
+                             rank_jobs_for_resume, job_library)
+from backend.batch_processor import DEFAULT_WORKERS
+from backend.batch_jobs import open_default_job_manager
 from auth.auth_handler import check_auth
 from utils.supabase_client import supabase
 from utils.gemini_helper import get_resume_suggestions, analyze_skill_gaps
+from backend.role_classifier import classify_resume_role
+from backend.write_behind import WriteBehindQueue
+from backend.result_cache import open_default_result_cache, content_key
+from backend.prediction_history import HISTORY_COLUMNS, HistorySync, make_filters, fetch_page, iter_rows
+from models.model import embedding_model
+from utils.metrics import registry as metrics_registry, stage_summary
 
-def classify_resume_role(resume_text):
-    """Simple rule-based resume classifier"""
-    resume_lower = resume_text.lower()
-    
-    # Define role keywords
-    role_keywords = {
-        'Software Developer': [
-            'python', 'javascript', 'java', 'programming', 'coding', 'software development',
-            'web development', 'react', 'node.js', 'html', 'css', 'git', 'github',
-            'api', 'database', 'sql', 'frontend', 'backend', 'fullstack'
-        ],
-        'Data Scientist': [
-            'machine learning', 'data science', 'python', 'pandas', 'numpy', 'tensorflow',
-            'pytorch', 'scikit-learn', 'data analysis', 'statistics', 'ml', 'ai',
-            'artificial intelligence', 'deep learning', 'neural networks'
-        ],
-        'Web Designer': [
-            'web design', 'ui/ux', 'photoshop', 'illustrator', 'figma', 'adobe',
-            'graphic design', 'css', 'html', 'responsive design', 'wireframes',
-            'prototyping', 'user interface', 'user experience'
-        ],
-        'Business Analyst': [
-            'business analysis', 'requirements', 'stakeholder', 'process improvement',
-            'business intelligence', 'analytics', 'reporting', 'excel', 'powerbi',
-            'tableau', 'project management', 'agile', 'scrum'
-        ],
-        'Marketing Specialist': [
-            'marketing', 'digital marketing', 'social media', 'seo', 'content marketing',
-            'advertising', 'campaigns', 'brand', 'promotion', 'market research',
-            'google analytics', 'facebook ads', 'email marketing'
-        ],
-        'Sales Representative': [
-            'sales', 'business development', 'client relations', 'crm', 'lead generation',
-            'negotiation', 'revenue', 'targets', 'customer service', 'account management',
-            'b2b', 'b2c', 'sales funnel'
-        ]
-    }
-    
-    # Count keyword matches for each role
-    role_scores = {}
-    for role, keywords in role_keywords.items():
-        score = sum(1 for keyword in keywords if keyword in resume_lower)
-        role_scores[role] = score
-    
-    # Find the role with highest score
-    if max(role_scores.values()) > 0:
-        predicted_role = max(role_scores, key=role_scores.get)
-    else:
-        predicted_role = "General"  # Default if no specific role detected
-    
-    return predicted_role
+logger = logging.getLogger(__name__)
+
+# Load the embedding model in the background so the page renders right away
+embedding_model.warmup()
+
+@st.cache_resource
+def get_prediction_queue():
+    """One write-behind queue per process, shared by all sessions"""
+    return WriteBehindQueue(supabase, "resumes")
+
+@st.cache_resource
+def get_index_pool():
+    """One worker per process that adds uploaded resumes to candidate search"""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="index")
+
+def index_in_background(texts, metadata):
+    # Embedding waits on the model load, so it never runs on the upload's rerun
+    if resume_index is None:
+        return
+
+    def run():
+        try:
+            index_resumes(texts, metadata)
+        except Exception:
+            logger.exception("Could not add %d resumes to candidate search", len(texts))
+    get_index_pool().submit(run)
+
+@st.cache_resource
+def get_result_cache():
+    """Parse and score results shared by all sessions, keyed by content hash"""
+    return open_default_result_cache()
+
+def parse_upload(uploaded_file):
+    """extract_resume_data, memoized on the uploaded bytes"""
+    cache = get_result_cache()
+    if cache is None:
+        return extract_resume_data(uploaded_file)
+    pdf_bytes = uploaded_file.getvalue()
+    return cache.get_or_compute(content_key("pdf", pdf_bytes), lambda: extract_resume_data(pdf_bytes))
+
+def read_job_upload(job_file):
+    """extract_job_description, memoized on the uploaded bytes"""
+    cache = get_result_cache()
+    if cache is None:
+        return extract_job_description(job_file)
+    key = content_key("job", job_file.getvalue(), job_file.type)
+    return cache.get_or_compute(key, lambda: extract_job_description(job_file))
+
+def match_score(resume_text, job_text):
+    """generate_match_score, memoized on both texts"""
+    cache = get_result_cache()
+    if cache is None:
+        return generate_match_score(resume_text, job_text)
+    key = content_key("score", resume_text, job_text)
+    return cache.get_or_compute(key, lambda: generate_match_score(resume_text, job_text))
+
+@st.cache_resource
+def get_batch_jobs():
+    """Background runner for recruiter batches; resumes unfinished jobs on start"""
+    return open_default_job_manager(cache=get_result_cache())
+
+def batch_job_owner():
+    """Token naming this browser session's batch jobs, kept in the URL across refreshes"""
+    if 'batch_owner' not in st.session_state:
+        st.session_state.batch_owner = st.query_params.get("batch_owner") or uuid.uuid4().hex
+    st.query_params["batch_owner"] = st.session_state.batch_owner
+    return st.session_state.batch_owner
+
+def open_batch_job(job_id):
+    """Show a batch job's progress and results in the recruiter tab"""
+    st.session_state.batch_job_id = job_id
+    st.session_state.batch_results = []
+    st.session_state.pop('batch_results_job', None)
+    st.query_params["batch_job"] = job_id
+
+@st.fragment(run_every=2)
+def show_batch_job_progress(job_id):
+    """Poll a running batch job without rerunning the whole page"""
+    job = get_batch_jobs().status(job_id)
+    if job is None or job['status'] not in ('queued', 'running'):
+        # Finished or deleted: rerun the page so the results (or a notice) load
+        st.rerun()
+    st.progress(job['done'] / job['total'] if job['total'] else 1.0)
+    st.text(f"Processed {job['done']}/{job['total']} resumes ({job['failed']} failed) — {job['status']}")
+    if st.button("⏹️ Cancel Job"):
+        get_batch_jobs().cancel(job_id)
+
+@st.cache_resource
+def get_history_sync():
+    """History summaries shared by all sessions, synced incrementally"""
+    return HistorySync(supabase, "resumes")
 
 # ✅ Page Config
 st.set_page_config(page_title="AI Resume Tool", layout="wide", page_icon="🧠")
@@ -367,6 +418,28 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
+# Memoized parse/score results for this process
+result_cache = get_result_cache()
+if result_cache is not None:
+    with st.sidebar.expander("⚡ Result Cache"):
+        cache_stats = result_cache.stats()
+        st.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+        st.write(f"**Entries:** {cache_stats['entries']} / {cache_stats['max_entries']}")
+        st.write(f"**Memory:** {cache_stats['bytes'] / 1024 ** 2:.1f} / {cache_stats['max_bytes'] / 1024 ** 2:.0f} MB")
+        st.write(f"**Hits / Misses:** {cache_stats['hits']} / {cache_stats['misses']}")
+        st.write(f"**Evictions:** {cache_stats['evictions']}")
+
+# Per-stage timings recorded in this process
+with st.sidebar.expander("🩺 Stage Timings"):
+    timings = stage_summary()
+    if timings:
+        st.dataframe(pd.DataFrame(timings).set_index("stage"), use_container_width=True)
+        st.write("**Latest runs:**")
+        for stage_name, seconds, _ in list(metrics_registry.recent)[-10:][::-1]:
+            st.write(f"• {stage_name}: {seconds * 1000:.1f} ms")
+    else:
+        st.info("No stages have run yet")
+
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "📄 Resume Classifier (Instant Role Prediction)",
     "🤖 ATS Score Generator", 
@@ -390,20 +463,20 @@ with tab1:
         try:
             # Extract resume data directly in Streamlit
             with st.spinner("🔍 Analyzing your resume..."):
-                resume_text, resume_data = extract_resume_data(uploaded_file)
+                resume_text, resume_data = parse_upload(uploaded_file)
                 
                 # For now, we'll use a simple rule-based classifier
                 # You can replace this with your trained model later
                 predicted_label = classify_resume_role(resume_text)
                 
-                # Save to database
+                # Save to database (written in the background)
                 try:
-                    supabase.table("resumes").insert({
+                    get_prediction_queue().put({
                         "filename": uploaded_file.name,
                         "predicted_label": predicted_label,
                         "original_text": resume_text[:1000],  # Limit text length for database
                         "user_email": "user@example.com"  # You can add user authentication later
-                    }).execute()
+                    })
                     
                     # Trigger refresh for Prediction History tab
                     if 'refresh_trigger' not in st.session_state:
@@ -417,6 +490,16 @@ with tab1:
                     st.success(f"🎯 Predicted Role: **{predicted_label}**")
                     st.warning(f"⚠️ Could not save to database: {str(db_error)}")
                 
+                # Keep the embedding so this resume can be matched to future jobs
+                index_in_background([resume_text], [{
+                    "filename": uploaded_file.name,
+                    "predicted_label": predicted_label,
+                    "user_email": "user@example.com",
+                    "name": resume_data.get("name", "Not Found"),
+                    "email": resume_data.get("email", "Not Found"),
+                    "preview": resume_text[:300]
+                }])
+                
         except Exception as e:
             st.error(f"❌ Error processing resume: {str(e)}")
 
@@ -430,20 +513,15 @@ with tab2:
     resume_file = st.file_uploader("Upload Resume", type=["pdf"], key="resume")
     job_file = st.file_uploader("Upload Job Description", type=["pdf", "txt"], key="job")
 
-    def clean_text(text):
-        text = re.sub(r"\(cid:\d+\)", "", text)
-        text = re.sub(r"\s{2,}", " ", text)
-        return text.strip()
-
     if st.button("Generate ATS Score"):
         if resume_file and job_file:
-            resume_text, resume_data = extract_resume_data(resume_file)
-            job_text = extract_job_description(job_file)
+            resume_text, resume_data = parse_upload(resume_file)
+            job_text = read_job_upload(job_file)
             
             # Clean the resume text
             cleaned_resume_text = clean_text(resume_text)
             
-            score, reasoning = generate_match_score(cleaned_resume_text, job_text)
+            score, reasoning = match_score(cleaned_resume_text, job_text)
 
             # Display match score
             st.success(f"✅ Match Score: {score:.2f}%")
@@ -522,6 +600,25 @@ with tab2:
             st.markdown(suggestions)
         else:
             st.warning("Please upload both files to generate score.")
+    
+    # Compare the resume with every open role at once
+    if job_library is not None and len(job_library):
+        st.markdown("## 🔭 Best-Fitting Open Roles")
+        st.markdown(f"See which of our {len(job_library)} open roles fit your resume best")
+        top_roles = st.slider("Roles to show", 1, 25, 5)
+        
+        if st.button("🔭 Find My Best Roles", disabled=not resume_file):
+            resume_text, resume_data = parse_upload(resume_file)
+            with st.spinner("Scoring your resume against every open role..."):
+                best_roles = rank_jobs_for_resume(clean_text(resume_text), k=top_roles,
+                                                  resume_skills=resume_data.get('skills', []))
+            
+            for rank, role in enumerate(best_roles, 1):
+                with st.expander(f"{rank}. {role['title']} — {role['match_score']:.1f}% match"):
+                    st.write(role['reasoning'])
+                    st.write(f"**Skills you have:** {', '.join(role['matching_skills']) or 'None'}")
+                    st.write(f"**Skills you're missing:** {', '.join(role['missing_skills']) or 'None'}")
+                    st.metric("🎯 Skill Match Rate", f"{role['skill_match_percent']:.1f}%")
 
 # ============================
 # 🏢 TAB 3: Recruiter Dashboard
@@ -618,6 +715,33 @@ Responsibilities:
                 st.error(f"❌ Error reading file: {str(e)}")
                 job_description_text = ""
     
+    # Search resumes already stored from earlier uploads
+    if resume_index is not None:
+        with st.expander("🔎 Search Previously Uploaded Candidates"):
+            st.markdown("Rank every stored resume against this job without re-uploading PDFs")
+            col1, col2 = st.columns([1, 2])
+            with col1:
+                top_k = st.number_input("Top candidates", min_value=1, max_value=200, value=10, step=1)
+            with col2:
+                role_filter = st.multiselect("Only these predicted roles", resume_index.field_values("predicted_label"))
+            
+            if st.button("🔎 Find Top Candidates", disabled=not job_description_text):
+                filters = {"predicted_label": role_filter} if role_filter else None
+                with st.spinner("Searching stored resumes..."):
+                    candidates = find_top_candidates(job_description_text, k=int(top_k), filters=filters)
+                
+                if candidates:
+                    st.dataframe(pd.DataFrame([{
+                        'Rank': rank,
+                        'Name': c.get('name', 'Not Found'),
+                        'Email': c.get('email', 'Not Found'),
+                        'Predicted Role': c.get('predicted_label', ''),
+                        'Match Score (%)': c['match_score'],
+                        'Filename': c.get('filename', '')
+                    } for rank, c in enumerate(candidates, 1)]), use_container_width=True)
+                else:
+                    st.info("No stored resumes match these filters yet.")
+    
     # Resume Upload Section
     st.markdown("## 📁 Step 2: Upload Resumes")
     uploaded_resumes = st.file_uploader(
@@ -635,61 +759,57 @@ Responsibilities:
             for i, resume in enumerate(uploaded_resumes, 1):
                 st.write(f"{i}. {resume.name} ({resume.size} bytes)")
     
+    # Parallelism for PDF parsing
+    batch_workers = st.number_input(
+        "⚙️ Parallel workers", min_value=1, max_value=DEFAULT_WORKERS * 2,
+        value=DEFAULT_WORKERS, step=1,
+        help="Number of processes used to parse resumes"
+    )
+    
     # Process Button
     if st.button("🚀 Process All Resumes", disabled=not (job_description_text and uploaded_resumes)):
         if job_description_text and uploaded_resumes:
+            # Runs in a background worker; results are saved as each file finishes
+            batch = [(resume_file.name, resume_file.getvalue()) for resume_file in uploaded_resumes]
+            job_id = get_batch_jobs().submit(batch, job_description_text, title=job_title or None,
+                                             workers=batch_workers, owner=batch_job_owner())
+            open_batch_job(job_id)
+    
+    # The job id is kept in the URL so a page refresh reconnects to it
+    if 'batch_job_id' not in st.session_state and "batch_job" in st.query_params:
+        open_batch_job(st.query_params["batch_job"])
+    
+    # Only this session's jobs: candidate names and scores stay with their recruiter
+    recent_jobs = get_batch_jobs().list_jobs(batch_job_owner())
+    if recent_jobs:
+        with st.expander("🗂️ Recent Batch Jobs"):
+            for job in recent_jobs:
+                label = f"{job['title'] or 'Untitled job'} — {job['done']}/{job['total']} resumes ({job['status']})"
+                if st.button(label, key=f"open_job_{job['id']}"):
+                    open_batch_job(job['id'])
+    
+    if st.session_state.get('batch_job_id'):
+        batch_job = get_batch_jobs().status(st.session_state.batch_job_id)
+        if batch_job is None:
+            # Pruned by retention, deleted, or an unknown id from the URL
+            st.warning("That batch job no longer exists.")
+            del st.session_state.batch_job_id
+            st.query_params.pop("batch_job", None)
+        elif batch_job['status'] in ('queued', 'running'):
+            show_batch_job_progress(batch_job['id'])
+        else:
+            if st.session_state.get('batch_results_job') != batch_job['id']:
+                results, errors = get_batch_jobs().results(batch_job['id'])
+                st.session_state.batch_results = results
+                st.session_state.batch_errors = errors
+                st.session_state.batch_results_job = batch_job['id']
             
-            # Initialize results storage
-            if 'batch_results' not in st.session_state:
-                st.session_state.batch_results = []
-            
-            st.session_state.batch_results = []  # Clear previous results
-            
-            # Progress tracking
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            # Process each resume
-            for i, resume_file in enumerate(uploaded_resumes):
-                status_text.text(f"Processing {resume_file.name}...")
-                
-                try:
-                    # Extract resume data
-                    resume_text, resume_data = extract_resume_data(resume_file)
-                    cleaned_resume_text = clean_text(resume_text)
-                    
-                    # Generate match score
-                    score, reasoning = generate_match_score(cleaned_resume_text, job_description_text)
-                    
-                    # Analyze skills
-                    skills = resume_data.get('skills', [])
-                    skill_analysis = analyze_skill_gaps(skills, job_description_text)
-                    
-                    # Store results
-                    result = {
-                        'filename': resume_file.name,
-                        'name': resume_data.get('name', 'Not Found'),
-                        'email': resume_data.get('email', 'Not Found'),
-                        'phone': resume_data.get('phone', 'Not Found'),
-                        'match_score': score,
-                        'reasoning': reasoning,
-                        'skills': skills,
-                        'matching_skills': skill_analysis["matching_skills"],
-                        'missing_skills': skill_analysis["missing_skills"],
-                        'skill_match_percent': skill_analysis["match_percentage"],
-                        'resume_text': resume_text[:300] + "..." if len(resume_text) > 300 else resume_text
-                    }
-                    
-                    st.session_state.batch_results.append(result)
-                    
-                except Exception as e:
-                    st.error(f"Error processing {resume_file.name}: {str(e)}")
-                
-                # Update progress
-                progress_bar.progress((i + 1) / len(uploaded_resumes))
-            
-            status_text.text("✅ Processing complete!")
-            st.success(f"🎉 Successfully processed {len(st.session_state.batch_results)} resumes!")
+            for error in st.session_state.get('batch_errors', []):
+                st.error(f"Error processing {error['filename']}: {error['error']}")
+            if batch_job['status'] == 'completed':
+                st.success(f"🎉 Successfully processed {len(st.session_state.batch_results)} resumes!")
+            else:
+                st.warning(f"⚠️ Batch job {batch_job['status']} after {batch_job['done']}/{batch_job['total']} resumes.")
     
     # Display Results
     if 'batch_results' in st.session_state and st.session_state.batch_results:
@@ -1044,37 +1164,34 @@ with tab5:
         st.session_state.refresh_trigger = 0
 
     @st.cache_data
-    def fetch_predictions(refresh_trigger):
-        return supabase.table("resumes").select("*").order("id", desc=True).execute().data
+    def fetch_history_summary(filters, refresh_trigger):
+        # A new refresh_trigger only fetches rows added since the last sync
+        return get_history_sync().summary(filters)
+
+    @st.cache_data
+    def fetch_history_page(filters, page_size, before_id, refresh_trigger):
+        return fetch_page(supabase, filters, page_size, before_id)
 
     # Add refresh controls
     col1, col2 = st.columns([3, 1])
     
     with col2:
         if st.button("🔄 Refresh Data"):
+            # Make sure queued predictions have reached the database first
+            get_prediction_queue().flush()
             st.session_state.refresh_trigger += 1
             st.rerun()
 
-    data = fetch_predictions(st.session_state.refresh_trigger)
+    # Counts come from aggregate queries; rows are only fetched a page at a time
+    summary = fetch_history_summary(None, st.session_state.refresh_trigger)
 
-    if data:
-        df = pd.DataFrame(data)
-
-        # Ensure required columns exist
+    if summary["total"]:
         required_cols = ["filename", "predicted_label", "user_email", "created_at"]
-        for col in required_cols:
-            if col not in df.columns:
-                df[col] = "Not Available"
-
-        # Convert created_at to datetime for better filtering
-        if 'created_at' in df.columns:
-            try:
-                df['created_at'] = pd.to_datetime(df['created_at'])
-                df['date'] = df['created_at'].dt.date
-                df['time'] = df['created_at'].dt.time
-            except:
-                df['date'] = "Not Available"
-                df['time'] = "Not Available"
+        total = summary["total"]
+        role_counts = pd.Series(summary["role_counts"], dtype="int64")
+        daily_counts = pd.Series(summary["daily_counts"], dtype="int64")
+        first_at = pd.to_datetime(summary["first_at"]) if summary.get("first_at") else None
+        last_at = pd.to_datetime(summary["last_at"]) if summary.get("last_at") else None
 
         # ============================
         # 📈 ANALYTICS DASHBOARD
@@ -1085,23 +1202,18 @@ with tab5:
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("📊 Total Predictions", len(df))
+            st.metric("📊 Total Predictions", total)
         
         with col2:
-            unique_roles = df['predicted_label'].nunique()
-            st.metric("🎯 Unique Job Roles", unique_roles)
+            st.metric("🎯 Unique Job Roles", summary["unique_roles"])
         
         with col3:
-            unique_users = df['user_email'].nunique()
-            st.metric("👥 Unique Users", unique_users)
+            st.metric("👥 Unique Users", summary["unique_users"])
         
         with col4:
-            if 'created_at' in df.columns and df['created_at'].notna().any():
-                try:
-                    days_active = (df['created_at'].max() - df['created_at'].min()).days + 1
-                    st.metric("📅 Days Active", days_active)
-                except:
-                    st.metric("📅 Days Active", "N/A")
+            if first_at is not None and last_at is not None:
+                days_active = (last_at - first_at).days + 1
+                st.metric("📅 Days Active", days_active)
             else:
                 st.metric("📅 Days Active", "N/A")
 
@@ -1113,7 +1225,6 @@ with tab5:
         with chart_col1:
             # Role Distribution Chart
             st.markdown("#### 🎯 Job Role Distribution")
-            role_counts = df['predicted_label'].value_counts()
             
             if len(role_counts) > 0:
                 # Create a simple bar chart using Streamlit
@@ -1126,7 +1237,7 @@ with tab5:
                 # Show top roles
                 st.write("**Top Predicted Roles:**")
                 for i, (role, count) in enumerate(role_counts.head(5).items(), 1):
-                    percentage = (count / len(df)) * 100
+                    percentage = (count / total) * 100
                     st.write(f"{i}. **{role}**: {count} predictions ({percentage:.1f}%)")
             else:
                 st.info("No role data available for chart")
@@ -1134,25 +1245,17 @@ with tab5:
         with chart_col2:
             # Daily Activity Chart
             st.markdown("#### 📅 Daily Activity")
-            if 'date' in df.columns and df['date'].notna().any():
-                try:
-                    daily_counts = df['date'].value_counts().sort_index()
-                    
-                    if len(daily_counts) > 0:
-                        chart_data = pd.DataFrame({
-                            'Date': daily_counts.index,
-                            'Predictions': daily_counts.values
-                        })
-                        st.line_chart(chart_data.set_index('Date'))
-                        
-                        # Show recent activity
-                        st.write("**Recent Activity:**")
-                        for date, count in daily_counts.tail(5).items():
-                            st.write(f"• **{date}**: {count} predictions")
-                    else:
-                        st.info("No daily activity data available")
-                except:
-                    st.info("Unable to process date data for chart")
+            if len(daily_counts) > 0:
+                chart_data = pd.DataFrame({
+                    'Date': pd.to_datetime(daily_counts.index).date,
+                    'Predictions': daily_counts.values
+                })
+                st.line_chart(chart_data.set_index('Date'))
+                
+                # Show recent activity
+                st.write("**Recent Activity:**")
+                for date, count in daily_counts.tail(5).items():
+                    st.write(f"• **{date}**: {count} predictions")
             else:
                 st.info("No date information available for activity chart")
 
@@ -1165,28 +1268,28 @@ with tab5:
         
         with filter_col1:
             # Role Filter
-            all_roles = ["All Roles"] + sorted(df['predicted_label'].unique().tolist())
+            all_roles = ["All Roles"] + sorted(role_counts.index.tolist())
             selected_role = st.selectbox("🎯 Filter by Job Role", all_roles)
         
         with filter_col2:
             # User Filter
-            all_users = ["All Users"] + sorted(df['user_email'].unique().tolist())
+            all_users = ["All Users"] + summary["users"]
             selected_user = st.selectbox("👤 Filter by User", all_users)
         
         with filter_col3:
             # Date Range Filter
-            if 'created_at' in df.columns and df['created_at'].notna().any():
-                try:
-                    min_date = df['created_at'].min().date()
-                    max_date = df['created_at'].max().date()
-                    
-                    date_range = st.date_input(
-                        "📅 Date Range",
-                        value=(min_date, max_date),
-                        min_value=min_date,
-                        max_value=max_date
-                    )
-                except:
+            if first_at is not None and last_at is not None:
+                min_date = first_at.date()
+                max_date = last_at.date()
+                
+                date_range = st.date_input(
+                    "📅 Date Range",
+                    value=(min_date, max_date),
+                    min_value=min_date,
+                    max_value=max_date
+                )
+                # The full range is the same as no date filter
+                if tuple(date_range) == (min_date, max_date):
                     date_range = None
             else:
                 st.info("No date filtering available")
@@ -1195,33 +1298,16 @@ with tab5:
         # Search Box
         search_term = st.text_input("🔍 Search in filenames", placeholder="Enter filename or keyword...")
 
-        # Apply Filters
-        filtered_df = df.copy()
-        
-        # Role filter
-        if selected_role != "All Roles":
-            filtered_df = filtered_df[filtered_df['predicted_label'] == selected_role]
-        
-        # User filter
-        if selected_user != "All Users":
-            filtered_df = filtered_df[filtered_df['user_email'] == selected_user]
-        
-        # Date filter
-        if date_range and len(date_range) == 2 and 'created_at' in filtered_df.columns:
-            try:
-                start_date, end_date = date_range
-                filtered_df = filtered_df[
-                    (filtered_df['created_at'].dt.date >= start_date) & 
-                    (filtered_df['created_at'].dt.date <= end_date)
-                ]
-            except:
-                pass
-        
-        # Search filter
-        if search_term:
-            filtered_df = filtered_df[
-                filtered_df['filename'].str.contains(search_term, case=False, na=False)
-            ]
+        # Filters run in the database query
+        filters = make_filters(
+            role=selected_role if selected_role != "All Roles" else None,
+            user_email=selected_user if selected_user != "All Users" else None,
+            date_range=date_range,
+            search=search_term
+        )
+        is_filtered = any(filters.values())
+        filtered_summary = fetch_history_summary(filters, st.session_state.refresh_trigger) if is_filtered else summary
+        filtered_total = filtered_summary["total"]
 
         # ============================
         # 📥 EXPORT OPTIONS
@@ -1231,85 +1317,99 @@ with tab5:
         export_col1, export_col2, export_col3 = st.columns(3)
         
         with export_col1:
-            # Export filtered data
-            if len(filtered_df) > 0:
-                export_df = filtered_df[required_cols].copy()
-                export_df.rename(columns={
-                    "filename": "Filename",
-                    "predicted_label": "Predicted_Role",
-                    "user_email": "User_Email",
-                    "created_at": "Upload_DateTime"
-                }, inplace=True)
+            # Export filtered data, streamed from the database only when asked for
+            if filtered_total > 0:
+                if st.button("📊 Prepare Filtered Export"):
+                    export_df = pd.DataFrame(list(iter_rows(supabase, filters, required_cols)),
+                                             columns=required_cols + ["id"])[required_cols]
+                    export_df.rename(columns={
+                        "filename": "Filename",
+                        "predicted_label": "Predicted_Role",
+                        "user_email": "User_Email",
+                        "created_at": "Upload_DateTime"
+                    }, inplace=True)
+                    st.session_state.history_export = (filters, export_df.to_csv(index=False))
                 
-                csv_data = export_df.to_csv(index=False)
-                st.download_button(
-                    label="📊 Export Filtered Data (CSV)",
-                    data=csv_data,
-                    file_name=f"prediction_history_filtered_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
+                export = st.session_state.get("history_export")
+                if export and export[0] == filters:
+                    st.download_button(
+                        label="📊 Export Filtered Data (CSV)",
+                        data=export[1],
+                        file_name=f"prediction_history_filtered_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                        mime="text/csv"
+                    )
         
         with export_col2:
             # Export analytics summary
-            if len(df) > 0:
-                analytics_data = {
-                    'Metric': [
-                        'Total Predictions',
-                        'Unique Job Roles', 
-                        'Unique Users',
-                        'Most Common Role',
-                        'Most Active User'
-                    ],
-                    'Value': [
-                        len(df),
-                        df['predicted_label'].nunique(),
-                        df['user_email'].nunique(),
-                        df['predicted_label'].mode().iloc[0] if len(df['predicted_label'].mode()) > 0 else 'N/A',
-                        df['user_email'].mode().iloc[0] if len(df['user_email'].mode()) > 0 else 'N/A'
-                    ]
-                }
-                
-                analytics_df = pd.DataFrame(analytics_data)
-                analytics_csv = analytics_df.to_csv(index=False)
-                
-                st.download_button(
-                    label="📈 Export Analytics Summary",
-                    data=analytics_csv,
-                    file_name=f"analytics_summary_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
+            analytics_data = {
+                'Metric': [
+                    'Total Predictions',
+                    'Unique Job Roles', 
+                    'Unique Users',
+                    'Most Common Role',
+                    'Most Active User'
+                ],
+                'Value': [
+                    total,
+                    summary["unique_roles"],
+                    summary["unique_users"],
+                    role_counts.index[0] if len(role_counts) > 0 else 'N/A',
+                    summary.get("top_user") or 'N/A'
+                ]
+            }
+            
+            analytics_df = pd.DataFrame(analytics_data)
+            analytics_csv = analytics_df.to_csv(index=False)
+            
+            st.download_button(
+                label="📈 Export Analytics Summary",
+                data=analytics_csv,
+                file_name=f"analytics_summary_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv"
+            )
         
         with export_col3:
             # Export role distribution
-            if len(df) > 0:
-                role_dist = df['predicted_label'].value_counts().reset_index()
-                role_dist.columns = ['Job_Role', 'Count']
-                role_dist['Percentage'] = (role_dist['Count'] / len(df) * 100).round(2)
-                
-                role_csv = role_dist.to_csv(index=False)
-                st.download_button(
-                    label="🎯 Export Role Distribution",
-                    data=role_csv,
-                    file_name=f"role_distribution_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
+            role_dist = role_counts.reset_index()
+            role_dist.columns = ['Job_Role', 'Count']
+            role_dist['Percentage'] = (role_dist['Count'] / total * 100).round(2)
+            
+            role_csv = role_dist.to_csv(index=False)
+            st.download_button(
+                label="🎯 Export Role Distribution",
+                data=role_csv,
+                file_name=f"role_distribution_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv"
+            )
 
         # ============================
         # 📋 ENHANCED DATA TABLE
         # ============================
         st.markdown("## 📋 Detailed Prediction Records")
-        st.write(f"**Showing {len(filtered_df)} of {len(df)} records**")
+        st.write(f"**Showing {filtered_total} of {total} records**")
         
-        if len(filtered_df) > 0:
+        if filtered_total > 0:
+            page_size = st.selectbox("Records per page", [10, 25, 50, 100], index=1)
+            total_pages = (filtered_total - 1) // page_size + 1
+            
+            # Keyset pagination: remember the cursor each visited page started from
+            page_key = (tuple(filters.items()), page_size, st.session_state.refresh_trigger)
+            if st.session_state.get("history_page_key") != page_key:
+                st.session_state.history_page_key = page_key
+                st.session_state.history_cursors = [None]
+            cursors = st.session_state.history_cursors
+            
+            rows, next_cursor = fetch_history_page(filters, page_size, cursors[-1],
+                                                   st.session_state.refresh_trigger)
+            
             # Prepare display dataframe
-            display_df = filtered_df[required_cols].copy()
+            display_df = pd.DataFrame(rows, columns=HISTORY_COLUMNS)[required_cols].fillna("Not Available")
             
             # Format datetime for better display
-            if 'created_at' in display_df.columns:
-                try:
-                    display_df['created_at'] = pd.to_datetime(display_df['created_at']).dt.strftime('%Y-%m-%d %H:%M:%S')
-                except:
-                    pass
+            try:
+                display_df['created_at'] = pd.to_datetime(display_df['created_at']).dt.strftime('%Y-%m-%d %H:%M:%S')
+            except:
+                pass
             
             display_df.rename(columns={
                 "filename": "📎 Filename",
@@ -1317,39 +1417,36 @@ with tab5:
                 "user_email": "👤 Uploaded By",
                 "created_at": "🕒 Uploaded At"
             }, inplace=True)
-
-            # Display with pagination
-            page_size = st.selectbox("Records per page", [10, 25, 50, 100], index=1)
             
-            total_pages = (len(display_df) - 1) // page_size + 1
+            st.dataframe(display_df, use_container_width=True)
             
             if total_pages > 1:
-                page_num = st.selectbox(f"Page (1 to {total_pages})", range(1, total_pages + 1))
-                start_idx = (page_num - 1) * page_size
-                end_idx = start_idx + page_size
-                page_df = display_df.iloc[start_idx:end_idx]
-            else:
-                page_df = display_df
-            
-            st.dataframe(page_df, use_container_width=True)
+                nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
+                with nav_col1:
+                    if st.button("⬅️ Previous", disabled=len(cursors) == 1):
+                        cursors.pop()
+                        st.rerun()
+                with nav_col2:
+                    st.write(f"Page {len(cursors)} of {total_pages}")
+                with nav_col3:
+                    if st.button("Next ➡️", disabled=next_cursor is None):
+                        cursors.append(next_cursor)
+                        st.rerun()
             
             # Quick Stats for filtered data
-            if len(filtered_df) != len(df):
+            if is_filtered:
                 st.markdown("### 📊 Filtered Data Statistics")
                 filt_col1, filt_col2, filt_col3 = st.columns(3)
                 
                 with filt_col1:
-                    st.metric("Filtered Records", len(filtered_df))
+                    st.metric("Filtered Records", filtered_total)
                 
                 with filt_col2:
-                    if len(filtered_df) > 0:
-                        top_role = filtered_df['predicted_label'].mode().iloc[0] if len(filtered_df['predicted_label'].mode()) > 0 else 'N/A'
-                        st.metric("Top Role in Filter", top_role)
+                    top_role = next(iter(filtered_summary["role_counts"]), 'N/A')
+                    st.metric("Top Role in Filter", top_role)
                 
                 with filt_col3:
-                    if len(filtered_df) > 0:
-                        unique_users_filtered = filtered_df['user_email'].nunique()
-                        st.metric("Users in Filter", unique_users_filtered)
+                    st.metric("Users in Filter", filtered_summary["unique_users"])
         
         else:
             st.info("No records match your current filters. Try adjusting the filter criteria.")
@@ -1,14 +1,48 @@
 import os
+import sys
 import pickle
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
 import uvicorn
-from fastapi import FastAPI, UploadFile, File
+import numpy as np
+from contextlib import asynccontextmanager
+from typing import List
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from PyPDF2 import PdfReader
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.abspath(os.path.join(BASE_DIR, '..')))
 
-app = FastAPI()
+from backend.pdf_text import extract_text_from_pdf
+from backend.write_behind import WriteBehindQueue
+from backend.matcher import index_resumes, resume_index
+from models.model import LazyModel, embedding_model
+from models.classifier_artifacts import MANIFEST_FILE, load_classifier as load_classifier_artifacts
+from utils.metrics import registry, stage, timed
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app):
+    # Pools are built here and torn down on shutdown rather than at import,
+    # so the app can be started again in the same process (tests, benchmarks)
+    classifier.warmup()
+    # The encoder is only needed here to index uploads for candidate search
+    if resume_index is not None:
+        embedding_model.warmup()
+    get_executor()
+    get_index_executor()
+    yield
+    shutdown_pools()
+    prediction_queue.close()
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -18,16 +52,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+HTTP_SECONDS = registry.histogram("ats_http_request_seconds", "HTTP request latency", ["method", "path", "status"])
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # The route template keeps label cardinality bounded
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        HTTP_SECONDS.observe(time.perf_counter() - start, method=request.method, path=path, status=status)
+
 # Load model and vectorizer
 model_path = os.path.join(BASE_DIR, "models", "resume_classifier.pkl")
 vectorizer_path = os.path.join(BASE_DIR, "models", "vectorizer.pkl")
+classifier_dir = os.getenv("CLASSIFIER_DIR", os.path.join(BASE_DIR, "models", "resume_classifier"))
 label_map_path = os.path.join(BASE_DIR, "..", "data", "label_mapping.txt")
 
-with open(model_path, "rb") as f:
-    model = pickle.load(f)
+def classifier_available():
+    return os.path.exists(os.path.join(classifier_dir, MANIFEST_FILE)) or (
+        os.path.exists(model_path) and os.path.exists(vectorizer_path))
+
+def load_classifier():
+    # Memory-mapped artifacts load in milliseconds and share pages across workers
+    if os.path.exists(os.path.join(classifier_dir, MANIFEST_FILE)):
+        verify = os.getenv("CLASSIFIER_VERIFY", "1") != "0"
+        return load_classifier_artifacts(classifier_dir, verify=verify)
+
+    # Older pickled artifacts
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+
+    with open(vectorizer_path, "rb") as f:
+        vectorizer = pickle.load(f)
+
+    return model, vectorizer
 
-with open(vectorizer_path, "rb") as f:
-    vectorizer = pickle.load(f)
+# Loaded on first use or by the startup warmup, not at import
+classifier = LazyModel(load_classifier, "classifier")
 
 label_map = {}
 with open(label_map_path, "r") as f:
@@ -35,38 +102,193 @@ with open(label_map_path, "r") as f:
         id_, label = line.strip().split(",")
         label_map[int(id_)] = label
 
+# Bounded pool for PDF parsing and classification so the event loop stays free
+PREDICT_WORKERS = int(os.getenv("PREDICT_WORKERS", os.cpu_count() or 4))
+
+# Candidate-search indexing gets its own small pool so it never takes predict workers
+INDEX_WORKERS = int(os.getenv("INDEX_WORKERS", 1))
+
+# Batch uploads extract text in worker processes, since PDF parsing holds the GIL
+EXTRACT_PROCESSES = int(os.getenv("EXTRACT_PROCESSES", os.cpu_count() or 4))
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", 500))
+
+# Created on first use or at startup, discarded at shutdown
+_executor = None
+_index_executor = None
+_extract_pool = None
+_pools_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _pools_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PREDICT_WORKERS, thread_name_prefix="predict")
+        return _executor
+
+def get_index_executor() -> ThreadPoolExecutor:
+    global _index_executor
+    with _pools_lock:
+        if _index_executor is None:
+            _index_executor = ThreadPoolExecutor(max_workers=INDEX_WORKERS, thread_name_prefix="index")
+        return _index_executor
+
+def get_extract_pool() -> ProcessPoolExecutor:
+    global _extract_pool
+    with _pools_lock:
+        if _extract_pool is None:
+            # Not fork: by now this process runs the predict and index pools,
+            # the write-behind thread and model warm-up, and a lock one of them
+            # holds at fork time would hang the worker. Forkserver workers
+            # import only backend.pdf_text, not this module and its models.
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload(["backend.pdf_text"])
+            else:
+                context = multiprocessing.get_context()
+            _extract_pool = ProcessPoolExecutor(max_workers=EXTRACT_PROCESSES, mp_context=context)
+        return _extract_pool
+
+def shutdown_pools():
+    """Wait for pending work and drop the pools; the next request creates new ones"""
+    global _executor, _index_executor, _extract_pool
+    with _pools_lock:
+        pools = [_executor, _index_executor, _extract_pool]
+        _executor = _index_executor = _extract_pool = None
+    for pool in pools:
+        if pool is not None:
+            pool.shutdown(wait=True)
+
 class ResumeText(BaseModel):
     text: str
 
-def extract_text_from_pdf(file_path: str) -> str:
-    reader = PdfReader(file_path)
-    return "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
+def classify_pdf(pdf_bytes: bytes) -> tuple:
+    resume_text = extract_text_from_pdf(pdf_bytes)
+    model, vectorizer = classifier.get()
+    with stage("classification"):
+        X = vectorizer.transform([resume_text])
+        prediction = model.predict(X)[0]
+    return resume_text, label_map[prediction]
+
+@timed("classification_batch")
+def classify_texts(texts: List[str], top_k: int) -> List[dict]:
+    # One sparse transform and one predict_proba for the whole batch
+    model, vectorizer = classifier.get()
+    X = vectorizer.transform(texts)
+    probabilities = model.predict_proba(X)
+    top_idx = np.argsort(-probabilities, axis=1)[:, :top_k]
+
+    predictions = []
+    for row, indices in zip(probabilities, top_idx):
+        ranked = [
+            {"label": label_map[model.classes_[i]], "probability": round(float(row[i]), 4)}
+            for i in indices
+        ]
+        predictions.append({"predicted_label": ranked[0]["label"], "top_k": ranked})
+    return predictions
+
+def index_in_background(texts: List[str], metadata: List[dict]):
+    # Embedding for candidate search happens after the response is sent
+    if resume_index is None:
+        return
+
+    def run():
+        try:
+            index_resumes(texts, metadata)
+        except Exception:
+            logger.exception("Could not add %d resumes to candidate search", len(texts))
+    get_index_executor().submit(run)
 
 from utils.supabase_client import supabase  
+
+# Inserts are batched in the background so responses never wait on Supabase
+prediction_queue = WriteBehindQueue(supabase, "resumes")
+
+def write_behind_gauges():
+    stats = prediction_queue.stats()
+    return [(f"ats_write_behind_{field}", f"Write-behind queue: {field} rows", [({}, value)])
+            for field, value in stats.items()]
+
+registry.add_collector(write_behind_gauges)
+
 @app.post("/predict/")
 async def predict_resume(file: UploadFile = File(...)):
     contents = await file.read()
-    temp_file_path = "temp_resume.pdf"
-    
-    with open(temp_file_path, "wb") as f:
-        f.write(contents)
 
-    resume_text = extract_text_from_pdf(temp_file_path)
-    os.remove(temp_file_path)
+    loop = asyncio.get_running_loop()
+    resume_text, predicted_label = await loop.run_in_executor(get_executor(), classify_pdf, contents)
 
-    X = vectorizer.transform([resume_text])
-    prediction = model.predict(X)[0]
-    predicted_label = label_map[prediction]
-
-    
-    supabase.table("resumes").insert({
+    prediction_queue.put({
         "filename": file.filename,
         "predicted_label": predicted_label,
         "original_text": resume_text,
         "user_email": "test@example.com"  # later replace with actual email if using auth
-    }).execute()
+    })
+    index_in_background([resume_text], [{
+        "filename": file.filename,
+        "predicted_label": predicted_label,
+        "user_email": "test@example.com",
+        "preview": resume_text[:300]
+    }])
 
     return {"predicted_label": predicted_label}
 
+@app.post("/predict/batch/")
+async def predict_resume_batch(files: List[UploadFile] = File(...), top_k: int = 3):
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_FILES} files per batch")
+    top_k = max(1, min(top_k, len(label_map)))
+
+    contents = [await file.read() for file in files]
+
+    # Extract text from all files in parallel; failures stay per-file
+    loop = asyncio.get_running_loop()
+    pool = get_extract_pool()
+    texts = await asyncio.gather(
+        *(loop.run_in_executor(pool, extract_text_from_pdf, data) for data in contents),
+        return_exceptions=True
+    )
+
+    results = [{"filename": file.filename} for file in files]
+    ok = [i for i, text in enumerate(texts) if not isinstance(text, BaseException)]
+    for i, text in enumerate(texts):
+        if isinstance(text, BaseException):
+            results[i]["error"] = f"Could not read PDF: {text}"
+
+    if ok:
+        predictions = await loop.run_in_executor(
+            get_executor(), classify_texts, [texts[i] for i in ok], top_k
+        )
+        for i, prediction in zip(ok, predictions):
+            results[i].update(prediction)
+            prediction_queue.put({
+                "filename": files[i].filename,
+                "predicted_label": prediction["predicted_label"],
+                "original_text": texts[i],
+                "user_email": "test@example.com"  # later replace with actual email if using auth
+            })
+        index_in_background([texts[i] for i in ok], [{
+            "filename": files[i].filename,
+            "predicted_label": results[i]["predicted_label"],
+            "user_email": "test@example.com",
+            "preview": texts[i][:300]
+        } for i in ok])
+
+    return {"results": results}
+
+@app.get("/ready")
+def readiness():
+    # 503 until the models are loaded, so load balancers hold traffic back.
+    # The encoder is only needed when uploads are indexed for candidate search
+    required = [classifier] + ([embedding_model] if resume_index is not None else [])
+    ready = all(model.ready for model in required)
+    body = {"ready": ready, "models": {model.name: model.status() for model in (classifier, embedding_model)}}
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@app.get("/metrics")
+def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
+    # Single process; backend/serve.py runs several workers sharing the loaded models
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,321 @@
+import atexit
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.batch_processor import iter_batch_results, DEFAULT_WORKERS
+from backend.sqlite_store import ProcessLocalConnection
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_JOBS_PATH = os.path.join(BASE_DIR, "..", "data", "batch_jobs.sqlite")
+
+# Finished jobs older than this are deleted when the manager starts
+DEFAULT_RETENTION_DAYS = 7
+
+# Items handed to iter_batch_results at a time; results are saved as each one finishes
+CHUNK_SIZE = 64
+
+# A job whose runner has not checkpointed for this long may be picked up by another process
+LEASE_SECONDS = 120
+
+
+class BatchJobManager:
+    """Runs recruiter batches in the background and keeps their progress on disk.
+
+    ``submit`` stores the job description and every PDF in SQLite and
+    returns a job id straight away. A background thread works through
+    unfinished jobs with iter_batch_results and saves each result the
+    moment it arrives, dropping the PDF it came from. A job cut short by a
+    restart or crash resumes with the items that have no result yet.
+
+    The process running a job holds a lease on it, recorded with its host
+    and pid. ``close`` (also run at exit) hands leases back, and leases left
+    by a process on this host that has since died are reclaimed on start,
+    so other hosts only ever wait out LEASE_SECONDS.
+
+    Jobs record the ``owner`` they were submitted by, and ``list_jobs`` only
+    shows an owner its own jobs.
+    """
+
+    def __init__(self, path, workers=DEFAULT_WORKERS, cache=None, retention_days=DEFAULT_RETENTION_DAYS):
+        self.path = path
+        self.workers = workers
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = ProcessLocalConnection(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, job_text TEXT NOT NULL, title TEXT, status TEXT NOT NULL, "
+            "total INTEGER NOT NULL, workers INTEGER, created_at REAL NOT NULL, "
+            "updated_at REAL NOT NULL, lease_until REAL NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "job_id TEXT NOT NULL, idx INTEGER NOT NULL, filename TEXT NOT NULL, pdf BLOB, "
+            "result TEXT, error TEXT, PRIMARY KEY (job_id, idx))"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "lease_owner" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN lease_owner TEXT")
+        if "owner" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        self._conn.commit()
+        self._purge(retention_days)
+        self._reclaim_dead_leases()
+        atexit.register(self.close)
+
+        # Pick up jobs left unfinished by an earlier run
+        if self._conn.execute("SELECT 1 FROM jobs WHERE status IN ('queued', 'running') LIMIT 1").fetchone():
+            self._ensure_started()
+
+    @property
+    def _conn(self):
+        return self._db.get()
+
+    def submit(self, resumes, job_text, title=None, workers=None, owner=None):
+        """Queue (filename, pdf_bytes) pairs for scoring against job_text; returns the job id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, job_text, title, status, total, workers, created_at, updated_at, owner) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, job_text, title, len(resumes), workers or self.workers, now, now, owner)
+            )
+            self._conn.executemany(
+                "INSERT INTO items (job_id, idx, filename, pdf) VALUES (?, ?, ?, ?)",
+                [(job_id, idx, filename, pdf_bytes) for idx, (filename, pdf_bytes) in enumerate(resumes)]
+            )
+            self._conn.commit()
+        self._ensure_started()
+        self._wake.set()
+        return job_id
+
+    def status(self, job_id):
+        """Progress of a job as a dict, or None for an unknown id"""
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT id, title, status, total, created_at, updated_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            done, failed = self._conn.execute(
+                "SELECT COUNT(*), COUNT(error) FROM items "
+                "WHERE job_id = ? AND (result IS NOT NULL OR error IS NOT NULL)", (job_id,)
+            ).fetchone()
+        return {
+            "id": job[0],
+            "title": job[1],
+            "status": job[2],
+            "total": job[3],
+            "done": done,
+            "failed": failed,
+            "created_at": job[4],
+            "updated_at": job[5],
+        }
+
+    def results(self, job_id):
+        """Finished items of a job in upload order; returns (results, errors)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename, result, error FROM items WHERE job_id = ? "
+                "AND (result IS NOT NULL OR error IS NOT NULL) ORDER BY idx", (job_id,)
+            ).fetchall()
+        results, errors = [], []
+        for filename, result, error in rows:
+            if error is not None:
+                errors.append({"filename": filename, "error": error})
+            else:
+                results.append(json.loads(result))
+        return results, errors
+
+    def list_jobs(self, owner, limit=20):
+        """Most recent jobs submitted by ``owner`` first, with their progress"""
+        if owner is None:
+            return []
+        with self._lock:
+            job_ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE owner = ? ORDER BY created_at DESC LIMIT ?", (owner, limit)
+            )]
+        return [self.status(job_id) for job_id in job_ids]
+
+    def cancel(self, job_id):
+        """Stop a job once the chunk in progress finishes; saved results are kept"""
+        self._set_status(job_id, "cancelled", only_if=("queued", "running"))
+
+    def delete(self, job_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM items WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self._conn.commit()
+
+    def close(self, timeout=10):
+        """Stop the runner after the item in progress and release its leases"""
+        if self._running():
+            self._stopping = True
+            self._wake.set()
+            self._thread.join(timeout)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET lease_until = 0, lease_owner = NULL WHERE lease_owner = ?", (_lease_owner(),)
+            )
+            self._conn.commit()
+
+    def _running(self):
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def _ensure_started(self):
+        if self._running():
+            return
+        with self._lock:
+            if self._running():
+                return
+            self._pid = os.getpid()
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="batch-jobs", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            job = self._claim_next()
+            if job is None:
+                # Idle: wait for a submit, and look again now and then for
+                # jobs whose runner in another process went away
+                self._wake.wait(LEASE_SECONDS)
+                self._wake.clear()
+                continue
+            try:
+                self._process(*job)
+            except Exception as e:
+                print(f"⚠️ Batch job {job[0]} stopped: {e}")
+                self._set_status(job[0], "failed")
+
+    def _claim_next(self):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, job_text, workers FROM jobs WHERE status IN ('queued', 'running') "
+                "AND lease_until < ? ORDER BY created_at LIMIT 1", (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            claimed = self._conn.execute(
+                "UPDATE jobs SET status = 'running', lease_until = ?, lease_owner = ?, updated_at = ? "
+                "WHERE id = ? AND lease_until < ?", (now + LEASE_SECONDS, _lease_owner(), now, row[0], now)
+            ).rowcount
+            self._conn.commit()
+        return row if claimed else None
+
+    def _process(self, job_id, job_text, workers):
+        while True:
+            with self._lock:
+                status = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                chunk = self._conn.execute(
+                    "SELECT idx, filename, pdf FROM items WHERE job_id = ? AND result IS NULL "
+                    "AND error IS NULL ORDER BY idx LIMIT ?", (job_id, CHUNK_SIZE)
+                ).fetchall()
+            if status is None or status[0] != "running" or self._stopping:
+                return
+            if not chunk:
+                self._set_status(job_id, "completed")
+                return
+
+            # Items go in under their index so duplicate filenames stay apart
+            filenames = {str(idx): filename for idx, filename, _ in chunk}
+            batch = [(str(idx), pdf) for idx, _, pdf in chunk]
+            for result in iter_batch_results(batch, job_text, workers=workers, cache=self.cache):
+                idx = result["filename"]
+                result = dict(result, filename=filenames[idx])
+                self._checkpoint(job_id, int(idx), result)
+                if self._stopping:
+                    return
+
+    def _checkpoint(self, job_id, idx, result):
+        now = time.time()
+        error = result.get("error")
+        with self._lock:
+            self._conn.execute(
+                "UPDATE items SET result = ?, error = ?, pdf = NULL WHERE job_id = ? AND idx = ?",
+                (None if error else json.dumps(result, default=str), error, job_id, idx)
+            )
+            self._conn.execute(
+                "UPDATE jobs SET updated_at = ?, lease_until = ? WHERE id = ?",
+                (now, now + LEASE_SECONDS, job_id)
+            )
+            self._conn.commit()
+
+    def _set_status(self, job_id, status, only_if=None):
+        now = time.time()
+        with self._lock:
+            if only_if:
+                placeholders = ",".join("?" * len(only_if))
+                self._conn.execute(
+                    f"UPDATE jobs SET status = ?, updated_at = ?, lease_until = 0, lease_owner = NULL "
+                    f"WHERE id = ? AND status IN ({placeholders})", (status, now, job_id, *only_if)
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ?, lease_until = 0, lease_owner = NULL WHERE id = ?",
+                    (status, now, job_id)
+                )
+            self._conn.commit()
+
+    def _reclaim_dead_leases(self):
+        # Leases of a crashed process on this host need not wait to expire
+        host = socket.gethostname()
+        with self._lock:
+            owners = [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT lease_owner FROM jobs WHERE lease_owner IS NOT NULL AND lease_until > ?",
+                (time.time(),)
+            )]
+            dead = [owner for owner in owners if owner.rpartition(":")[0] == host
+                    and not _pid_alive(int(owner.rpartition(":")[2]))]
+            self._conn.executemany(
+                "UPDATE jobs SET lease_until = 0, lease_owner = NULL WHERE lease_owner = ?",
+                [(owner,) for owner in dead]
+            )
+            self._conn.commit()
+
+    def _purge(self, retention_days):
+        cutoff = time.time() - retention_days * 86400
+        with self._lock:
+            old = [row[0] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE status NOT IN ('queued', 'running') AND updated_at < ?", (cutoff,)
+            )]
+            self._conn.executemany("DELETE FROM items WHERE job_id = ?", [(job_id,) for job_id in old])
+            self._conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in old])
+            self._conn.commit()
+
+
+def _lease_owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+def open_default_job_manager(cache=None):
+    """Open the job store configured by BATCH_JOBS_PATH / BATCH_JOB_RETENTION_DAYS"""
+    path = os.getenv("BATCH_JOBS_PATH", DEFAULT_JOBS_PATH)
+    retention_days = float(os.getenv("BATCH_JOB_RETENTION_DAYS", DEFAULT_RETENTION_DAYS))
+    return BatchJobManager(path, cache=cache, retention_days=retention_days)
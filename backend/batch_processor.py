@@ -0,0 +1,169 @@
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.resume_parser import parse_resume_bytes, clean_text
+from backend.matcher import generate_match_scores_batch
+from backend.result_cache import content_key
+from utils.gemini_helper import analyze_skill_gaps
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+# Parsed resumes are scored in groups of this size so results keep flowing
+SCORE_BATCH_SIZE = 16
+
+
+def iter_batch_results(resumes, job_text, workers=None, score_batch_size=SCORE_BATCH_SIZE, cache=None):
+    """Parse and score a batch of resumes, yielding results as they finish.
+
+    ``resumes`` is a list of (filename, pdf_bytes). PDF parsing runs in a pool
+    of ``workers`` processes; embedding and scoring stay in this process and
+    are batched. Every yielded item is a result dict; a file that fails is
+    reported as ``{"filename": ..., "error": ...}`` without affecting the rest.
+
+    With a ResultCache, a file already scored against this job is returned
+    straight from the cache, and one parsed before is not parsed again.
+    """
+    workers = workers or DEFAULT_WORKERS
+    pending = []
+    to_parse = []
+
+    for filename, pdf_bytes in resumes:
+        pdf_key = None
+        if cache is not None:
+            pdf_key = content_key("pdf", pdf_bytes)
+            result = cache.get(content_key("result", pdf_key, job_text))
+            if result is not None:
+                yield dict(result, filename=filename)
+                continue
+            parsed = cache.get(pdf_key)
+            if parsed is not None:
+                pending.append(((filename, pdf_key), parsed))
+                continue
+        to_parse.append(((filename, pdf_key), pdf_bytes))
+
+    for tag, outcome in _iter_parsed(to_parse, workers):
+        if isinstance(outcome, Exception):
+            yield {"filename": tag[0], "error": str(outcome)}
+            continue
+
+        if cache is not None:
+            cache.put(tag[1], outcome)
+        pending.append((tag, outcome))
+        if len(pending) >= score_batch_size:
+            yield from _score_pending(pending, job_text, cache)
+            pending = []
+
+    if pending:
+        yield from _score_pending(pending, job_text, cache)
+
+
+def process_resume_batch(resumes, job_text, workers=None, on_result=None):
+    """Run iter_batch_results to completion; returns (results, errors).
+
+    ``on_result(done, total, result)`` is called after every finished file.
+    """
+    results, errors = [], []
+    total = len(resumes)
+    for done, result in enumerate(iter_batch_results(resumes, job_text, workers), 1):
+        (errors if "error" in result else results).append(result)
+        if on_result:
+            on_result(done, total, result)
+    return results, errors
+
+
+def _iter_parsed(resumes, workers):
+    # Items are (tag, pdf_bytes); each outcome is yielded with its tag
+    if workers <= 1 or len(resumes) <= 1:
+        for tag, pdf_bytes in resumes:
+            try:
+                yield tag, parse_resume_bytes(pdf_bytes)
+            except Exception as e:
+                yield tag, e
+        return
+
+    # Prefer fork: spawn and forkserver import the caller's __main__ in every
+    # worker, and under Streamlit that is the whole app script. The caller
+    # has other threads running; the workers only parse PDFs, and the one
+    # lock they take (utils.metrics) is re-created in the child after fork
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    with ProcessPoolExecutor(max_workers=min(workers, len(resumes)), mp_context=context) as pool:
+        futures = {
+            pool.submit(parse_resume_bytes, pdf_bytes): tag
+            for tag, pdf_bytes in resumes
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+
+
+def _score_pending(pending, job_text, cache=None):
+    cleaned_texts = [clean_text(resume_text) for _, (resume_text, _) in pending]
+    try:
+        scores = generate_match_scores_batch(cleaned_texts, job_text)
+    except Exception as e:
+        for (filename, _), _ in pending:
+            yield {"filename": filename, "error": f"Scoring failed: {e}"}
+        return
+
+    for ((filename, pdf_key), (resume_text, resume_data)), (score, reasoning) in zip(pending, scores):
+        try:
+            result = build_result(filename, resume_text, resume_data, score, reasoning, job_text)
+        except Exception as e:
+            yield {"filename": filename, "error": str(e)}
+            continue
+        if cache is not None:
+            cache.put(content_key("result", pdf_key, job_text), result)
+        yield result
+
+
+def build_result(filename, resume_text, resume_data, score, reasoning, job_text):
+    """Assemble the per-candidate record shown in the recruiter dashboard"""
+    # Analyze skills
+    skills = resume_data.get('skills', [])
+    skill_analysis = analyze_skill_gaps(skills, job_text)
+
+    return {
+        'filename': filename,
+        'name': resume_data.get('name', 'Not Found'),
+        'email': resume_data.get('email', 'Not Found'),
+        'phone': resume_data.get('phone', 'Not Found'),
+        'match_score': score,
+        'reasoning': reasoning,
+        'skills': skills,
+        'matching_skills': skill_analysis["matching_skills"],
+        'missing_skills': skill_analysis["missing_skills"],
+        'skill_match_percent': skill_analysis["match_percentage"],
+        'resume_text': resume_text[:300] + "..." if len(resume_text) > 300 else resume_text
+    }
+
+
+if __name__ == "__main__":
+    # Usage: python backend/batch_processor.py job.txt resume1.pdf resume2.pdf ... [--workers N]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score a folder of resumes against one job description")
+    parser.add_argument("job_file")
+    parser.add_argument("resume_files", nargs="+")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    with open(args.job_file, "r", encoding="utf-8") as f:
+        job_text = f.read()
+
+    batch = []
+    for path in args.resume_files:
+        with open(path, "rb") as f:
+            batch.append((os.path.basename(path), f.read()))
+
+    for result in iter_batch_results(batch, job_text, workers=args.workers):
+        print(json.dumps(result, default=str))
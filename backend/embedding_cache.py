@@ -0,0 +1,173 @@
+import hashlib
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from backend.sqlite_store import ProcessLocalConnection
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_CACHE_PATH = os.path.join(BASE_DIR, "..", "data", "embedding_cache.sqlite")
+DEFAULT_MAX_ENTRIES = 100_000  # ~150 MB of 384-dim float32 vectors
+
+# last_used only needs to be right to within this many seconds for LRU eviction
+TOUCH_INTERVAL = 300
+# Buffered last_used updates are written once this many have piled up
+TOUCH_BATCH = 500
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different copies share a cache entry"""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class EmbeddingCache:
+    """Disk-backed, content-addressed store of float32 embeddings.
+
+    Entries are keyed by a SHA-256 of the model name and the normalized text,
+    stored in SQLite as raw float32 blobs and evicted least-recently-used once
+    the table grows past ``max_entries``. Reads do not write: a hit only
+    queues a last_used update when the stored value is older than
+    TOUCH_INTERVAL, and queued updates go out in batches. Each process
+    opens its own connection on first use, so the cache survives fork.
+    """
+
+    def __init__(self, path, model_name, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touches = {}  # key -> last_used waiting to be written
+        self._last_touch_flush = time.time()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = ProcessLocalConnection(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key BLOB PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @property
+    def _conn(self):
+        return self._db.get()
+
+    def key_for(self, text):
+        digest = hashlib.sha256()
+        digest.update(self.model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_text(text).encode("utf-8"))
+        return digest.digest()
+
+    def get_many(self, texts):
+        """Return a list with a cached vector, or None, for every text"""
+        keys = [self.key_for(text) for text in texts]
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector, last_used FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                now = time.time()
+                for key, blob, last_used in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+                    if last_used < now - TOUCH_INTERVAL:
+                        self._touches[key] = now
+
+            if len(self._touches) >= TOUCH_BATCH or (
+                    self._touches and time.time() - self._last_touch_flush > TOUCH_INTERVAL):
+                self._flush_touches()
+                self._conn.commit()
+
+            vectors = [found.get(key) for key in keys]
+            hits = sum(1 for vector in vectors if vector is not None)
+            self.hits += hits
+            self.misses += len(vectors) - hits
+        return vectors
+
+    def put_many(self, texts, vectors):
+        """Store vectors for texts, evicting the oldest entries if over capacity"""
+        now = time.time()
+        rows = [
+            (self.key_for(text), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+            )
+            self._size += self._conn.total_changes - before
+            # Already in a write transaction, so queued touches ride along
+            self._flush_touches()
+            if self._size > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _flush_touches(self):
+        if self._touches:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touches.items()]
+            )
+            self._touches = {}
+        self._last_touch_flush = time.time()
+
+    def _evict(self):
+        # Another process may share the file, so recount before deleting
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = self._size - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            self._size -= excess
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._size,
+            "max_entries": self.max_entries,
+        }
+
+    def close(self):
+        """Write queued last_used updates and close this process's connection"""
+        with self._lock:
+            if self._touches:
+                self._flush_touches()
+                self._conn.commit()
+            self._db.close()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._touches = {}
+            self._size = 0
+
+
+def open_default_cache(model_name):
+    """Open the cache configured by EMBEDDING_CACHE_PATH / EMBEDDING_CACHE_SIZE.
+
+    Setting EMBEDDING_CACHE_PATH to an empty string disables caching.
+    """
+    path = os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+    if not path:
+        return None
+    max_entries = int(os.getenv("EMBEDDING_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+    return EmbeddingCache(path, model_name, max_entries=max_entries)
@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.vector_index import VectorIndex
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_JOB_LIBRARY_PATH = os.path.join(BASE_DIR, "..", "data", "job_library.sqlite")
+
+
+def open_job_library():
+    """Open the open-roles library configured by JOB_LIBRARY_PATH (an empty value disables it).
+
+    Each job is stored once with its normalized embedding and, as metadata,
+    its title, domain, domain keyword counts and required skills, so ranking
+    a resume never re-processes job descriptions.
+    """
+    path = os.getenv("JOB_LIBRARY_PATH", DEFAULT_JOB_LIBRARY_PATH)
+    if not path:
+        return None
+    return VectorIndex(path)
+
+
+def load_job_files(paths):
+    """Read job descriptions from .txt files (id and title from the file name) or .jsonl files.
+
+    JSONL lines hold {"id", "title", "text"}.
+    """
+    jobs = []
+    for path in paths:
+        if path.endswith(".jsonl"):
+            with open(path, "r", encoding="utf-8") as f:
+                jobs.extend(json.loads(line) for line in f if line.strip())
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        job_id = os.path.splitext(os.path.basename(path))[0]
+        jobs.append({"id": job_id, "title": job_id.replace("_", " ").title(), "text": text})
+    return jobs
+
+
+if __name__ == "__main__":
+    # Usage: python backend/job_library.py jobs/*.txt open_roles.jsonl [--remove ID ...]
+    import argparse
+
+    from backend.matcher import index_jobs, job_library
+
+    parser = argparse.ArgumentParser(description="Add or remove open roles in the job library")
+    parser.add_argument("job_files", nargs="*")
+    parser.add_argument("--remove", nargs="+", default=[], metavar="ID")
+    args = parser.parse_args()
+
+    if job_library is None:
+        sys.exit("JOB_LIBRARY_PATH is empty; the job library is disabled")
+    if args.remove:
+        job_library.remove(args.remove)
+    if args.job_files:
+        index_jobs(load_job_files(args.job_files))
+    print(f"✅ Job library holds {len(job_library)} open roles")
@@ -1,14 +1,40 @@
-from models.model import load_model_and_tokenizer
+from models.model import embedding_model, EMBEDDING_MODEL_ID
+from backend.embedding_cache import open_default_cache, normalize_text
+from backend.vector_index import open_default_index
+from backend.job_library import open_job_library
+from backend.resume_parser import clean_text, find_skills
+from utils.gemini_helper import extract_required_skills, compare_skills
+from utils.keyword_engine import KeywordMatcher
+from utils.metrics import registry, cache_collector, timed
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+import hashlib
 import re
 
-model, tokenizer = load_model_and_tokenizer()
+# The sentence-transformer loads on first use (or via embedding_model.warmup())
+embedding_cache = open_default_cache(EMBEDDING_MODEL_ID)
 
+registry.add_collector(cache_collector("embedding", embedding_cache))
+
+# Resume embeddings saved at ingest time, searched by find_top_candidates
+resume_index = open_default_index()
+
+# Open roles with embeddings, domains and required skills precomputed
+job_library = open_job_library()
+
+def close_stores():
+    """Close this process's SQLite connections; each store reopens on next use"""
+    for store in (embedding_cache, resume_index, job_library):
+        if store is not None:
+            store.close()
+
+# Number of resumes sent to the encoder per forward pass in batch scoring
+ENCODE_BATCH_SIZE = 32
+
+@timed("match_score")
 def generate_match_score(resume_text, job_text):
     # Get base semantic similarity
-    resume_vec = model.encode(resume_text)
-    job_vec = model.encode(job_text)
+    resume_vec, job_vec = embed_texts([resume_text, job_text])
     base_score = cosine_similarity([resume_vec], [job_vec])[0][0] * 100
     
     # Apply domain-aware adjustments
@@ -16,58 +42,260 @@ def generate_match_score(resume_text, job_text):
     
     return adjusted_score, reasoning
 
+@timed("match_score_batch")
+def generate_match_scores_batch(resume_texts, job_text, batch_size=ENCODE_BATCH_SIZE):
+    """Score many resumes against one job description.
+
+    The job is embedded once and resumes are embedded in length-sorted
+    mini-batches, so padding inside each batch stays small. Returns a list of
+    (score, reasoning) tuples in the same order as resume_texts.
+    """
+    resume_texts = list(resume_texts)
+    if not resume_texts:
+        return []
+
+    job_vec = _normalize_rows(embed_texts([job_text]))[0]
+    resume_vecs = _normalize_rows(embed_texts(resume_texts, batch_size))
+
+    # One matrix-vector product gives the cosine similarity for every resume
+    base_scores = resume_vecs @ job_vec * 100
+
+    return apply_domain_matching_batch(resume_texts, job_text, base_scores)
+
+def resume_id_for(resume_text):
+    """Content hash used as a resume's id in the candidate index"""
+    return hashlib.sha256(normalize_text(resume_text).encode("utf-8")).hexdigest()
+
+def index_resumes(resume_texts, metadata=None):
+    """Embed resumes and store them in the candidate index; returns their ids.
+
+    Texts are cleaned the same way the ATS tab cleans them before scoring,
+    so stored candidates score like freshly uploaded ones.
+    """
+    if resume_index is None:
+        return []
+    cleaned_texts = [clean_text(text) for text in resume_texts]
+    resume_ids = [resume_id_for(text) for text in cleaned_texts]
+    metadata = [
+        dict(meta or {}, domain=domain)
+        for domain, meta in zip(detect_domains(cleaned_texts), metadata or [None] * len(cleaned_texts))
+    ]
+    resume_index.add(resume_ids, embed_texts(cleaned_texts), metadata)
+    return resume_ids
+
+def remove_indexed_resumes(resume_ids):
+    """Drop resumes from the candidate index"""
+    if resume_index is not None:
+        resume_index.remove(resume_ids)
+
+def find_top_candidates(job_text, k=10, filters=None):
+    """Rank stored resumes against a job description without re-embedding them.
+
+    Scores match generate_match_score: cosine similarity scaled by the same
+    domain adjustment, which is applied to every stored resume before the
+    top k are picked. ``filters`` restricts results by stored metadata, e.g.
+    ``{"predicted_label": ["Data Science", "Web Development"]}``.
+    """
+    if resume_index is None:
+        return []
+
+    job_vec = embed_texts([job_text])[0]
+    job_domain = detect_domain(job_text)
+    # The multiplier adjust_for_domains applies to each possible resume domain
+    factors = {
+        domain: adjust_for_domains(domain, job_domain, 1.0)[0]
+        for domain in list(domain_matcher.categories) + ['general']
+    }
+
+    candidates = []
+    for resume_id, similarity, metadata in resume_index.search(job_vec, k, filters, {"domain": factors}):
+        score, reasoning = adjust_for_domains(metadata.get("domain", "general"), job_domain, similarity * 100)
+        candidates.append(dict(metadata, id=resume_id, match_score=score, reasoning=reasoning))
+    return candidates
+
+def index_jobs(jobs, batch_size=ENCODE_BATCH_SIZE):
+    """Add or replace open roles in the job library.
+
+    ``jobs`` is a list of dicts with ``id``, ``title`` and ``text``. Everything
+    rank_jobs_for_resume needs from a job is computed here, once.
+    """
+    if job_library is None:
+        return []
+    jobs = list(jobs)
+    texts = [job["text"] for job in jobs]
+    metadata = []
+    for job, text in zip(jobs, texts):
+        counts = domain_matcher.count(text)
+        metadata.append({
+            "title": job.get("title", job["id"]),
+            "domain": domain_from_counts(counts),
+            "domain_counts": counts,
+            "required_skills": extract_required_skills(text),
+            "preview": text[:300],
+        })
+    job_ids = [str(job["id"]) for job in jobs]
+    job_library.add(job_ids, embed_texts(texts, batch_size), metadata)
+    return job_ids
+
+def rank_jobs_for_resume(resume_text, k=10, resume_skills=None):
+    """Score one resume against every job in the library and return the best k.
+
+    One matrix-vector product gives the similarity to all jobs and the domain
+    adjustment is applied per job domain before the top k are picked, so each
+    score equals generate_match_score(resume_text, job_text).
+    """
+    if job_library is None:
+        return []
+
+    resume_vec = embed_texts([resume_text])[0]
+    resume_domain = detect_domain(resume_text)
+    factors = {
+        domain: adjust_for_domains(resume_domain, domain, 1.0)[0]
+        for domain in list(domain_matcher.categories) + ['general']
+    }
+    if resume_skills is None:
+        resume_skills = list(dict.fromkeys(skill for skill, _, _ in find_skills(resume_text)))
+
+    ranked = []
+    for job_id, similarity, metadata in job_library.search(resume_vec, k, weights={"domain": factors}):
+        score, reasoning = adjust_for_domains(resume_domain, metadata.get("domain", "general"), similarity * 100)
+        skill_analysis = compare_skills(resume_skills, metadata.get("required_skills", []))
+        ranked.append({
+            "id": job_id,
+            "title": metadata.get("title", job_id),
+            "domain": metadata.get("domain", "general"),
+            "match_score": score,
+            "reasoning": reasoning,
+            "matching_skills": skill_analysis["matching_skills"],
+            "missing_skills": skill_analysis["missing_skills"],
+            "skill_match_percent": skill_analysis["match_percentage"],
+        })
+    return ranked
+
+@timed("embedding")
+def embed_texts(texts, batch_size=ENCODE_BATCH_SIZE):
+    """Embed texts, reusing cached vectors and encoding only the misses"""
+    if embedding_cache is None:
+        return encode_sorted_batches(texts, batch_size)
+
+    cached = embedding_cache.get_many(texts)
+    missing = [i for i, vector in enumerate(cached) if vector is None]
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        fresh = encode_sorted_batches(missing_texts, batch_size)
+        embedding_cache.put_many(missing_texts, fresh)
+        for i, vector in zip(missing, fresh):
+            cached[i] = vector
+    return np.vstack(cached).astype(np.float32, copy=False)
+
+def encode_sorted_batches(texts, batch_size=ENCODE_BATCH_SIZE):
+    """Embed texts in length-sorted mini-batches, returned in input order"""
+    model, _ = embedding_model.get()
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    embeddings = None
+    for start in range(0, len(order), batch_size):
+        batch_idx = order[start:start + batch_size]
+        batch_vecs = model.encode([texts[i] for i in batch_idx], batch_size=len(batch_idx))
+        if embeddings is None:
+            embeddings = np.empty((len(texts), batch_vecs.shape[1]), dtype=batch_vecs.dtype)
+        embeddings[batch_idx] = batch_vecs
+    return embeddings
+
+def _normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+@timed("domain_matching")
 def apply_domain_matching(resume_text, job_text, base_score):
     """Apply domain-aware matching to penalize cross-field mismatches"""
     
-    resume_lower = resume_text.lower()
-    job_lower = job_text.lower()
-    
-    # Define domain-specific keywords
-    tech_keywords = [
-        'programming', 'software', 'developer', 'engineer', 'coding', 'python', 
-        'javascript', 'java', 'react', 'node.js', 'database', 'api', 'frontend', 
-        'backend', 'fullstack', 'web development', 'mobile app', 'algorithm',
-        'data structure', 'git', 'github', 'docker', 'aws', 'cloud', 'devops',
-        'machine learning', 'ai', 'artificial intelligence', 'html', 'css',
-        'framework', 'library', 'debugging', 'testing', 'deployment'
-    ]
-    
-    commerce_keywords = [
-        'sales', 'marketing', 'business', 'commerce', 'retail', 'customer service',
-        'accounting', 'finance', 'economics', 'trade', 'procurement', 'supply chain',
-        'inventory', 'merchandising', 'e-commerce', 'business development',
-        'market research', 'advertising', 'promotion', 'brand', 'revenue',
-        'profit', 'budget', 'financial analysis', 'crm', 'lead generation'
-    ]
+    # Determine dominant domains
+    resume_domain = detect_domain(resume_text)
+    job_domain = detect_domain(job_text)
     
-    hr_keywords = [
-        'human resources', 'recruitment', 'hiring', 'talent acquisition',
-        'employee relations', 'payroll', 'benefits', 'training', 'onboarding',
-        'performance management', 'hr policies', 'compliance', 'workforce'
+    return adjust_for_domains(resume_domain, job_domain, base_score)
+
+def apply_domain_matching_batch(resume_texts, job_text, base_scores):
+    """apply_domain_matching for many resumes against one job; returns (score, reasoning) per resume"""
+    job_domain = detect_domain(job_text)
+    return [
+        adjust_for_domains(resume_domain, job_domain, float(base_score))
+        for resume_domain, base_score in zip(detect_domains(resume_texts), base_scores)
     ]
+
+# Need at least this many distinct keywords to be considered domain-specific
+MIN_DOMAIN_KEYWORDS = 3
+
+# Define domain-specific keywords
+TECH_KEYWORDS = [
+    'programming', 'software', 'developer', 'engineer', 'coding', 'python', 
+    'javascript', 'java', 'react', 'node.js', 'database', 'api', 'frontend', 
+    'backend', 'fullstack', 'web development', 'mobile app', 'algorithm',
+    'data structure', 'git', 'github', 'docker', 'aws', 'cloud', 'devops',
+    'machine learning', 'ai', 'artificial intelligence', 'html', 'css',
+    'framework', 'library', 'debugging', 'testing', 'deployment'
+]
+
+COMMERCE_KEYWORDS = [
+    'sales', 'marketing', 'business', 'commerce', 'retail', 'customer service',
+    'accounting', 'finance', 'economics', 'trade', 'procurement', 'supply chain',
+    'inventory', 'merchandising', 'e-commerce', 'business development',
+    'market research', 'advertising', 'promotion', 'brand', 'revenue',
+    'profit', 'budget', 'financial analysis', 'crm', 'lead generation'
+]
+
+HR_KEYWORDS = [
+    'human resources', 'recruitment', 'hiring', 'talent acquisition',
+    'employee relations', 'payroll', 'benefits', 'training', 'onboarding',
+    'performance management', 'hr policies', 'compliance', 'workforce'
+]
+
+HEALTHCARE_KEYWORDS = [
+    'medical', 'healthcare', 'hospital', 'patient', 'clinical', 'nursing',
+    'doctor', 'physician', 'treatment', 'diagnosis', 'pharmaceutical',
+    'medical device', 'health', 'medicine', 'therapy'
+]
+
+# Compiled once so each document is scanned a single time for all domains
+domain_matcher = KeywordMatcher({
+    'technology': TECH_KEYWORDS,
+    'commerce': COMMERCE_KEYWORDS,
+    'hr': HR_KEYWORDS,
+    'healthcare': HEALTHCARE_KEYWORDS
+})
+
+def detect_domain(text):
+    """Return the dominant domain of a single document"""
     
-    healthcare_keywords = [
-        'medical', 'healthcare', 'hospital', 'patient', 'clinical', 'nursing',
-        'doctor', 'physician', 'treatment', 'diagnosis', 'pharmaceutical',
-        'medical device', 'health', 'medicine', 'therapy'
+    # Count domain keywords in the text
+    return domain_from_counts(domain_matcher.count(text))
+
+def detect_domains(texts):
+    """detect_domain for many documents at once.
+
+    All keyword counts come from one sparse product, and the dominant
+    domain is a row-wise argmax. Ties and the threshold behave exactly as
+    in get_dominant_domain, so each result matches detect_domain.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    counts = domain_matcher.count_matrix(texts)  # columns follow domain_matcher.categories
+    best = counts.argmax(axis=1)  # first maximum, like max() over the dict
+    return [
+        domain_matcher.categories[i] if counts[row, i] >= MIN_DOMAIN_KEYWORDS else 'general'
+        for row, i in enumerate(best)
     ]
-    
-    # Count domain keywords in resume and job
-    resume_tech_count = sum(1 for keyword in tech_keywords if keyword in resume_lower)
-    resume_commerce_count = sum(1 for keyword in commerce_keywords if keyword in resume_lower)
-    resume_hr_count = sum(1 for keyword in hr_keywords if keyword in resume_lower)
-    resume_healthcare_count = sum(1 for keyword in healthcare_keywords if keyword in resume_lower)
-    
-    job_tech_count = sum(1 for keyword in tech_keywords if keyword in job_lower)
-    job_commerce_count = sum(1 for keyword in commerce_keywords if keyword in job_lower)
-    job_hr_count = sum(1 for keyword in hr_keywords if keyword in job_lower)
-    job_healthcare_count = sum(1 for keyword in healthcare_keywords if keyword in job_lower)
-    
-    # Determine dominant domains
-    resume_domain = get_dominant_domain(resume_tech_count, resume_commerce_count, 
-                                      resume_hr_count, resume_healthcare_count)
-    job_domain = get_dominant_domain(job_tech_count, job_commerce_count, 
-                                   job_hr_count, job_healthcare_count)
+
+def domain_from_counts(counts):
+    """Dominant domain from precomputed domain keyword counts"""
+    return get_dominant_domain(counts.get('technology', 0), counts.get('commerce', 0),
+                               counts.get('hr', 0), counts.get('healthcare', 0))
+
+def adjust_for_domains(resume_domain, job_domain, base_score):
+    """Scale a semantic score according to the resume and job domains"""
     
     # Apply domain matching logic
     if resume_domain == job_domain and resume_domain != 'general':
@@ -106,8 +334,8 @@ def get_dominant_domain(tech_count, commerce_count, hr_count, healthcare_count):
     
     max_count = max(domain_counts.values())
     
-    # Need at least 3 keywords to be considered domain-specific
-    if max_count >= 3:
+    # Need at least MIN_DOMAIN_KEYWORDS keywords to be considered domain-specific
+    if max_count >= MIN_DOMAIN_KEYWORDS:
         return max(domain_counts, key=domain_counts.get)
     else:
         return 'general'
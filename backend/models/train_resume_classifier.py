@@ -1,35 +1,200 @@
+import argparse
+import os
+import sys
+import time
+import zlib
+
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import classification_report
-import joblib
-import os
-import pickle
 
-# Load cleaned data
-data = pd.read_csv("backend/data/cleaned_resume_dataset.csv")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from models.classifier_artifacts import save_classifier
+
+DEFAULT_DATA_PATH = "data/cleaned_resume_dataset.parquet"
+DEFAULT_OUTPUT_DIR = "backend/models/resume_classifier"
+
+# Streaming mode defaults
+DEFAULT_CHUNK_ROWS = 10000
+DEFAULT_SHUFFLE_BUFFER = 50000
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_N_FEATURES = 2 ** 18
+DEFAULT_HOLDOUT = 0.1
+
+
+def read_dataset(data_path, columns=("text", "label")):
+    if data_path.endswith(".parquet"):
+        return pd.read_parquet(data_path, columns=list(columns))
+    return pd.read_csv(data_path, usecols=list(columns))
+
+
+def train_in_memory(data_path, output_dir):
+    """Original mode: TF-IDF + LogisticRegression fitted on the whole dataset at once"""
+    data = read_dataset(data_path)
+
+    # Split features and labels
+    X = data['text']
+    y = data['label']
+
+    # Vectorize text using TF-IDF
+    vectorizer = TfidfVectorizer(stop_words='english', max_features=3000)
+    X_vect = vectorizer.fit_transform(X)
+
+    # Train a Logistic Regression model
+    model = LogisticRegression(max_iter=1000)
+    model.fit(X_vect, y)
+
+    # Evaluate
+    y_pred = model.predict(X_vect)
+    print(classification_report(y, y_pred))
+
+    save_classifier(output_dir, model, vectorizer)
+
+
+def iter_chunks(data_path, chunk_rows, columns=("text", "label")):
+    """Yield DataFrame chunks of at most chunk_rows rows, never the whole file"""
+    if data_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(data_path).iter_batches(batch_size=chunk_rows, columns=list(columns)):
+            yield batch.to_pandas().dropna()
+        return
+    for chunk in pd.read_csv(data_path, usecols=list(columns), chunksize=chunk_rows):
+        yield chunk.dropna()
+
+
+def is_holdout(text, fraction):
+    # Stable across epochs and runs, so held-out rows are never trained on
+    return zlib.crc32(str(text).encode("utf-8")) % 10000 < fraction * 10000
+
+
+def collect_classes(data_path, chunk_rows):
+    """One cheap pass over the label column; partial_fit needs every class up front"""
+    classes = set()
+    for chunk in iter_chunks(data_path, chunk_rows, columns=("label",)):
+        classes.update(chunk["label"].unique().tolist())
+    return np.array(sorted(classes))
+
+
+def iter_shuffled(data_path, chunk_rows, buffer_rows, holdout, rng):
+    """Training rows in approximately random order, holding at most buffer_rows in memory.
+
+    Rows are drawn at random from a buffer that refills from the stream,
+    so datasets sorted by category still mix within each mini-batch.
+    """
+    texts, labels = [], []
+    for chunk in iter_chunks(data_path, chunk_rows):
+        for text, label in zip(chunk["text"].astype(str), chunk["label"]):
+            if is_holdout(text, holdout):
+                continue
+            if len(texts) < buffer_rows:
+                texts.append(text)
+                labels.append(label)
+                continue
+            i = rng.integers(len(texts))
+            yield texts[i], labels[i]
+            texts[i], labels[i] = text, label
+    for i in rng.permutation(len(texts)):
+        yield texts[i], labels[i]
+
+
+def evaluate(model, vectorizer, data_path, chunk_rows, holdout, classes):
+    """Held-out accuracy, macro F1 and log loss, from a confusion matrix kept in memory"""
+    index = {label: i for i, label in enumerate(classes)}
+    confusion = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    log_loss_sum, rows = 0.0, 0
+    for chunk in iter_chunks(data_path, chunk_rows):
+        texts = chunk["text"].astype(str)
+        mask = np.array([is_holdout(text, holdout) for text in texts], dtype=bool)
+        if not mask.any():
+            continue
+        X = vectorizer.transform(texts[mask])
+        y_true = np.array([index[label] for label in chunk["label"][mask]])
+        proba = model.predict_proba(X)
+        np.add.at(confusion, (y_true, proba.argmax(axis=1)), 1)
+        log_loss_sum -= np.log(np.clip(proba[np.arange(len(y_true)), y_true], 1e-15, 1.0)).sum()
+        rows += len(y_true)
+
+    if not rows:
+        return {"rows": 0}
+    true_positive = np.diag(confusion).astype(float)
+    precision = np.divide(true_positive, confusion.sum(axis=0), out=np.zeros(len(classes)), where=confusion.sum(axis=0) > 0)
+    recall = np.divide(true_positive, confusion.sum(axis=1), out=np.zeros(len(classes)), where=confusion.sum(axis=1) > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros(len(classes)), where=(precision + recall) > 0)
+    present = confusion.sum(axis=1) > 0
+    return {
+        "rows": rows,
+        "accuracy": true_positive.sum() / rows,
+        "macro_f1": f1[present].mean(),
+        "log_loss": log_loss_sum / rows,
+    }
+
+
+def train_streaming(data_path, output_dir, epochs=5, chunk_rows=DEFAULT_CHUNK_ROWS,
+                    buffer_rows=DEFAULT_SHUFFLE_BUFFER, batch_size=DEFAULT_BATCH_SIZE,
+                    n_features=DEFAULT_N_FEATURES, holdout=DEFAULT_HOLDOUT, alpha=1e-5, seed=0):
+    """Out-of-core mode: hashed features and SGD logistic regression trained with partial_fit.
+
+    Memory is bounded by chunk_rows, buffer_rows and the model itself
+    (n_features x classes), not by the dataset size. A fixed share of rows,
+    picked by hashing their text, is held out and scored after every epoch.
+    """
+    # Stateless, so nothing has to be fitted or held for the vocabulary
+    vectorizer = HashingVectorizer(stop_words='english', n_features=n_features,
+                                   alternate_sign=False, norm='l2')
+    model = SGDClassifier(loss="log_loss", alpha=alpha, random_state=seed)
+    classes = collect_classes(data_path, chunk_rows)
+    rng = np.random.default_rng(seed)
+    print(f"{len(classes)} classes, {n_features} hashed features, {holdout:.0%} held out")
+
+    for epoch in range(1, epochs + 1):
+        start = time.perf_counter()
+        texts, labels, trained = [], [], 0
+        for text, label in iter_shuffled(data_path, chunk_rows, buffer_rows, holdout, rng):
+            texts.append(text)
+            labels.append(label)
+            if len(texts) == batch_size:
+                model.partial_fit(vectorizer.transform(texts), labels, classes=classes)
+                trained += len(texts)
+                texts, labels = [], []
+        if texts:
+            model.partial_fit(vectorizer.transform(texts), labels, classes=classes)
+            trained += len(texts)
 
-# Split features and labels
-X = data['text']
-y = data['label']
+        metrics = evaluate(model, vectorizer, data_path, chunk_rows, holdout, classes)
+        if metrics["rows"]:
+            print(f"epoch {epoch}: trained on {trained} rows in {time.perf_counter() - start:.1f}s | "
+                  f"held-out {metrics['rows']} rows: accuracy {metrics['accuracy']:.4f}, "
+                  f"macro F1 {metrics['macro_f1']:.4f}, log loss {metrics['log_loss']:.4f}")
+        else:
+            print(f"epoch {epoch}: trained on {trained} rows (no held-out rows)")
 
-# Vectorize text using TF-IDF
-vectorizer = TfidfVectorizer(stop_words='english', max_features=3000)
-X_vect = vectorizer.fit_transform(X)
+    save_classifier(output_dir, model, vectorizer)
 
-# Train a Logistic Regression model
-model = LogisticRegression(max_iter=1000)
-model.fit(X_vect, y)
 
-# Evaluate
-y_pred = model.predict(X_vect)
-print(classification_report(y, y_pred))
+if __name__ == "__main__":
+    # Usage: python backend/models/train_resume_classifier.py --stream --epochs 5 big_corpus.parquet
+    parser = argparse.ArgumentParser(description="Train the resume role classifier")
+    parser.add_argument("data", nargs="?", default=DEFAULT_DATA_PATH, help="Parquet or CSV with text and label columns")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--stream", action="store_true", help="Out-of-core training for datasets larger than memory")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--shuffle-buffer", type=int, default=DEFAULT_SHUFFLE_BUFFER)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--n-features", type=int, default=DEFAULT_N_FEATURES)
+    parser.add_argument("--holdout", type=float, default=DEFAULT_HOLDOUT, help="Share of rows held out for metrics")
+    parser.add_argument("--alpha", type=float, default=1e-5, help="SGD regularization strength")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
 
-# Save model and vectorizer
-os.makedirs("backend/models", exist_ok=True)
-with open("backend/models/resume_classifier.pkl", "wb") as f:
-    pickle.dump(model, f)
-with open("backend/models/vectorizer.pkl", "wb") as f:
-    pickle.dump(vectorizer, f)
+    if args.stream:
+        train_streaming(args.data, args.output, args.epochs, args.chunk_rows, args.shuffle_buffer,
+                        args.batch_size, args.n_features, args.holdout, args.alpha, args.seed)
+    else:
+        train_in_memory(args.data, args.output)
 
-print("✅ Model and vectorizer saved to backend/models/")
+    print(f"✅ Model and vectorizer saved to {args.output}/")
@@ -0,0 +1,13 @@
+from io import BytesIO
+
+from PyPDF2 import PdfReader
+
+from utils.metrics import timed
+
+
+@timed("pdf_extraction")
+def extract_text_from_pdf(pdf_bytes: bytes) -> str:
+    # Parse straight from memory; nothing is written to disk
+    reader = PdfReader(BytesIO(pdf_bytes))
+    pages = (page.extract_text() for page in reader.pages)
+    return "\n".join(text for text in pages if text)
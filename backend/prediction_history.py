@@ -0,0 +1,278 @@
+import datetime
+import threading
+import time
+from collections import Counter, OrderedDict
+
+# Columns the History tab shows; original_text is never fetched here
+HISTORY_COLUMNS = ["id", "filename", "predicted_label", "user_email", "created_at"]
+
+# Postgres function defined in backend/sql/prediction_history.sql
+SUMMARY_FUNCTION = "prediction_history_summary"
+
+# Reads the trigger-maintained aggregate tables in backend/sql/prediction_stats.sql
+STATS_FUNCTION = "prediction_stats_summary"
+
+# Seconds before HistorySync tries the aggregate tables again after an error
+STATS_RETRY_SECONDS = 60
+
+# PostgREST and Postgres error codes for a function that does not exist
+MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+
+
+def make_filters(role=None, user_email=None, date_range=None, search=None):
+    """Normalize the History tab's widget values into a filters dict.
+
+    ``None`` (or an "All ..." choice turned into ``None`` by the caller)
+    means no filter. The dict only holds plain values so it can be used as a
+    Streamlit cache key.
+    """
+    start_date = end_date = None
+    if date_range and len(date_range) == 2:
+        start_date, end_date = date_range
+    return {
+        "role": role or None,
+        "user_email": user_email or None,
+        "start_date": start_date.isoformat() if start_date else None,
+        "end_date": end_date.isoformat() if end_date else None,
+        "search": (search or "").strip() or None,
+    }
+
+
+def apply_filters(query, filters):
+    """Add the filters to a PostgREST query so the database does the filtering"""
+    filters = filters or {}
+    if filters.get("role"):
+        query = query.eq("predicted_label", filters["role"])
+    if filters.get("user_email"):
+        query = query.eq("user_email", filters["user_email"])
+    if filters.get("start_date"):
+        query = query.gte("created_at", filters["start_date"])
+    if filters.get("end_date"):
+        # Inclusive end date: everything before the start of the next day
+        next_day = datetime.date.fromisoformat(filters["end_date"]) + datetime.timedelta(days=1)
+        query = query.lt("created_at", next_day.isoformat())
+    if filters.get("search"):
+        query = query.ilike("filename", f"%{escape_like(filters['search'])}%")
+    return query
+
+
+def escape_like(text):
+    """Escape LIKE wildcards so the search box matches its text literally"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def is_missing_function(error):
+    """True if an RPC failed because the SQL function is not installed"""
+    code = getattr(error, "code", None)
+    if code is None and error.args and isinstance(error.args[0], dict):
+        code = error.args[0].get("code")
+    return code in MISSING_FUNCTION_CODES
+
+
+def fetch_page(client, filters=None, page_size=25, before_id=None, columns=HISTORY_COLUMNS, table="resumes"):
+    """Return one page of rows, newest first, and the cursor for the next page.
+
+    Pages are keyed by id rather than offset, so every page costs the same
+    no matter how deep into the history it is. The returned cursor is None
+    on the last page.
+    """
+    query = client.table(table).select(",".join(columns))
+    query = apply_filters(query, filters)
+    if before_id is not None:
+        query = query.lt("id", before_id)
+    # One extra row tells us whether another page exists
+    rows = query.order("id", desc=True).limit(page_size + 1).execute().data
+    next_cursor = rows[page_size - 1]["id"] if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def iter_rows(client, filters=None, columns=HISTORY_COLUMNS, chunk_size=1000, table="resumes"):
+    """Yield every matching row, newest first, fetched in keyset chunks"""
+    columns = list(columns)
+    if "id" not in columns:
+        columns.append("id")
+    cursor = None
+    while True:
+        rows, cursor = fetch_page(client, filters, chunk_size, cursor, columns, table)
+        yield from rows
+        if cursor is None:
+            return
+
+
+def iter_new_rows(client, filters=None, after_id=None, columns=HISTORY_COLUMNS, chunk_size=1000, table="resumes"):
+    """Yield matching rows with an id above ``after_id``, oldest first"""
+    columns = list(columns)
+    if "id" not in columns:
+        columns.append("id")
+    while True:
+        query = apply_filters(client.table(table).select(",".join(columns)), filters)
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        rows = query.order("id").limit(chunk_size).execute().data
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        after_id = rows[-1]["id"]
+
+
+# Columns a summary is built from
+SUMMARY_COLUMNS = ["id", "predicted_label", "user_email", "created_at"]
+
+
+def fetch_summary(client, filters=None, table="resumes"):
+    """Aggregate counts for the dashboard, computed by the database.
+
+    Returns total, role_counts (most common first), user_counts,
+    daily_counts, first_at, last_at and max_id, plus the derived
+    unique_roles, unique_users, users and top_user. Falls back to
+    aggregating a projected scan when the SQL function has not been
+    installed.
+    """
+    filters = filters or {}
+    try:
+        summary = client.rpc(SUMMARY_FUNCTION, {
+            "p_role": filters.get("role"),
+            "p_user": filters.get("user_email"),
+            "p_start": filters.get("start_date"),
+            "p_end": filters.get("end_date"),
+            "p_search": filters.get("search"),
+        }).execute().data
+    except Exception:
+        summary = None
+    if isinstance(summary, list):
+        summary = summary[0] if summary else None
+    if not summary:
+        return summarize_rows(iter_new_rows(client, filters, columns=SUMMARY_COLUMNS, table=table))
+    return _with_derived(summary)
+
+
+def fetch_materialized_summary(client):
+    """Unfiltered summary read from the aggregate tables, or None if they are not installed.
+
+    Any other error, e.g. a network failure, is raised.
+
+    The tables are updated by a trigger as predictions are inserted, so the
+    cost of this call depends on the number of days, roles and users, not
+    on the number of predictions.
+    """
+    try:
+        summary = client.rpc(STATS_FUNCTION, {}).execute().data
+    except Exception as e:
+        if is_missing_function(e):
+            return None
+        raise
+    if isinstance(summary, list):
+        summary = summary[0] if summary else None
+    return _with_derived(summary) if summary else None
+
+
+def summarize_rows(rows):
+    """Build the fetch_summary dict from rows, for when the SQL function is missing"""
+    return fold_rows(None, rows)
+
+
+def fold_rows(summary, rows):
+    """Return ``summary`` updated with rows it has not counted yet.
+
+    Only the new rows are looked at, so keeping a summary current costs
+    time proportional to the new activity rather than the whole history.
+    """
+    summary = summary or {}
+    role_counts = Counter(summary.get("role_counts") or {})
+    user_counts = Counter(summary.get("user_counts") or {})
+    daily_counts = Counter(summary.get("daily_counts") or {})
+    first_at, last_at = summary.get("first_at"), summary.get("last_at")
+    max_id = summary.get("max_id")
+    total = summary.get("total", 0)
+    for row in rows:
+        total += 1
+        role_counts[row.get("predicted_label") or "Not Available"] += 1
+        user_counts[row.get("user_email") or "Not Available"] += 1
+        if row.get("id") is not None:
+            max_id = row["id"] if max_id is None else max(max_id, row["id"])
+        created_at = row.get("created_at")
+        if created_at:
+            # ISO timestamps in one timezone compare correctly as strings
+            first_at = min(first_at, created_at) if first_at else created_at
+            last_at = max(last_at, created_at) if last_at else created_at
+            daily_counts[created_at[:10]] += 1
+    return _with_derived({
+        "total": total,
+        "role_counts": dict(role_counts.most_common()),
+        "user_counts": dict(user_counts),
+        "daily_counts": dict(sorted(daily_counts.items())),
+        "first_at": first_at,
+        "last_at": last_at,
+        "max_id": max_id,
+    })
+
+
+def _with_derived(summary):
+    user_counts = summary.get("user_counts") or {}
+    return dict(
+        summary,
+        unique_roles=len(summary.get("role_counts") or {}),
+        unique_users=len(user_counts),
+        users=sorted(user_counts),
+        top_user=max(user_counts, key=user_counts.get) if user_counts else None,
+    )
+
+
+class HistorySync:
+    """Dashboard summaries kept current by fetching only rows added since the last sync.
+
+    One summary is kept per filter combination, together with the highest
+    id it has counted. ``summary()`` asks the database for rows above that
+    id and folds them in. Rows are append-only, but a row can commit after
+    one with a higher id when several processes write at once, so each
+    summary is rebuilt from scratch once it is ``max_age`` seconds old.
+
+    The unfiltered summary is read from the materialized aggregate tables
+    when they are installed. After any other error reading them, the scan
+    is used for STATS_RETRY_SECONDS before the tables are tried again.
+    """
+
+    def __init__(self, client, table="resumes", max_entries=32, max_age=900):
+        self.client = client
+        self.table = table
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._summaries = OrderedDict()  # filters key -> (built_at, summary)
+        self._stats_installed = True
+        self._stats_retry_at = 0.0
+
+    def summary(self, filters=None):
+        """Current summary for ``filters``, syncing only new rows when one is cached"""
+        if (self._stats_installed and not any((filters or {}).values())
+                and time.monotonic() >= self._stats_retry_at):
+            try:
+                summary = fetch_materialized_summary(self.client)
+            except Exception:
+                # Probably transient: use the scan for now, not for good
+                self._stats_retry_at = time.monotonic() + STATS_RETRY_SECONDS
+            else:
+                if summary is not None:
+                    return summary
+                self._stats_installed = False
+
+        key = tuple(sorted((filters or {}).items()))
+        with self._lock:
+            built_at, summary = self._summaries.pop(key, (None, None))
+            if summary is None or time.monotonic() - built_at > self.max_age:
+                built_at, summary = time.monotonic(), fetch_summary(self.client, filters, self.table)
+            else:
+                new_rows = iter_new_rows(self.client, filters, summary.get("max_id"),
+                                         SUMMARY_COLUMNS, table=self.table)
+                summary = fold_rows(summary, new_rows)
+            self._summaries[key] = (built_at, summary)
+            while len(self._summaries) > self.max_entries:
+                self._summaries.popitem(last=False)
+            return summary
+
+    def reset(self):
+        """Forget every summary so the next call rebuilds it"""
+        with self._lock:
+            self._summaries.clear()
+            self._stats_installed = True
+            self._stats_retry_at = 0.0
@@ -1,24 +1,109 @@
 # backend/preprocess_dataset.py
 
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder
+import argparse
 import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.resume_parser import clean_text, strip_markup
+
+DEFAULT_INPUT = "backend/resume_dataset/UpdatedResumeDataSet.csv"
+DEFAULT_OUTPUT = "data/cleaned_resume_dataset.parquet"
+DEFAULT_LABEL_MAP = "data/label_mapping.txt"
+DEFAULT_CHUNK_ROWS = 5000
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+
+
+def clean_resume_texts(texts):
+    """The same cleaning uploads get in extract_resume_data and clean_text; runs in worker processes"""
+    return [clean_text(strip_markup(text)) for text in texts]
+
+
+def collect_categories(input_path, chunk_rows):
+    """Sorted categories from a pass over the Category column only, as LabelEncoder would order them"""
+    categories = set()
+    for chunk in pd.read_csv(input_path, usecols=["Category"], chunksize=chunk_rows):
+        categories.update(chunk["Category"].dropna().astype(str).unique().tolist())
+    return sorted(categories)
+
+
+def iter_cleaned_chunks(input_path, label_ids, chunk_rows, workers):
+    """Yield cleaned (texts, labels) per input chunk, in input order.
+
+    Chunks are cleaned in parallel with at most two per worker in flight,
+    so memory stays bounded however large the input is.
+    """
+    chunks = pd.read_csv(input_path, usecols=["Resume", "Category"], chunksize=chunk_rows)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            chunk = chunk.dropna()
+            labels = chunk["Category"].astype(str).map(label_ids).to_numpy("int32")
+            pending.append((pool.submit(clean_resume_texts, chunk["Resume"].astype(str).tolist()), labels))
+            if len(pending) >= workers * 2:
+                future, labels = pending.popleft()
+                yield future.result(), labels
+        while pending:
+            future, labels = pending.popleft()
+            yield future.result(), labels
+
+
+def write_label_map(path, categories):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        for label_id, label in enumerate(categories):
+            f.write(f"{label_id},{label}\n")
+
+
+def preprocess(input_path=DEFAULT_INPUT, output_path=DEFAULT_OUTPUT, label_map_path=DEFAULT_LABEL_MAP,
+               chunk_rows=DEFAULT_CHUNK_ROWS, workers=DEFAULT_WORKERS):
+    """Clean and label-encode the resume dataset into a zstd-compressed Parquet file.
+
+    Each input chunk becomes one row group with ``text`` (string) and
+    ``label`` (int32) columns, so the trainer can stream it back a row
+    group at a time. The file is written next to its destination and
+    moved into place once complete. Returns the number of rows written.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("Parquet output needs pyarrow: pip install pyarrow")
+
+    categories = collect_categories(input_path, chunk_rows)
+    label_ids = {label: i for i, label in enumerate(categories)}
 
-# Load dataset
-df = pd.read_csv("backend/resume_dataset/UpdatedResumeDataSet.csv")
-df = df[['Resume', 'Category']].dropna()
+    schema = pa.schema([("text", pa.string()), ("label", pa.int32())])
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    partial_path = output_path + ".partial"
+    rows = 0
+    with pq.ParquetWriter(partial_path, schema, compression="zstd") as writer:
+        for texts, labels in iter_cleaned_chunks(input_path, label_ids, chunk_rows, workers):
+            writer.write_table(pa.table({"text": texts, "label": labels}, schema=schema))
+            rows += len(texts)
+    os.replace(partial_path, output_path)
 
-# Label encode the categories
-le = LabelEncoder()
-df['label'] = le.fit_transform(df['Category'])
+    write_label_map(label_map_path, categories)
+    return rows
 
-# Save cleaned dataset
-os.makedirs("data", exist_ok=True)
-df[['Resume', 'label']].rename(columns={'Resume': 'text'}).to_csv("data/cleaned_resume_dataset.csv", index=False)
 
-# Save label mapping
-with open("data/label_mapping.txt", "w") as f:
-    for label, id in zip(le.classes_, le.transform(le.classes_)):
-        f.write(f"{id},{label}\n")
+if __name__ == "__main__":
+    # Usage: python backend/preprocess_dataset.py --workers 8 --chunk-rows 5000
+    parser = argparse.ArgumentParser(description="Clean and label-encode the resume dataset into Parquet")
+    parser.add_argument("input", nargs="?", default=DEFAULT_INPUT, help="CSV with Resume and Category columns")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--label-map", default=DEFAULT_LABEL_MAP)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
 
-print("✅ Cleaned data saved to: data/cleaned_resume_dataset.csv")
+    start = time.perf_counter()
+    rows = preprocess(args.input, args.output, args.label_map, args.chunk_rows, args.workers)
+    print(f"✅ {rows} cleaned rows saved to: {args.output} ({time.perf_counter() - start:.1f}s)")
+    print(f"✅ Label mapping saved to: {args.label_map}")
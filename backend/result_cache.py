@@ -0,0 +1,116 @@
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+def content_key(kind, *parts):
+    """Cache key from a result kind and the bytes or text it was computed from"""
+    digest = hashlib.sha256(kind.encode("utf-8"))
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(b"\0")
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """In-memory LRU of parse and score results, keyed by content hash.
+
+    Meant to be created once per process and shared by every session, so
+    an unchanged upload is parsed and scored once no matter how often the
+    script reruns. Memory is bounded by an estimate of each value's size
+    (``max_bytes``) as well as by ``max_entries``. Cached values are shared,
+    so callers must not modify them.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+def _estimate_size(value, seen=None):
+    # Deep sys.getsizeof over the containers results are made of
+    seen = seen if seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_estimate_size(k, seen) + _estimate_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item, seen) for item in value)
+    return size
+
+
+def open_default_result_cache():
+    """Create the cache sized by RESULT_CACHE_MB / RESULT_CACHE_ENTRIES (0 MB disables it)"""
+    max_mb = float(os.getenv("RESULT_CACHE_MB", DEFAULT_MAX_BYTES / (1024 * 1024)))
+    if max_mb <= 0:
+        return None
+    max_entries = int(os.getenv("RESULT_CACHE_ENTRIES", DEFAULT_MAX_ENTRIES))
+    return ResultCache(int(max_mb * 1024 * 1024), max_entries)
@@ -1,22 +1,88 @@
 import fitz  # PyMuPDF
+import os
 import re
-from io import BytesIO
+from utils.keyword_engine import KeywordMatcher
+from utils.metrics import stage, timed
 
-def extract_resume_data(resume_file):
-    # Reset file pointer to beginning
-    resume_file.seek(0)
-    
-    # Create a buffer so we can read it multiple times
-    file_buffer = BytesIO(resume_file.read())
+# Skill matching from known list
+KNOWN_SKILLS = [
+    "HTML", "CSS", "JavaScript", "Node.js", "Express.js", "MongoDB", "MySQL",
+    "REST APIs", "Postman", "Figma", "phpMyAdmin", "Python", "C++", "Java",
+    "React", "Git", "GitHub", "Docker", "XAMPP"
+]
+
+def load_skill_taxonomy(path):
+    """Read a skill taxonomy file: one skill per line, optional aliases after commas.
+
+    ``Kubernetes,k8s`` maps both spellings to the canonical skill "Kubernetes".
+    Blank lines and lines starting with '#' are ignored.
+    """
+    taxonomy = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            names = [name.strip() for name in line.split(",") if name.strip()]
+            taxonomy.setdefault(names[0], []).extend(names)
+    return taxonomy
+
+def build_skill_matcher(taxonomy):
+    """Compile a {skill: [spellings]} taxonomy into a whole-word matcher"""
+    return KeywordMatcher(taxonomy, whole_words=True)
+
+# Compiled once at import; SKILL_TAXONOMY_PATH swaps in a larger taxonomy
+_taxonomy_path = os.getenv("SKILL_TAXONOMY_PATH")
+if _taxonomy_path:
+    skill_matcher = build_skill_matcher(load_skill_taxonomy(_taxonomy_path))
+else:
+    skill_matcher = build_skill_matcher({skill: [skill] for skill in KNOWN_SKILLS})
+
+def find_skills(text, matcher=None):
+    """Return (skill, start, end) for every skill mention, in text order.
+
+    ``skill`` is the canonical name, so aliases report the skill they belong to.
+    """
+    matcher = matcher or skill_matcher
+    return [(skill, start, end) for start, end, skill in matcher.iter_category_matches(text)]
+
+def _pdf_bytes(resume_file):
+    """Return the PDF bytes of an upload without copying them where possible"""
+    if isinstance(resume_file, (bytes, memoryview)):
+        return resume_file
+    if hasattr(resume_file, "getvalue"):
+        # BytesIO (and Streamlit's UploadedFile) hand back their buffer uncopied
+        return resume_file.getvalue()
+    if hasattr(resume_file, "seek"):
+        resume_file.seek(0)
+    return resume_file.read()
 
-    doc = fitz.open(stream=file_buffer.getvalue(), filetype="pdf")
-    text = ""
-    for page in doc:
-        text += page.get_text()
+def iter_resume_pages(resume_file):
+    """Yield the text of each PDF page in order.
 
+    The document is closed as soon as iteration finishes or the caller stops
+    early, so nothing waits for the garbage collector.
+    """
+    doc = fitz.open(stream=_pdf_bytes(resume_file), filetype="pdf")
+    try:
+        for page in doc:
+            yield page.get_text()
+    finally:
+        doc.close()
+
+def strip_markup(text):
     # Clean up LaTeX-style tags like \csuse{...}
     text = re.sub(r"\\csuse\s?\{[^}]+\}", "", text)
-    text = text.encode('ascii', errors='ignore').decode()
+    return text.encode('ascii', errors='ignore').decode()
+
+def extract_resume_data(resume_file):
+    # Accepts an uploaded file, a file object, or raw PDF bytes
+    with stage("pdf_extraction"):
+        text = "".join(iter_resume_pages(resume_file))
+
+    # Not "text_cleaning": that stage is clean_text, run later on the same text
+    with stage("markup_stripping"):
+        text = strip_markup(text)
 
     # Extract email
     email_match = re.search(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", text)
@@ -34,22 +100,27 @@ def extract_resume_data(resume_file):
             name = line
             break
 
-    # Skill matching from known list
-    known_skills = [
-        "HTML", "CSS", "JavaScript", "Node.js", "Express.js", "MongoDB", "MySQL",
-        "REST APIs", "Postman", "Figma", "phpMyAdmin", "Python", "C++", "Java",
-        "React", "Git", "GitHub", "Docker", "XAMPP"
-    ]
-
-    found_skills = []
-    for skill in known_skills:
-        if re.search(rf"\b{re.escape(skill)}\b", text, re.IGNORECASE):
-            found_skills.append(skill)
+    # Skill matching from the compiled taxonomy
+    skill_positions = {}
+    with stage("skill_matching"):
+        for skill, start, end in find_skills(text):
+            skill_positions.setdefault(skill, []).append((start, end))
 
     return text, {
         "name": name,
         "email": email,
         "phone": phone,
-        "skills": list(set(found_skills))
+        "skills": list(skill_positions),
+        "skill_positions": skill_positions
     }
+
+def parse_resume_bytes(pdf_bytes):
+    """extract_resume_data for raw PDF bytes; picklable entry point for worker processes"""
+    return extract_resume_data(pdf_bytes)
+
+@timed("text_cleaning")
+def clean_text(text):
+    text = re.sub(r"\(cid:\d+\)", "", text)
+    text = re.sub(r"\s{2,}", " ", text)
+    return text.strip()
     
\ No newline at end of file
@@ -0,0 +1,69 @@
+from utils.keyword_engine import KeywordMatcher
+
+# Define role keywords
+ROLE_KEYWORDS = {
+    'Software Developer': [
+        'python', 'javascript', 'java', 'programming', 'coding', 'software development',
+        'web development', 'react', 'node.js', 'html', 'css', 'git', 'github',
+        'api', 'database', 'sql', 'frontend', 'backend', 'fullstack'
+    ],
+    'Data Scientist': [
+        'machine learning', 'data science', 'python', 'pandas', 'numpy', 'tensorflow',
+        'pytorch', 'scikit-learn', 'data analysis', 'statistics', 'ml', 'ai',
+        'artificial intelligence', 'deep learning', 'neural networks'
+    ],
+    'Web Designer': [
+        'web design', 'ui/ux', 'photoshop', 'illustrator', 'figma', 'adobe',
+        'graphic design', 'css', 'html', 'responsive design', 'wireframes',
+        'prototyping', 'user interface', 'user experience'
+    ],
+    'Business Analyst': [
+        'business analysis', 'requirements', 'stakeholder', 'process improvement',
+        'business intelligence', 'analytics', 'reporting', 'excel', 'powerbi',
+        'tableau', 'project management', 'agile', 'scrum'
+    ],
+    'Marketing Specialist': [
+        'marketing', 'digital marketing', 'social media', 'seo', 'content marketing',
+        'advertising', 'campaigns', 'brand', 'promotion', 'market research',
+        'google analytics', 'facebook ads', 'email marketing'
+    ],
+    'Sales Representative': [
+        'sales', 'business development', 'client relations', 'crm', 'lead generation',
+        'negotiation', 'revenue', 'targets', 'customer service', 'account management',
+        'b2b', 'b2c', 'sales funnel'
+    ]
+}
+
+# Compiled once so each resume is scanned a single time
+role_matcher = KeywordMatcher(ROLE_KEYWORDS)
+
+def classify_resume_role(resume_text):
+    """Simple rule-based resume classifier"""
+    
+    # Count keyword matches for each role
+    counts = role_matcher.count(resume_text)
+    role_scores = {role: counts.get(role, 0) for role in ROLE_KEYWORDS}
+    
+    # Find the role with highest score
+    if max(role_scores.values()) > 0:
+        predicted_role = max(role_scores, key=role_scores.get)
+    else:
+        predicted_role = "General"  # Default if no specific role detected
+    
+    return predicted_role
+
+def classify_resume_roles(resume_texts):
+    """classify_resume_role for many resumes, scored with one sparse matrix product.
+
+    Gives the same role as classify_resume_role for every resume: ties go
+    to the role listed first in ROLE_KEYWORDS and zero matches give "General".
+    """
+    resume_texts = list(resume_texts)
+    if not resume_texts:
+        return []
+    scores = role_matcher.count_matrix(resume_texts)  # columns follow ROLE_KEYWORDS
+    best = scores.argmax(axis=1)  # first maximum, like max() over the dict
+    return [
+        role_matcher.categories[i] if scores[row, i] > 0 else "General"
+        for row, i in enumerate(best)
+    ]
@@ -0,0 +1,263 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Seconds a worker gets to finish in-flight requests before it is killed
+DEFAULT_GRACEFUL_TIMEOUT = 30
+
+# A worker that exits sooner than this after starting counts as a crash
+MIN_WORKER_LIFETIME = 5
+
+
+def preload_models(api):
+    """Load models in the parent so forked workers share their memory copy-on-write"""
+    api.classifier.get()
+    backend = os.getenv("ENCODER_BACKEND", "torch")
+    if backend == "torch":
+        api.embedding_model.get()
+    else:
+        # onnxruntime starts thread pools when a session is created, which do
+        # not survive fork; workers load their own encoder, but the export
+        # happens once here rather than in every worker at the same time
+        from models.model import ONNX_MODEL_DIR, OnnxEncoder
+        try:
+            OnnxEncoder.ensure_exported(ONNX_MODEL_DIR, quantized=backend == "onnx-int8")
+        except Exception as e:
+            print(f"⚠️ ONNX export failed, workers will retry: {e}")
+    # Move everything loaded so far out of the collector's reach, so GC
+    # passes in the workers do not write to (and un-share) those pages
+    gc.freeze()
+
+
+def bind_socket(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """Serve backend.app from several forked uvicorn workers sharing one socket.
+
+    Models are loaded once in the parent before forking. Worker count,
+    the graceful shutdown timeout and recycling after ``max_requests``
+    are configurable. Signals to the parent:
+
+    - SIGTERM / SIGINT: stop every worker gracefully, then exit
+    - SIGHUP: reload the classifier from disk and replace workers one at a time
+    - SIGTTIN / SIGTTOU: add or remove a worker
+
+    Workers that exit are replaced; ones that crash right after starting
+    are replaced with an increasing delay.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8000, workers=None, graceful_timeout=DEFAULT_GRACEFUL_TIMEOUT,
+                 max_requests=0, log_level="info"):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.graceful_timeout = graceful_timeout
+        self.max_requests = max_requests
+        self.log_level = log_level
+        self.api = None
+        self.socket = None
+        self._children = {}  # pid -> start time
+        self._retiring = set()
+        self._stopping = False
+        self._reload = False
+        self._crashes = 0
+
+    def run(self):
+        import backend.app as api
+        from backend.matcher import close_stores
+
+        self.api = api
+        preload_models(api)
+        # The stores opened SQLite connections at import; workers open their own
+        close_stores()
+        self.socket = bind_socket(self.host, self.port)
+        print(f"🚀 Serving on http://{self.host}:{self.port} with {self.workers} workers (parent {os.getpid()})")
+
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        signal.signal(signal.SIGTTIN, lambda *_: self._resize(1))
+        signal.signal(signal.SIGTTOU, lambda *_: self._resize(-1))
+
+        try:
+            while not self._stopping:
+                self._reap()
+                if self._reload:
+                    self._reload = False
+                    self._rolling_restart()
+                self._fill()
+                time.sleep(0.5)
+        finally:
+            self._stop_all()
+            self.socket.close()
+
+    def _on_stop(self, signum, frame):
+        self._stopping = True
+
+    def _on_reload(self, signum, frame):
+        self._reload = True
+
+    def _resize(self, delta):
+        self.workers = max(1, self.workers + delta)
+        active = [pid for pid in self._children if pid not in self._retiring]
+        for pid in active[self.workers:]:
+            self._retire(pid)
+
+    def _fill(self):
+        active = len(self._children) - len(self._retiring)
+        if active >= self.workers:
+            return
+        if self._crashes:
+            # Back off while workers keep dying during startup
+            time.sleep(min(2 ** self._crashes, 30))
+        for _ in range(self.workers - active):
+            self._spawn()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self._children[pid] = time.monotonic()
+            return pid
+        self._run_worker()
+
+    def _run_worker(self):
+        # Child: drop the parent's handlers; uvicorn installs its own
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(signum, signal.SIG_DFL)
+        code = 0
+        try:
+            self._size_worker_pools()
+            # Workers share PREDICTION_JOURNAL_PATH; each appends to its own file
+            self.api.prediction_queue.journal_per_process()
+            config = uvicorn.Config(self.api.app, log_level=self.log_level,
+                                    limit_max_requests=self.max_requests or None)
+            uvicorn.Server(config).run(sockets=[self.socket])
+        except BaseException as e:
+            print(f"⚠️ Worker {os.getpid()} failed: {e}")
+            code = 1
+        finally:
+            # os._exit skips atexit handlers, so flush here on every path
+            self._flush_worker()
+            # Never fall back into the parent's supervisor loop
+            os._exit(code)
+
+    def _flush_worker(self):
+        from backend.matcher import close_stores
+
+        for flush in (self.api.prediction_queue.close, close_stores):
+            try:
+                flush()
+            except Exception as e:
+                print(f"⚠️ Worker {os.getpid()} could not flush on exit: {e}")
+
+    def _size_worker_pools(self):
+        # Split the cores between workers unless a size was set explicitly
+        share = max(1, (os.cpu_count() or 1) // self.workers)
+        if "EXTRACT_PROCESSES" not in os.environ:
+            self.api.EXTRACT_PROCESSES = share
+        if "torch" in sys.modules:
+            sys.modules["torch"].set_num_threads(share)
+
+    def _reap(self):
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self._children.pop(pid, None)
+            if pid in self._retiring:
+                self._retiring.discard(pid)
+                continue
+            if started is not None and not self._stopping:
+                if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                    self._crashes += 1
+                    print(f"⚠️ Worker {pid} exited during startup (status {status})")
+                else:
+                    self._crashes = 0
+
+    def _retire(self, pid):
+        self._retiring.add(pid)
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def _wait_for(self, pids, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and any(pid in self._children for pid in pids):
+            self._reap()
+            time.sleep(0.1)
+        for pid in pids:
+            if pid in self._children:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+        self._reap()
+
+    def _rolling_restart(self):
+        print("🔄 Reloading the classifier and restarting workers")
+        try:
+            self.api.classifier.reset()
+            self.api.classifier.get()
+            gc.freeze()
+        except Exception as e:
+            # Keep the running workers rather than fork ones without a model
+            print(f"⚠️ Reload failed, keeping current workers: {e}")
+            return
+        for old in [pid for pid in self._children if pid not in self._retiring]:
+            if self._stopping:
+                return
+            self._spawn()
+            time.sleep(1)  # let the replacement start accepting first
+            self._retire(old)
+            self._wait_for([old], self.graceful_timeout)
+
+    def _stop_all(self):
+        pids = list(self._children)
+        for pid in pids:
+            self._retire(pid)
+        self._wait_for(pids, self.graceful_timeout)
+
+
+def serve(host="127.0.0.1", port=8000, workers=None, graceful_timeout=DEFAULT_GRACEFUL_TIMEOUT,
+          max_requests=0, log_level="info"):
+    if not hasattr(os, "fork"):
+        # No fork on this platform: a single process serves everything
+        import backend.app as api
+        uvicorn.run(api.app, host=host, port=port, log_level=log_level)
+        return
+    PreforkServer(host, port, workers, graceful_timeout, max_requests, log_level).run()
+
+
+if __name__ == "__main__":
+    # Usage: python backend/serve.py --workers 4 --host 0.0.0.0 --port 8000
+    parser = argparse.ArgumentParser(description="Run the FastAPI backend with pre-forked workers")
+    parser.add_argument("--host", default=os.getenv("SERVE_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVE_PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVE_WORKERS", 0)) or None,
+                        help="Worker processes (default: one per core)")
+    parser.add_argument("--graceful-timeout", type=float,
+                        default=float(os.getenv("SERVE_GRACEFUL_TIMEOUT", DEFAULT_GRACEFUL_TIMEOUT)))
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("SERVE_MAX_REQUESTS", 0)),
+                        help="Replace a worker after this many requests (0: never)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.graceful_timeout, args.max_requests, args.log_level)
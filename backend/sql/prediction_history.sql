@@ -0,0 +1,50 @@
+-- Indexes and aggregate function behind the Prediction History tab.
+-- Run once in the Supabase SQL editor; the app falls back to a slower
+-- projected scan until prediction_history_summary exists.
+
+create index if not exists resumes_created_at_idx on resumes (created_at);
+create index if not exists resumes_label_id_idx on resumes (predicted_label, id desc);
+create index if not exists resumes_user_id_idx on resumes (user_email, id desc);
+
+create or replace function prediction_history_summary(
+    p_role text default null,
+    p_user text default null,
+    p_start date default null,
+    p_end date default null,
+    p_search text default null
+) returns json
+language sql stable as $$
+    with filtered as (
+        select id,
+               coalesce(predicted_label, 'Not Available') as predicted_label,
+               coalesce(user_email, 'Not Available') as user_email,
+               created_at
+        from resumes
+        where (p_role is null or predicted_label = p_role)
+          and (p_user is null or user_email = p_user)
+          and (p_start is null or created_at >= p_start)
+          and (p_end is null or created_at < p_end + 1)
+          -- p_search is plain text: its %, _ and \ match themselves
+          and (p_search is null or filename ilike
+               '%' || replace(replace(replace(p_search, '\', '\\'), '%', '\%'), '_', '\_') || '%')
+    ),
+    roles as (
+        select predicted_label, count(*) as n from filtered group by predicted_label
+    ),
+    users as (
+        select user_email, count(*) as n from filtered group by user_email
+    ),
+    days as (
+        select created_at::date as day, count(*) as n
+        from filtered where created_at is not null group by 1
+    )
+    select json_build_object(
+        'total', (select count(*) from filtered),
+        'max_id', (select max(id) from filtered),
+        'first_at', (select min(created_at) from filtered),
+        'last_at', (select max(created_at) from filtered),
+        'role_counts', (select coalesce(json_object_agg(predicted_label, n order by n desc), '{}') from roles),
+        'daily_counts', (select coalesce(json_object_agg(day, n order by day), '{}') from days),
+        'user_counts', (select coalesce(json_object_agg(user_email, n), '{}') from users)
+    );
+$$;
@@ -0,0 +1,81 @@
+-- Aggregate tables for the Prediction History dashboard, kept current by a
+-- trigger on resumes. Run once in the Supabase SQL editor after
+-- prediction_history.sql; it also backfills the tables from existing rows.
+
+create table if not exists prediction_stats_daily (
+    day date not null,
+    predicted_label text not null,
+    predictions bigint not null default 0,
+    first_at timestamptz,
+    last_at timestamptz,
+    max_id bigint,
+    primary key (day, predicted_label)
+);
+
+-- One row per user; its row count is the distinct-user count
+create table if not exists prediction_stats_users (
+    user_email text primary key,
+    predictions bigint not null default 0
+);
+
+create or replace function prediction_stats_apply() returns trigger
+language plpgsql as $$
+begin
+    -- Statement-level: one upsert per batch insert from the write-behind queue
+    insert into prediction_stats_daily as s (day, predicted_label, predictions, first_at, last_at, max_id)
+    select coalesce(created_at, now())::date, coalesce(predicted_label, 'Not Available'),
+           count(*), min(created_at), max(created_at), max(id)
+    from inserted group by 1, 2
+    on conflict (day, predicted_label) do update set
+        predictions = s.predictions + excluded.predictions,
+        first_at = least(s.first_at, excluded.first_at),
+        last_at = greatest(s.last_at, excluded.last_at),
+        max_id = greatest(s.max_id, excluded.max_id);
+
+    insert into prediction_stats_users as s (user_email, predictions)
+    select coalesce(user_email, 'Not Available'), count(*) from inserted group by 1
+    on conflict (user_email) do update set predictions = s.predictions + excluded.predictions;
+    return null;
+end;
+$$;
+
+drop trigger if exists prediction_stats_on_insert on resumes;
+create trigger prediction_stats_on_insert
+    after insert on resumes
+    referencing new table as inserted
+    for each statement execute function prediction_stats_apply();
+
+-- Rebuild both tables from resumes, e.g. after rows were deleted by hand
+create or replace function rebuild_prediction_stats() returns void
+language sql as $$
+    delete from prediction_stats_daily;
+    delete from prediction_stats_users;
+    insert into prediction_stats_daily (day, predicted_label, predictions, first_at, last_at, max_id)
+    select coalesce(created_at, now())::date, coalesce(predicted_label, 'Not Available'),
+           count(*), min(created_at), max(created_at), max(id)
+    from resumes group by 1, 2;
+    insert into prediction_stats_users (user_email, predictions)
+    select coalesce(user_email, 'Not Available'), count(*) from resumes group by 1;
+$$;
+
+select rebuild_prediction_stats();
+
+-- Same shape as prediction_history_summary, read from the aggregate tables
+create or replace function prediction_stats_summary() returns json
+language sql stable as $$
+    with roles as (
+        select predicted_label, sum(predictions) as n from prediction_stats_daily group by predicted_label
+    ),
+    days as (
+        select day, sum(predictions) as n from prediction_stats_daily group by day
+    )
+    select json_build_object(
+        'total', (select coalesce(sum(predictions), 0) from prediction_stats_daily),
+        'max_id', (select max(max_id) from prediction_stats_daily),
+        'first_at', (select min(first_at) from prediction_stats_daily),
+        'last_at', (select max(last_at) from prediction_stats_daily),
+        'role_counts', (select coalesce(json_object_agg(predicted_label, n order by n desc), '{}') from roles),
+        'daily_counts', (select coalesce(json_object_agg(day, n order by day), '{}') from days),
+        'user_counts', (select coalesce(json_object_agg(user_email, predictions), '{}') from prediction_stats_users)
+    );
+$$;
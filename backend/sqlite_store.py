@@ -0,0 +1,43 @@
+import os
+import sqlite3
+
+# Connections opened by a parent process before a fork. A child must not use
+# them, not even to close them (closing can checkpoint or drop the WAL under
+# the parent), so they are kept referenced here instead of being finalized.
+_inherited = []
+
+
+class ProcessLocalConnection:
+    """A WAL-mode SQLite connection that every process opens for itself.
+
+    SQLite connections must not be carried across fork(). ``get()`` notices
+    when it runs in a different process than the one that opened the current
+    connection and opens a fresh one, so stores created at import time stay
+    safe in pre-forked servers and forked pools.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+        self._pid = None
+
+    def get(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            if self._connection is not None:
+                _inherited.append(self._connection)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._pid = pid
+        return self._connection
+
+    def is_open(self):
+        return self._connection is not None and self._pid == os.getpid()
+
+    def close(self):
+        """Close this process's connection; the next get() opens a new one"""
+        if self.is_open():
+            self._connection.close()
+            self._connection = None
+            self._pid = None
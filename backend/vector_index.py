@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from backend.sqlite_store import ProcessLocalConnection
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_INDEX_PATH = os.path.join(BASE_DIR, "..", "data", "resume_index.sqlite")
+
+
+class VectorIndex:
+    """Exact cosine-similarity index over stored embeddings, persisted in SQLite.
+
+    Every add or delete is written to SQLite with an increasing sequence
+    number; the in-memory matrix catches up by reading only rows newer than
+    the last one it applied, so several processes can share one index file.
+    Search is a single matrix-vector product over unit vectors, with optional
+    metadata filters and per-value score weights. Each process opens its
+    own connection on first use, so an index created before fork stays usable.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = ProcessLocalConnection(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            "id TEXT PRIMARY KEY, seq INTEGER NOT NULL, vector BLOB, metadata TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_seq ON vectors(seq)")
+        self._conn.commit()
+
+        self._seq = 0
+        self._size = 0
+        self._matrix = None       # unit vectors; rows past _size are spare capacity
+        self._ids = []
+        self._rows = {}           # id -> row in _matrix
+        self._metadata = []
+        self._codes = {}          # metadata field -> int32 value code per row (-1 if absent)
+        self._vocab = {}          # metadata field -> {value: code}
+
+    @property
+    def _conn(self):
+        return self._db.get()
+
+    def close(self):
+        """Close this process's connection; it reopens on next use"""
+        with self._lock:
+            self._db.close()
+
+    def __len__(self):
+        self.refresh()
+        return self._size
+
+    def add(self, ids, vectors, metadata=None):
+        """Insert or replace vectors; ``metadata`` is an optional dict per id"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+        metadata = metadata or [{}] * len(ids)
+
+        rows = [
+            (resume_id, vector.tobytes(), json.dumps(meta or {}, default=str))
+            for resume_id, vector, meta in zip(ids, vectors, metadata)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (id, seq, vector, metadata) "
+                "VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM vectors), ?, ?)", rows
+            )
+            self._conn.commit()
+        self.refresh()
+
+    def remove(self, ids):
+        """Delete vectors by id; unknown ids are ignored"""
+        with self._lock:
+            # Deletions stay behind as tombstones so other processes see them
+            self._conn.executemany(
+                "UPDATE vectors SET seq = (SELECT MAX(seq) + 1 FROM vectors), "
+                "vector = NULL, metadata = NULL WHERE id = ? AND vector IS NOT NULL",
+                [(resume_id,) for resume_id in ids]
+            )
+            self._conn.commit()
+        self.refresh()
+
+    def refresh(self):
+        """Apply changes written since the last refresh, by this or another process"""
+        with self._lock:
+            changes = self._conn.execute(
+                "SELECT id, seq, vector, metadata FROM vectors WHERE seq > ? ORDER BY seq",
+                (self._seq,)
+            ).fetchall()
+            for resume_id, seq, blob, meta in changes:
+                if blob is None:
+                    self._delete_row(resume_id)
+                else:
+                    self._upsert_row(resume_id, np.frombuffer(blob, dtype=np.float32), json.loads(meta))
+                self._seq = seq
+
+    def search(self, query, k=10, filters=None, weights=None):
+        """Return up to k (id, similarity, metadata) tuples, best first.
+
+        ``filters`` maps a metadata field to a required value or a collection
+        of allowed values. ``weights`` maps a metadata field to
+        ``{value: multiplier}``; results are ranked by similarity times the
+        multiplier (1.0 for unlisted values), while the raw cosine similarity
+        is what gets returned.
+        """
+        self.refresh()
+        with self._lock:
+            if not self._size or k <= 0:
+                return []
+            query = np.asarray(query, dtype=np.float32).ravel()
+            query = query / (np.linalg.norm(query) or 1.0)
+
+            similarities = self._matrix[:self._size] @ query
+            ranking = similarities.copy()
+            for field, factors in (weights or {}).items():
+                ranking *= self._value_lookup(field, factors, 1.0)
+            for field, allowed in (filters or {}).items():
+                if isinstance(allowed, (str, bytes)) or not hasattr(allowed, "__iter__"):
+                    allowed = [allowed]
+                keep = self._value_lookup(field, {value: True for value in allowed}, False)
+                ranking[~keep] = -np.inf
+
+            candidates = int(np.isfinite(ranking).sum())
+            k = min(k, candidates)
+            if k == 0:
+                return []
+            top = np.argpartition(-ranking, k - 1)[:k]
+            top = top[np.argsort(-ranking[top], kind="stable")]
+            return [(self._ids[i], float(similarities[i]), self._metadata[i]) for i in top]
+
+    def field_values(self, field):
+        """Distinct values seen for a metadata field, for building filter choices"""
+        self.refresh()
+        with self._lock:
+            return sorted(self._vocab.get(field, {}), key=str)
+
+    def _value_lookup(self, field, mapping, default):
+        # Translate per-value settings into a per-row array through the value codes
+        vocab = self._vocab.get(field, {})
+        dtype = np.bool_ if isinstance(default, bool) else np.float32
+        table = np.full(len(vocab) + 1, default, dtype=dtype)  # last slot: field absent
+        for value, setting in mapping.items():
+            code = vocab.get(value)
+            if code is not None:
+                table[code] = setting
+        codes = self._codes.get(field)
+        if codes is None:
+            return np.full(self._size, default, dtype=dtype)
+        return table[codes[:self._size]]
+
+    def _upsert_row(self, resume_id, vector, meta):
+        row = self._rows.get(resume_id)
+        if row is None:
+            row = self._size
+            self._grow(row + 1, len(vector))
+            self._ids.append(resume_id)
+            self._metadata.append(meta)
+            self._rows[resume_id] = row
+            self._size += 1
+        else:
+            self._metadata[row] = meta
+        self._matrix[row] = vector
+
+        for field, codes in self._codes.items():
+            codes[row] = -1
+        for field, value in meta.items():
+            if isinstance(value, (list, dict)):
+                continue
+            if field not in self._codes:
+                self._codes[field] = np.full(len(self._matrix), -1, dtype=np.int32)
+                self._vocab[field] = {}
+            vocab = self._vocab[field]
+            self._codes[field][row] = vocab.setdefault(value, len(vocab))
+
+    def _delete_row(self, resume_id):
+        row = self._rows.pop(resume_id, None)
+        if row is None:
+            return
+        # Move the last row into the hole so the live rows stay contiguous
+        last = self._size - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = moved_id
+            self._metadata[row] = self._metadata[last]
+            for codes in self._codes.values():
+                codes[row] = codes[last]
+            self._rows[moved_id] = row
+        self._ids.pop()
+        self._metadata.pop()
+        self._size -= 1
+
+    def _grow(self, needed, dim):
+        if self._matrix is not None and needed <= len(self._matrix):
+            return
+        capacity = max(1024, needed, 2 * (len(self._matrix) if self._matrix is not None else 0))
+        matrix = np.zeros((capacity, dim), dtype=np.float32)
+        if self._matrix is not None:
+            matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+        for field, codes in self._codes.items():
+            grown = np.full(capacity, -1, dtype=np.int32)
+            grown[:self._size] = codes[:self._size]
+            self._codes[field] = grown
+
+
+def open_default_index():
+    """Open the index configured by RESUME_INDEX_PATH (an empty value disables it)"""
+    path = os.getenv("RESUME_INDEX_PATH", DEFAULT_INDEX_PATH)
+    if not path:
+        return None
+    return VectorIndex(path)
@@ -0,0 +1,328 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.metrics import stage
+
+try:
+    import fcntl
+except ImportError:  # Windows: journal access is only serialized within a process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_JOURNAL_PATH = os.path.join(BASE_DIR, "..", "data", "pending_predictions.jsonl")
+
+# A journaled row whose replay failed this many times goes to the dead-letter file
+MAX_REPLAY_ATTEMPTS = 5
+
+
+@contextmanager
+def _file_lock(path, blocking=True):
+    """Hold an exclusive flock on ``path``; yields False if non-blocking and already held"""
+    if fcntl is None:
+        yield True
+        return
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class WriteBehindQueue:
+    """Accept rows without blocking and insert them into a table in bulk.
+
+    Rows are flushed by a background thread once ``batch_size`` rows are
+    waiting or ``flush_interval`` seconds have passed. Failed inserts are
+    retried with exponential backoff; rows that still fail are appended to a
+    local JSONL journal and replayed after the next successful insert.
+
+    Several processes may share one journal: appends and replays take file
+    locks, and only one process replays at a time. A row that still fails
+    after MAX_REPLAY_ATTEMPTS replays is moved to ``<journal>.dead``.
+    ``journal_per_process()`` gives a process a journal file of its own.
+    """
+
+    def __init__(self, client, table, batch_size=50, flush_interval=2.0,
+                 max_retries=4, backoff=0.5, journal_path=None, max_pending=10_000):
+        self.client = client
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.journal_path = journal_path or os.getenv("PREDICTION_JOURNAL_PATH", DEFAULT_JOURNAL_PATH)
+        self.shared_journal_path = self.journal_path
+        self.max_pending = max_pending
+
+        self.written = 0
+        self.journaled = 0
+        self.replayed = 0
+        self.dead_lettered = 0
+        self._journal_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        atexit.register(self.close)
+
+    def put(self, record):
+        """Queue one row for insertion; never waits on the database"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            # Too far behind: go straight to disk rather than block the caller
+            self._journal([record])
+
+    def flush(self, timeout=30):
+        """Block until everything queued so far has been written or journaled"""
+        if not self._running():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout=30):
+        """Flush outstanding rows and stop the background thread"""
+        if self._pid != os.getpid():
+            return
+        if not self._running():
+            if self._queue.empty():
+                return
+            # The writer died or was already closed with rows still queued
+            self._ensure_started()
+        self._stop.set()
+        self.flush(timeout)
+        self._thread.join(timeout)
+
+    def journal_per_process(self):
+        """Journal to ``<journal>.<pid>`` instead of the shared file, e.g. in a pre-forked worker.
+
+        Replays still drain the shared journal, and the journals of processes
+        that have exited, so no row is stranded when a worker goes away.
+        """
+        root, ext = os.path.splitext(self.shared_journal_path)
+        self.journal_path = f"{root}.{os.getpid()}{ext}"
+
+    def stats(self):
+        return {
+            "pending": self._queue.qsize() if self._running() else 0,
+            "written": self.written,
+            "journaled": self.journaled,
+            "replayed": self.replayed,
+            "dead_lettered": self.dead_lettered,
+        }
+
+    def _running(self):
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def _ensure_started(self):
+        if self._running():
+            return
+        with self._start_lock:
+            if self._running():
+                return
+            # A forked child inherits the queue object but not the thread, and
+            # the queue's lock may have been held at fork time, so each process
+            # starts its own. Within a process the queue is kept: its rows
+            # still need writing.
+            if self._queue is None or self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_pending)
+            self._stop = threading.Event()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.table}", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        self._replay_safely()
+        while True:
+            batch, waiters = self._collect()
+            try:
+                if batch:
+                    if self._write(batch):
+                        self._replay_safely()
+                    else:
+                        self._journal(batch)
+            except Exception:
+                # Journaling failed too (e.g. disk full); keep the writer alive
+                logger.exception("Write-behind lost %d %s rows", len(batch), self.table)
+            finally:
+                for waiter in waiters:
+                    waiter.set()
+            if self._stop.is_set() and self._queue.empty():
+                return
+
+    def _replay_safely(self):
+        try:
+            self._replay_journal()
+        except Exception:
+            logger.exception("Replaying the %s journal %s failed", self.table, self.journal_path)
+
+    def _collect(self):
+        batch, waiters = [], []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                # Flush request: write what we have now
+                waiters.append(item)
+                break
+            batch.append(item)
+        return batch, waiters
+
+    def _write(self, rows):
+        for attempt in range(self.max_retries + 1):
+            try:
+                with stage("supabase_insert"):
+                    self.client.table(self.table).insert(rows).execute()
+                self.written += len(rows)
+                return True
+            except Exception:
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff * (2 ** attempt))
+        return False
+
+    def _journal(self, rows):
+        self._append(self.journal_path, [(0, row) for row in rows])
+        self.journaled += len(rows)
+
+    def _append(self, path, entries):
+        """Append (attempts, row) entries to a journal file under its file lock"""
+        with self._journal_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with _file_lock(path + ".lock"), open(path, "a", encoding="utf-8") as f:
+                for attempts, row in entries:
+                    f.write(json.dumps({"attempts": attempts, "row": row}, default=str) + "\n")
+
+    def _replay_journal(self):
+        for path in self._journals():
+            if not self._replay_file(path):
+                return  # the rest would fail the same way
+
+    def _journals(self):
+        """This process's journal, then the shared one and those left by exited processes"""
+        paths = [self.journal_path]
+        if self.journal_path != self.shared_journal_path:
+            paths.append(self.shared_journal_path)
+        root, ext = os.path.splitext(self.shared_journal_path)
+        pattern = re.compile(re.escape(root) + r"\.(\d+)" + re.escape(ext) + r"(\.replay)?$")
+        for candidate in sorted(glob.glob(glob.escape(root) + ".*" + ext + "*")):
+            match = pattern.match(candidate)
+            if match and int(match.group(1)) != os.getpid() and not _pid_alive(int(match.group(1))):
+                path = candidate[:-len(".replay")] if match.group(2) else candidate
+                if path not in paths:
+                    paths.append(path)
+        return paths
+
+    def _replay_file(self, path):
+        """Write a journal's rows to the table; False if some had to be kept for later"""
+        replay_path = path + ".replay"
+        # Number of rows at the start of the replay file already written
+        progress_path = replay_path + ".done"
+        if not os.path.exists(path) and not os.path.exists(replay_path):
+            return True
+        with _file_lock(replay_path + ".lock", blocking=False) as acquired:
+            if not acquired:
+                return True  # another process is replaying this journal
+            with self._journal_lock, _file_lock(path + ".lock"):
+                # A leftover replay file is one an interrupted replay did not finish
+                if not os.path.exists(replay_path):
+                    if not os.path.exists(path):
+                        return True
+                    os.replace(path, replay_path)
+
+            entries = _read_entries(replay_path)
+            done = _read_progress(progress_path)
+            retry, dead = [], []
+            for start in range(done, len(entries), self.batch_size):
+                chunk = entries[start:start + self.batch_size]
+                if self._write([row for _, row in chunk]):
+                    self.replayed += len(chunk)
+                    _write_progress(progress_path, start + len(chunk))
+                    continue
+                # Remote unreachable or the rows are rejected; keep the rest for next time
+                for attempts, row in chunk:
+                    (dead if attempts + 1 >= MAX_REPLAY_ATTEMPTS else retry).append((attempts + 1, row))
+                retry.extend(entries[start + len(chunk):])
+                break
+
+            if dead:
+                self._append(self.shared_journal_path + ".dead", dead)
+                self.dead_lettered += len(dead)
+                logger.warning("Moved %d %s rows to %s.dead after %d failed replays",
+                               len(dead), self.table, self.shared_journal_path, MAX_REPLAY_ATTEMPTS)
+            if retry:
+                # Into this process's journal, even when replaying someone else's
+                self._append(self.journal_path, retry)
+            # Only now are the replayed rows safely written or journaled again
+            os.remove(replay_path)
+            if os.path.exists(progress_path):
+                os.remove(progress_path)
+            return not retry
+
+
+def _read_entries(path):
+    """(attempts, row) per journal line; rows journaled by older versions count as untried"""
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # e.g. a last line cut short by a crash mid-append
+                logger.warning("Skipping undecodable line %d of %s", number, path)
+                continue
+            if isinstance(entry, dict) and entry.keys() == {"attempts", "row"}:
+                entries.append((entry["attempts"], entry["row"]))
+            else:
+                entries.append((0, entry))
+    return entries
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+def _read_progress(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_progress(path, count):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(str(count))
+    os.replace(tmp_path, path)
@@ -0,0 +1 @@
+"""Synthetic-corpus benchmarks for parsing, matching and the prediction API"""
@@ -0,0 +1,159 @@
+import io
+import random
+
+import fitz  # PyMuPDF
+
+# Phrases per domain; names match backend.matcher's domains so the mix drives domain detection
+DOMAIN_PHRASES = {
+    'technology': [
+        "Developed REST API services in Python and Node.js",
+        "Built React frontend components with HTML and CSS",
+        "Deployed Docker containers to AWS with a DevOps pipeline",
+        "Designed database schemas and optimized SQL queries",
+        "Trained machine learning models with pandas and scikit-learn",
+        "Maintained Git workflows and code reviews on GitHub",
+        "Wrote unit testing and debugging tools for a backend framework",
+        "Implemented data structure and algorithm improvements in Java",
+    ],
+    'commerce': [
+        "Grew revenue through business development and lead generation",
+        "Ran marketing campaigns and market research for a retail brand",
+        "Managed CRM pipelines and customer service escalations",
+        "Prepared budget forecasts and financial analysis for sales teams",
+        "Coordinated procurement and supply chain inventory planning",
+        "Led e-commerce promotion and advertising across channels",
+    ],
+    'hr': [
+        "Led recruitment and talent acquisition for engineering hiring",
+        "Ran onboarding and training programs for new employees",
+        "Handled employee relations, payroll and benefits questions",
+        "Rolled out performance management and HR policies for compliance",
+        "Planned workforce growth with department heads",
+    ],
+    'healthcare': [
+        "Provided clinical patient care in a hospital ward",
+        "Supported physician diagnosis and treatment planning",
+        "Administered medicine and tracked patient health outcomes",
+        "Trained nursing staff on a new medical device",
+        "Coordinated pharmaceutical therapy schedules",
+    ],
+}
+
+GENERIC_PHRASES = [
+    "Collaborated with cross-functional teams to deliver projects on time",
+    "Mentored junior colleagues and documented best practices",
+    "Presented progress reports to leadership every quarter",
+    "Improved internal processes and reduced turnaround time",
+]
+
+FIRST_NAMES = ["Asha", "Rohan", "Maria", "Chen", "Fatima", "Lukas", "Priya", "Daniel", "Amara", "Kenji"]
+LAST_NAMES = ["Sharma", "Garcia", "Okafor", "Nguyen", "Muller", "Patel", "Kim", "Silva", "Cohen", "Ito"]
+
+JOB_TITLES = {
+    'technology': "Senior Software Engineer",
+    'commerce': "Business Development Manager",
+    'hr': "Talent Acquisition Partner",
+    'healthcare': "Clinical Nurse",
+}
+
+LINES_PER_PAGE = 60
+
+
+def parse_mix(spec):
+    """Parse "technology=0.6,commerce=0.4" into domain weights"""
+    mix = {}
+    for part in spec.split(","):
+        domain, _, weight = part.partition("=")
+        domain = domain.strip()
+        if domain not in DOMAIN_PHRASES:
+            raise ValueError(f"Unknown domain '{domain}' (expected one of {', '.join(DOMAIN_PHRASES)})")
+        mix[domain] = float(weight or 1)
+    return mix
+
+
+def _sentences(rng, domain, words):
+    # Mostly domain phrases with some generic filler, until the word budget is met
+    sentences, count = [], 0
+    while count < words:
+        pool = DOMAIN_PHRASES[domain] if rng.random() < 0.8 else GENERIC_PHRASES
+        sentence = rng.choice(pool) + f" at {rng.choice(LAST_NAMES)} Group ({rng.randint(2012, 2025)})."
+        sentences.append(sentence)
+        count += len(sentence.split())
+    return sentences
+
+
+def resume_text(rng, domain, words=400):
+    """One synthetic resume focused on ``domain``, roughly ``words`` long"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = name.lower().replace(" ", ".") + "@example.com"
+    phone = "".join(str(rng.randint(0, 9)) for _ in range(10))
+    lines = [name, f"{email} | {phone}", "", "SUMMARY"]
+    body = _sentences(rng, domain, words)
+    split = max(1, len(body) // 4)
+    lines += body[:split] + ["", "EXPERIENCE"] + [f"- {s}" for s in body[split:]]
+    lines += ["", "EDUCATION", f"B.Sc. from {rng.choice(LAST_NAMES)} University, {rng.randint(2008, 2022)}"]
+    return "\n".join(lines)
+
+
+def job_text(rng, domain, words=250):
+    """One synthetic job description for ``domain``, roughly ``words`` long"""
+    lines = [f"We are hiring a {JOB_TITLES[domain]}.", "", "Responsibilities:"]
+    lines += [f"- {s}" for s in _sentences(rng, domain, words)]
+    lines += ["", "Requirements:", f"- {rng.randint(2, 8)}+ years of experience",
+              "- Strong communication and teamwork"]
+    return "\n".join(lines)
+
+
+def render_pdf(text):
+    """Render text as a simple multi-page PDF and return its bytes"""
+    doc = fitz.open()
+    try:
+        lines = text.split("\n")
+        for start in range(0, len(lines), LINES_PER_PAGE):
+            page = doc.new_page()
+            y = 50
+            for line in lines[start:start + LINES_PER_PAGE]:
+                page.insert_text((50, y), line[:110], fontsize=9)
+                y += 12
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def generate_corpus(resumes=50, jobs=5, resume_words=400, job_words=250, mix=None, seed=0):
+    """Build a reproducible corpus of resume PDFs and job descriptions.
+
+    Returns {"resumes": [...], "jobs": [...]}; each resume is a dict with
+    filename, domain, text and pdf bytes, each job has domain and text.
+    Domains are drawn from ``mix`` (domain -> weight, all domains equally
+    by default).
+    """
+    rng = random.Random(seed)
+    mix = mix or {domain: 1.0 for domain in DOMAIN_PHRASES}
+    domains, weights = list(mix), list(mix.values())
+
+    corpus = {"resumes": [], "jobs": []}
+    for i in range(resumes):
+        domain = rng.choices(domains, weights)[0]
+        text = resume_text(rng, domain, resume_words)
+        corpus["resumes"].append({
+            "filename": f"resume_{i:04d}_{domain}.pdf",
+            "domain": domain,
+            "text": text,
+            "pdf": render_pdf(text),
+        })
+    for i in range(jobs):
+        domain = rng.choices(domains, weights)[0]
+        corpus["jobs"].append({"id": f"job_{i:03d}_{domain}", "domain": domain,
+                               "text": job_text(rng, domain, job_words)})
+    return corpus
+
+
+class UploadStub(io.BytesIO):
+    """In-memory stand-in for a Streamlit upload (name, type, getvalue, read)"""
+
+    def __init__(self, name, data, mime_type):
+        super().__init__(data)
+        self.name = name
+        self.type = mime_type
+        self.size = len(data)
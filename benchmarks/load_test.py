@@ -0,0 +1,142 @@
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.run import summarize
+
+PREDICT_PATH = "/predict/"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def multipart_body(filename, data):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def start_server(workers, port):
+    """Launch backend/serve.py in a subprocess, isolated like benchmarks.run"""
+    code = (
+        "from benchmarks.run import isolate_environment; isolate_environment(); "
+        f"from backend.serve import serve; serve('127.0.0.1', {port}, {workers}, log_level='warning')"
+    )
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    return subprocess.Popen([sys.executable, "-c", code], cwd=root)
+
+
+def wait_ready(port, server, timeout=300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/ready")
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def client_loop(args):
+    """One client process: post its uploads back to back over a keep-alive connection"""
+    port, uploads = args
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    latencies, errors = [], 0
+    for filename, pdf in uploads:
+        body, content_type = multipart_body(filename, pdf)
+        start = time.perf_counter()
+        try:
+            conn.request("POST", PREDICT_PATH, body=body, headers={"Content-Type": content_type})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+                continue
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return latencies, errors
+
+
+def measure(workers, corpus, clients, requests):
+    """Throughput of /predict against a server with ``workers`` processes"""
+    port = free_port()
+    server = start_server(workers, port)
+    try:
+        if not wait_ready(port, server):
+            return {"skipped": "server did not become ready (is the classifier trained?)"}
+        resumes = [(r["filename"], r["pdf"]) for r in corpus["resumes"]]
+        uploads = [resumes[i % len(resumes)] for i in range(requests)]
+        chunks = [(port, uploads[i::clients]) for i in range(clients)]
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(clients) as pool:
+            parts = pool.map(client_loop, chunks)
+        wall = time.perf_counter() - start
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(60)
+
+    latencies = [latency for part, _ in parts for latency in part]
+    if not latencies:
+        return {"skipped": "every request failed"}
+    stats = summarize(latencies)
+    stats.update(workers=workers, clients=clients, errors=sum(errors for _, errors in parts),
+                 wall_s=round(wall, 4), requests_per_second=round(len(latencies) / wall, 2))
+    return stats
+
+
+if __name__ == "__main__":
+    # Usage: python -m benchmarks.load_test --workers 1,2,4,8 --requests 2000
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, *(n for n in (2, 4, 8, 16) if n <= cores), cores})
+    parser = argparse.ArgumentParser(description="/predict throughput of backend/serve.py per worker count")
+    parser.add_argument("--workers", default=",".join(map(str, default_workers)))
+    parser.add_argument("--clients", type=int, default=None, help="Concurrent client processes (default: 2 per core)")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_test_results.json")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.resumes, 1, seed=args.seed)
+    clients = args.clients or 2 * cores
+    results = {}
+    for workers in (int(n) for n in args.workers.split(",")):
+        results[workers] = measure(workers, corpus, clients, args.requests)
+        stats = results[workers]
+        if "skipped" in stats:
+            sys.exit(f"Load test skipped: {stats['skipped']}")
+        baseline = results[min(results)]["requests_per_second"]
+        print(f"{workers:>3} workers: {stats['requests_per_second']:>8.1f} req/s "
+              f"(x{stats['requests_per_second'] / baseline:.2f})  p50 {stats['p50_ms']:.1f} ms  "
+              f"p95 {stats['p95_ms']:.1f} ms  errors {stats['errors']}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"cpu_count": cores, "clients": clients, "results": results}, f, indent=2)
+    print(f"\n✅ Results written to {args.output}")
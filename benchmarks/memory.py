@@ -0,0 +1,76 @@
+import argparse
+import gc
+import json
+import os
+import resource
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.corpus import generate_corpus
+
+# RSS growth over the run, after warm-up, that counts as a leak
+DEFAULT_MAX_GROWTH_MB = 10
+
+
+def rss_mb():
+    """Current resident set size in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure_parse_rss(pdf, parses=1000, warmup=20, sample_every=100):
+    """Parse the same PDF ``parses`` times with extract_resume_data, sampling RSS as it goes"""
+    from backend.resume_parser import extract_resume_data
+
+    for _ in range(warmup):
+        extract_resume_data(pdf)
+    gc.collect()
+    start = rss_mb()
+
+    samples = [(0, round(start, 1))]
+    for i in range(1, parses + 1):
+        extract_resume_data(pdf)
+        if i % sample_every == 0:
+            samples.append((i, round(rss_mb(), 1)))
+    gc.collect()
+    end = rss_mb()
+    return {
+        "parses": parses,
+        "pdf_bytes": len(pdf),
+        "rss_start_mb": round(start, 1),
+        "rss_end_mb": round(end, 1),
+        "growth_mb": round(end - start, 1),
+        "samples": samples,
+    }
+
+
+if __name__ == "__main__":
+    # Usage: python -m benchmarks.memory --parses 1000 --resume-words 2000
+    parser = argparse.ArgumentParser(description="RSS of repeated resume parsing, to catch leaks")
+    parser.add_argument("--parses", type=int, default=1000)
+    parser.add_argument("--resume-words", type=int, default=1500, help="Length of the synthetic resume")
+    parser.add_argument("--max-growth-mb", type=float, default=DEFAULT_MAX_GROWTH_MB)
+    parser.add_argument("--output", default=None, help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    pdf = generate_corpus(1, 1, resume_words=args.resume_words)["resumes"][0]["pdf"]
+    result = measure_parse_rss(pdf, args.parses)
+    for parses, rss in result["samples"]:
+        print(f"{parses:>6} parses: {rss:8.1f} MB")
+    print(f"\nRSS {result['rss_start_mb']} MB -> {result['rss_end_mb']} MB "
+          f"({result['growth_mb']:+.1f} MB over {result['parses']} parses)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    if result["growth_mb"] > args.max_growth_mb:
+        sys.exit(f"RSS grew by more than {args.max_growth_mb} MB")
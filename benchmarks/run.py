@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.corpus import UploadStub, generate_corpus, parse_mix, render_pdf
+
+BENCHMARKS = [
+    "extract_resume_data",
+    "extract_job_description[pdf]",
+    "extract_job_description[txt]",
+    "generate_match_score",
+    "apply_domain_matching",
+    "analyze_skill_gaps",
+    "classify_resume_role",
+    "classify_resume_roles[batch]",
+    "detect_domains[batch]",
+    "predict_endpoint",
+]
+
+# A benchmark counts as a regression when its p50 is this much slower than the baseline
+DEFAULT_TOLERANCE = 0.2
+
+
+class StubSupabase:
+    """Accepts inserts and rpc calls without a network, counting inserted rows"""
+
+    def __init__(self):
+        self.inserted = 0
+
+    def table(self, name):
+        return self
+
+    def insert(self, rows):
+        self.inserted += len(rows) if isinstance(rows, list) else 1
+        return self
+
+    def rpc(self, name, params=None):
+        return self
+
+    def execute(self):
+        return types.SimpleNamespace(data=[], count=0)
+
+
+def isolate_environment(embedding_cache=False):
+    """Keep benchmark runs off the real database and local stores.
+
+    Must run before any backend module is imported.
+    """
+    scratch = tempfile.mkdtemp(prefix="ats-bench-")
+    os.environ["RESUME_INDEX_PATH"] = ""
+    os.environ["JOB_LIBRARY_PATH"] = ""
+    os.environ["PREDICTION_JOURNAL_PATH"] = os.path.join(scratch, "pending_predictions.jsonl")
+    if not embedding_cache:
+        os.environ["EMBEDDING_CACHE_PATH"] = ""
+    stub = types.ModuleType("utils.supabase_client")
+    stub.supabase = StubSupabase()
+    sys.modules["utils.supabase_client"] = stub
+    return stub.supabase
+
+
+def summarize(latencies):
+    """Latency statistics in milliseconds plus calls per second"""
+    if not latencies:
+        return {"calls": 0}
+    ordered = sorted(latencies)
+    total = sum(ordered)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))] * 1000
+
+    return {
+        "calls": len(ordered),
+        "total_s": round(total, 4),
+        "mean_ms": round(total / len(ordered) * 1000, 3),
+        "p50_ms": round(percentile(0.50), 3),
+        "p95_ms": round(percentile(0.95), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "per_second": round(len(ordered) / total, 2) if total else None,
+    }
+
+
+def time_calls(fn, items, repeat=1, warmup=1):
+    """Call fn(item) for every item ``repeat`` times and summarize the latencies"""
+    for item in items[:warmup]:
+        fn(item)
+    latencies = []
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter()
+            fn(item)
+            latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def bench_predict_endpoint(corpus, concurrency, repeat):
+    """Throughput of FastAPI /predict with parallel clients; skipped when the classifier is not trained"""
+    from fastapi.testclient import TestClient
+    import backend.app as api
+
+    if not api.classifier_available():
+        return {"skipped": "classifier not trained (no artifacts in backend/models)"}
+
+    uploads = [(r["filename"], r["pdf"]) for r in corpus["resumes"]] * repeat
+
+    # One client for warm-up and timing: leaving its block runs the app's
+    # shutdown, so a separate warm-up client would tear the pools down first
+    with TestClient(api.app) as client:
+        client.post("/predict/", files={"file": uploads[0]}).raise_for_status()
+
+        def post_all(chunk):
+            latencies = []
+            for filename, pdf in chunk:
+                start = time.perf_counter()
+                response = client.post("/predict/", files={"file": (filename, pdf, "application/pdf")})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            return latencies
+
+        chunks = [uploads[i::concurrency] for i in range(concurrency)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = [latency for part in pool.map(post_all, chunks) for latency in part]
+        wall = time.perf_counter() - start
+
+    stats = summarize(latencies)
+    stats.update(concurrency=concurrency, wall_s=round(wall, 4), requests_per_second=round(len(latencies) / wall, 2))
+    return stats
+
+
+def run_benchmarks(corpus, selected=BENCHMARKS, repeat=1, concurrency=4):
+    """Run the selected benchmarks over a corpus; returns {name: stats}"""
+    from backend.resume_parser import extract_resume_data, clean_text
+    from backend.job_parser import extract_job_description
+    from backend.matcher import generate_match_score, apply_domain_matching
+    from utils.gemini_helper import analyze_skill_gaps
+    from backend.role_classifier import classify_resume_role, classify_resume_roles
+    from backend.matcher import detect_domains
+
+    resumes, jobs = corpus["resumes"], corpus["jobs"]
+    # Every resume paired with a job, round robin
+    pairs = [(clean_text(r["text"]), jobs[i % len(jobs)]["text"]) for i, r in enumerate(resumes)]
+    job_pdfs = [render_pdf(job["text"]) for job in jobs]
+
+    results = {}
+    if "extract_resume_data" in selected:
+        results["extract_resume_data"] = time_calls(extract_resume_data, [r["pdf"] for r in resumes], repeat)
+    if "extract_job_description[pdf]" in selected:
+        results["extract_job_description[pdf]"] = time_calls(
+            lambda pdf: extract_job_description(UploadStub("job.pdf", pdf, "application/pdf")), job_pdfs, repeat)
+    if "extract_job_description[txt]" in selected:
+        results["extract_job_description[txt]"] = time_calls(
+            lambda job: extract_job_description(UploadStub("job.txt", job["text"].encode("utf-8"), "text/plain")),
+            jobs, repeat)
+    if "generate_match_score" in selected:
+        results["generate_match_score"] = time_calls(lambda pair: generate_match_score(*pair), pairs, repeat)
+    if "apply_domain_matching" in selected:
+        results["apply_domain_matching"] = time_calls(lambda pair: apply_domain_matching(*pair, 75.0), pairs, repeat)
+    if "analyze_skill_gaps" in selected:
+        skills = [extract_resume_data(r["pdf"])[1]["skills"] for r in resumes]
+        skill_pairs = [(s, jobs[i % len(jobs)]["text"]) for i, s in enumerate(skills)]
+        results["analyze_skill_gaps"] = time_calls(lambda pair: analyze_skill_gaps(*pair), skill_pairs, repeat)
+    if "classify_resume_role" in selected:
+        results["classify_resume_role"] = time_calls(classify_resume_role, [r["text"] for r in resumes], repeat)
+    # The whole corpus in one call; compare total_s with the per-resume benchmarks
+    if "classify_resume_roles[batch]" in selected:
+        results["classify_resume_roles[batch]"] = time_calls(classify_resume_roles, [[r["text"] for r in resumes]], repeat)
+    if "detect_domains[batch]" in selected:
+        results["detect_domains[batch]"] = time_calls(detect_domains, [[r["text"] for r in resumes]], repeat)
+    if "predict_endpoint" in selected:
+        results["predict_endpoint"] = bench_predict_endpoint(corpus, concurrency, repeat)
+    return results
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Compare p50 latencies with a saved run; returns rows of (name, baseline_ms, current_ms, ratio, status)"""
+    rows = []
+    for name, stats in current["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name, {})
+        if "p50_ms" not in stats or "p50_ms" not in base:
+            rows.append((name, base.get("p50_ms"), stats.get("p50_ms"), None, "n/a"))
+            continue
+        ratio = stats["p50_ms"] / base["p50_ms"] if base["p50_ms"] else None
+        if ratio is None:
+            status = "n/a"
+        elif ratio > 1 + tolerance:
+            status = "REGRESSION"
+        elif ratio < 1 - tolerance:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, base["p50_ms"], stats["p50_ms"], ratio, status))
+    return rows
+
+
+def print_report(results, comparison=None):
+    print(f"{'benchmark':32} {'calls':>6} {'p50 ms':>10} {'p95 ms':>10} {'per sec':>10}")
+    for name, stats in results["benchmarks"].items():
+        if "skipped" in stats:
+            print(f"{name:32} skipped: {stats['skipped']}")
+            continue
+        print(f"{name:32} {stats['calls']:>6} {stats['p50_ms']:>10.2f} {stats['p95_ms']:>10.2f} "
+              f"{stats.get('requests_per_second', stats['per_second']) or 0:>10.1f}")
+    if comparison:
+        print(f"\n{'benchmark':32} {'baseline':>10} {'current':>10} {'ratio':>7}  status")
+        for name, base, cur, ratio, status in comparison:
+            fmt = lambda v: f"{v:.2f}" if v is not None else "-"
+            print(f"{name:32} {fmt(base):>10} {fmt(cur):>10} {fmt(ratio):>7}  {status}")
+
+
+if __name__ == "__main__":
+    # Usage: python -m benchmarks.run --resumes 100 --mix technology=0.6,commerce=0.4 --baseline base.json
+    parser = argparse.ArgumentParser(description="Time parsing, matching and the /predict endpoint on a synthetic corpus")
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--jobs", type=int, default=5)
+    parser.add_argument("--resume-words", type=int, default=400)
+    parser.add_argument("--job-words", type=int, default=250)
+    parser.add_argument("--mix", default=None, help="Domain weights, e.g. technology=0.6,hr=0.4")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus per benchmark")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel clients for /predict")
+    parser.add_argument("--only", default=None, help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--embedding-cache", action="store_true", help="Keep the embedding disk cache on")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=None, help="Earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    selected = args.only.split(",") if args.only else BENCHMARKS
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        sys.exit(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    isolate_environment(args.embedding_cache)
+    corpus = generate_corpus(args.resumes, args.jobs, args.resume_words, args.job_words,
+                             parse_mix(args.mix) if args.mix else None, args.seed)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "encoder_backend": os.getenv("ENCODER_BACKEND", "torch"),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        },
+        "benchmarks": run_benchmarks(corpus, selected, args.repeat, args.concurrency),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            comparison = compare(results, json.load(f), args.tolerance)
+    print_report(results, comparison)
+    print(f"\n✅ Results written to {args.output}")
+
+    if comparison and any(status == "REGRESSION" for *_, status in comparison):
+        sys.exit(1)
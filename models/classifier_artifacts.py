@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from functools import lru_cache
+
+import numpy as np
+
+FORMAT_NAME = "ats-text-classifier"
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+# Vectorizer settings that decide how text becomes tokens
+ANALYZER_PARAMS = ("lowercase", "token_pattern", "ngram_range", "strip_accents", "analyzer", "stop_words")
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _jsonable(value):
+    if isinstance(value, (frozenset, set)):
+        return sorted(value)
+    if isinstance(value, tuple):
+        return list(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def save_classifier(directory, model, vectorizer):
+    """Write a fitted linear model and its vectorizer as memory-mappable artifacts.
+
+    Supports TfidfVectorizer/CountVectorizer (vocabulary stored as a sorted
+    UTF-8 blob with offsets) and HashingVectorizer (no vocabulary), with any
+    linear classifier exposing coef_, intercept_ and classes_. The directory
+    is replaced atomically.
+    """
+    params = vectorizer.get_params()
+    manifest = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "vectorizer": {
+            "kind": "hashing" if not hasattr(vectorizer, "vocabulary_") else "vocabulary",
+            "params": {name: _jsonable(params[name]) for name in ANALYZER_PARAMS if name in params},
+        },
+        "model": {
+            "classes": [_jsonable(c) for c in model.classes_],
+            # LogisticRegression is multinomial; SGD-style learners are one-vs-rest
+            "proba": "softmax" if type(model).__name__ == "LogisticRegression" else "ovr",
+        },
+        "arrays": {},
+    }
+    vec = manifest["vectorizer"]
+    if vec["kind"] == "hashing":
+        for name in ("n_features", "alternate_sign", "norm", "binary"):
+            vec["params"][name] = _jsonable(params[name])
+    else:
+        for name in ("norm", "use_idf", "smooth_idf", "sublinear_tf", "binary"):
+            if name in params:
+                vec["params"][name] = _jsonable(params[name])
+
+    arrays = {
+        "coef": np.ascontiguousarray(model.coef_, dtype=np.float32),
+        "intercept": np.ascontiguousarray(model.intercept_, dtype=np.float32),
+    }
+    if vec["kind"] == "vocabulary":
+        terms = sorted(vectorizer.vocabulary_)
+        encoded = [term.encode("utf-8") for term in terms]
+        arrays["vocab_blob"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        arrays["vocab_offsets"] = np.cumsum([0] + [len(b) for b in encoded], dtype=np.int64)
+        arrays["vocab_columns"] = np.array([vectorizer.vocabulary_[t] for t in terms], dtype=np.int32)
+        if getattr(vectorizer, "idf_", None) is not None:
+            arrays["idf"] = np.ascontiguousarray(vectorizer.idf_, dtype=np.float32)
+
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".classifier-", dir=parent)
+    try:
+        for name, array in arrays.items():
+            filename = f"{name}.npy"
+            np.save(os.path.join(staging, filename), array)
+            manifest["arrays"][name] = {
+                "file": filename,
+                "dtype": str(array.dtype),
+                "shape": list(array.shape),
+                "sha256": _sha256(os.path.join(staging, filename)),
+            }
+        with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        # Swap the new directory in so readers never see a half-written one
+        backup = None
+        if os.path.exists(directory):
+            backup = staging + ".old"
+            os.replace(directory, backup)
+        os.replace(staging, directory)
+        if backup:
+            shutil.rmtree(backup, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return manifest
+
+
+class _SortedTerms:
+    """Read-only sequence over the sorted vocabulary blob, for bisect"""
+
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].tobytes().decode("utf-8")
+
+
+class MappedVectorizer:
+    """transform()-compatible stand-in for the fitted sklearn vectorizer.
+
+    Tokenization is rebuilt from the saved analyzer settings; vocabulary,
+    idf and everything else numeric stay in memory-mapped files.
+    """
+
+    def __init__(self, spec, arrays):
+        from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+
+        self.kind = spec["kind"]
+        params = dict(spec["params"])
+        if isinstance(params.get("ngram_range"), list):
+            params["ngram_range"] = tuple(params["ngram_range"])
+        analyzer_params = {name: params[name] for name in ANALYZER_PARAMS if name in params}
+
+        if self.kind == "hashing":
+            self._hashing = HashingVectorizer(**analyzer_params, n_features=params["n_features"],
+                                              alternate_sign=params["alternate_sign"], norm=params["norm"],
+                                              binary=params["binary"])
+            return
+
+        self._analyze = CountVectorizer(**analyzer_params).build_analyzer()
+        self._terms = _SortedTerms(arrays["vocab_blob"], arrays["vocab_offsets"])
+        self._columns = arrays["vocab_columns"]
+        self._idf = arrays.get("idf")
+        self.n_features = len(self._columns)
+        self.norm = params.get("norm")
+        self.sublinear_tf = params.get("sublinear_tf", False)
+        self.binary = params.get("binary", False)
+        self.column_of = lru_cache(maxsize=65536)(self._lookup)
+
+    def _lookup(self, token):
+        import bisect
+
+        i = bisect.bisect_left(self._terms, token)
+        if i < len(self._terms) and self._terms[i] == token:
+            return int(self._columns[i])
+        return -1
+
+    def transform(self, texts):
+        if self.kind == "hashing":
+            return self._hashing.transform(texts)
+
+        from scipy import sparse
+
+        indptr, indices, values = [0], [], []
+        for text in texts:
+            counts = {}
+            for token in self._analyze(text):
+                column = self.column_of(token)
+                if column >= 0:
+                    counts[column] = counts.get(column, 0) + 1
+            indices.extend(counts)
+            values.extend(counts.values())
+            indptr.append(len(indices))
+        X = sparse.csr_matrix((np.asarray(values, dtype=np.float64), indices, indptr),
+                              shape=(len(indptr) - 1, self.n_features))
+        X.sort_indices()
+        if self.binary:
+            X.data[:] = 1.0
+        if self.sublinear_tf:
+            np.log(X.data, out=X.data)
+            X.data += 1.0
+        if self._idf is not None:
+            X = X @ sparse.diags(np.asarray(self._idf, dtype=np.float64))
+            X = X.tocsr()
+        if self.norm:
+            from sklearn.preprocessing import normalize
+            X = normalize(X, norm=self.norm, copy=False)
+        return X
+
+
+class MappedLinearModel:
+    """predict/predict_proba/decision_function over memory-mapped coefficients"""
+
+    def __init__(self, spec, arrays):
+        self.classes_ = np.array(spec["classes"])
+        self.proba = spec["proba"]
+        self.coef_ = arrays["coef"]
+        self.intercept_ = arrays["intercept"]
+
+    def decision_function(self, X):
+        scores = np.asarray(X @ self.coef_.T) + self.intercept_
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict(self, X):
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            return self.classes_[(scores > 0).astype(int)]
+        return self.classes_[scores.argmax(axis=1)]
+
+    def predict_proba(self, X):
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            positive = 1.0 / (1.0 + np.exp(-scores))
+            return np.column_stack([1.0 - positive, positive])
+        if self.proba == "softmax":
+            scores = scores - scores.max(axis=1, keepdims=True)
+            exp = np.exp(scores)
+            return exp / exp.sum(axis=1, keepdims=True)
+        # One-vs-rest: per-class sigmoids, normalized to sum to one
+        prob = 1.0 / (1.0 + np.exp(-scores))
+        return prob / np.maximum(prob.sum(axis=1, keepdims=True), 1e-12)
+
+
+def load_classifier(directory, verify=True):
+    """Open saved artifacts as (model, vectorizer) without unpickling anything.
+
+    Arrays are memory-mapped read-only, so processes loading the same
+    directory share their pages through the OS page cache. With ``verify``
+    every array file is checked against the manifest's SHA-256.
+    """
+    with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_NAME:
+        raise ValueError(f"{directory} is not a {FORMAT_NAME} artifact")
+    if manifest.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(f"Artifact version {manifest['version']} is newer than supported ({FORMAT_VERSION})")
+
+    arrays = {}
+    for name, entry in manifest["arrays"].items():
+        path = os.path.join(directory, entry["file"])
+        if verify and _sha256(path) != entry["sha256"]:
+            raise ValueError(f"Checksum mismatch for {path}")
+        array = np.load(path, mmap_mode="r")
+        if list(array.shape) != entry["shape"] or str(array.dtype) != entry["dtype"]:
+            raise ValueError(f"{path} does not match its manifest entry")
+        arrays[name] = array
+
+    return MappedLinearModel(manifest["model"], arrays), MappedVectorizer(manifest["vectorizer"], arrays)
+
+
+if __name__ == "__main__":
+    # Usage: python models/classifier_artifacts.py model.pkl vectorizer.pkl backend/models/resume_classifier
+    import argparse
+    import pickle
+
+    parser = argparse.ArgumentParser(description="Convert pickled classifier artifacts to the memory-mapped format")
+    parser.add_argument("model_pickle")
+    parser.add_argument("vectorizer_pickle")
+    parser.add_argument("output_dir")
+    args = parser.parse_args()
+
+    with open(args.model_pickle, "rb") as f:
+        model = pickle.load(f)
+    with open(args.vectorizer_pickle, "rb") as f:
+        vectorizer = pickle.load(f)
+    save_classifier(args.output_dir, model, vectorizer)
+    print(f"✅ Classifier artifacts written to {args.output_dir}")
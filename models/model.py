@@ -1,7 +1,180 @@
-from sentence_transformers import SentenceTransformer
+import os
+import json
+import threading
 
-def load_model_and_tokenizer():
-    # Load a pretrained model — you will later replace this with your trained version
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    tokenizer = None  # Optional, based on model
-    return model, tokenizer
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Name of the sentence-transformer used for embeddings
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Encoder runtime: "torch" (default), "onnx", or "onnx-int8" (dynamically quantized)
+ENCODER_BACKEND = os.getenv("ENCODER_BACKEND", "torch")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(BASE_DIR, "onnx", MODEL_NAME))
+
+# Identifies the vectors a backend produces; used to key the embedding cache
+EMBEDDING_MODEL_ID = MODEL_NAME if ENCODER_BACKEND == "torch" else f"{MODEL_NAME}:{ENCODER_BACKEND}"
+
+def load_model_and_tokenizer(backend=None):
+    backend = backend or ENCODER_BACKEND
+    if backend == "torch":
+        # Imported here so importing this module does not pull in torch
+        from sentence_transformers import SentenceTransformer
+
+        # Load a pretrained model — you will later replace this with your trained version
+        model = SentenceTransformer(MODEL_NAME)
+        tokenizer = None  # Optional, based on model
+        return model, tokenizer
+    if backend in ("onnx", "onnx-int8"):
+        model = OnnxEncoder.load(ONNX_MODEL_DIR, quantized=backend == "onnx-int8")
+        return model, model.tokenizer
+    raise ValueError(f"Unknown ENCODER_BACKEND '{backend}' (expected torch, onnx or onnx-int8)")
+
+class OnnxEncoder:
+    """Sentence encoder running an exported ONNX graph on onnxruntime's CPU provider.
+
+    Reproduces the sentence-transformers pipeline (tokenize, mean-pool over the
+    attention mask, L2-normalize) and exposes the same ``encode`` call the
+    matcher uses, so it can stand in for SentenceTransformer.
+    """
+
+    ONNX_FILE = "model.onnx"
+    QUANTIZED_FILE = "model-int8.onnx"
+
+    def __init__(self, session, tokenizer, max_seq_length=256):
+        self.session = session
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+        self._input_names = {i.name for i in session.get_inputs()}
+
+    @classmethod
+    def load(cls, model_dir, quantized=False):
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "The ONNX encoder needs onnxruntime and transformers: pip install onnxruntime transformers"
+            ) from e
+
+        model_path = cls.ensure_exported(model_dir, quantized)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        with open(os.path.join(model_dir, "encoder_config.json")) as f:
+            max_seq_length = json.load(f)["max_seq_length"]
+        return cls(session, tokenizer, max_seq_length)
+
+    @classmethod
+    def ensure_exported(cls, model_dir, quantized=False):
+        """Path of the ONNX graph in model_dir, exporting it from the PyTorch model first if missing"""
+        model_path = os.path.join(model_dir, cls.QUANTIZED_FILE if quantized else cls.ONNX_FILE)
+        if not os.path.exists(model_path):
+            # One-off export from the PyTorch model
+            from models.onnx_export import export_onnx
+            export_onnx(model_dir, quantize=quantized)
+        return model_path
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        # Length-sorted batches keep padding small, as sentence-transformers does
+        order = sorted(range(len(sentences)), key=lambda i: len(sentences[i]))
+        embeddings = None
+        for start in range(0, len(order), batch_size):
+            batch_idx = order[start:start + batch_size]
+            batch_vecs = self._encode_batch([sentences[i] for i in batch_idx])
+            if embeddings is None:
+                embeddings = np.empty((len(sentences), batch_vecs.shape[1]), dtype=np.float32)
+            embeddings[batch_idx] = batch_vecs
+        if embeddings is None:
+            embeddings = np.empty((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, sentences):
+        encoded = self.tokenizer(
+            list(sentences), padding=True, truncation=True,
+            max_length=self.max_seq_length, return_tensors="np"
+        )
+        feeds = {name: encoded[name].astype(np.int64) for name in self._input_names if name in encoded}
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, then L2 normalization
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+class LazyModel:
+    """Load an expensive model once, on first use or in a background warmup.
+
+    ``get()`` is safe to call from many threads: the loader runs exactly once
+    and concurrent callers wait for it. ``warmup()`` starts loading in a daemon
+    thread so process start is not blocked on it.
+    """
+
+    def __init__(self, loader, name):
+        self.loader = loader
+        self.name = name
+        self.error = None
+        self._value = None
+        self._loaded = threading.Event()
+        self._lock = threading.Lock()
+        self._warmup_thread = None
+
+    @property
+    def ready(self):
+        return self._loaded.is_set() and self.error is None
+
+    def status(self):
+        if self.ready:
+            return "ready"
+        if self.error is not None:
+            return f"failed: {self.error}"
+        return "loading" if self._lock.locked() or self._warmup_thread else "not started"
+
+    def get(self):
+        if self._loaded.is_set() and self.error is None:
+            return self._value
+        with self._lock:
+            if not self._loaded.is_set() or self.error is not None:
+                try:
+                    self._value = self.loader()
+                    self.error = None
+                except Exception as e:
+                    self.error = e
+                    raise
+                finally:
+                    self._loaded.set()
+        return self._value
+
+    def reset(self):
+        """Forget the loaded value so the next get() runs the loader again"""
+        with self._lock:
+            self._value = None
+            self.error = None
+            self._warmup_thread = None
+            self._loaded.clear()
+
+    def warmup(self):
+        """Start loading in the background; calling it again is a no-op"""
+        if self._warmup_thread is None and not self._loaded.is_set():
+            self._warmup_thread = threading.Thread(
+                target=self._warm, name=f"warmup-{self.name}", daemon=True
+            )
+            self._warmup_thread.start()
+        return self._warmup_thread
+
+    def _warm(self):
+        try:
+            self.get()
+        except Exception:
+            pass  # Recorded in self.error and retried by the next get()
+
+# Sentence-transformer shared by everything that embeds text
+embedding_model = LazyModel(load_model_and_tokenizer, "embedding")
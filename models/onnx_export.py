@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.model import MODEL_NAME, ONNX_MODEL_DIR, OnnxEncoder, load_model_and_tokenizer
+
+CONFIG_FILE = "encoder_config.json"
+
+# Largest allowed gap between ONNX and PyTorch cosine scores (0-1 scale)
+PARITY_TOLERANCE = {"onnx": 1e-4, "onnx-int8": 2e-2}
+
+
+def export_onnx(output_dir=ONNX_MODEL_DIR, quantize=True):
+    """Export the sentence-transformer's encoder to ONNX, optionally with an int8 copy.
+
+    Files are written to a scratch directory and moved into ``output_dir``
+    with os.replace, the .onnx graphs last, so a process that finds a graph
+    there (as OnnxEncoder.load checks) always sees a complete export, even
+    while several processes export at once.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".export-", dir=output_dir)
+    try:
+        _export_to(staging, quantize)
+        for name in sorted(os.listdir(staging), key=lambda name: name.endswith(".onnx")):
+            os.replace(os.path.join(staging, name), os.path.join(output_dir, name))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return output_dir
+
+
+def _export_to(output_dir, quantize):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st_model = SentenceTransformer(MODEL_NAME, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+
+    class TokenEmbeddings(torch.nn.Module):
+        # Fixes the argument order and returns only the last hidden state
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    onnx_path = os.path.join(output_dir, OnnxEncoder.ONNX_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(transformer),
+            tuple(sample[name] for name in input_names),
+            onnx_path,
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            dynamo=False,
+        )
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, CONFIG_FILE), "w") as f:
+        json.dump({"model_name": MODEL_NAME, "max_seq_length": st_model.max_seq_length}, f)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            onnx_path,
+            os.path.join(output_dir, OnnxEncoder.QUANTIZED_FILE),
+            weight_type=QuantType.QInt8,
+        )
+
+
+def compare_backends(texts, onnx_dir=ONNX_MODEL_DIR, backends=("torch", "onnx", "onnx-int8"), batch_size=32):
+    """Embed texts with each backend; report cosine parity with torch and throughput"""
+    reference = None
+    report = {}
+    for backend in backends:
+        if backend == "torch":
+            model, _ = load_model_and_tokenizer("torch")
+        else:
+            model = OnnxEncoder.load(onnx_dir, quantized=backend == "onnx-int8")
+        model.encode(texts[:batch_size], batch_size=batch_size)  # warm up
+
+        start = time.perf_counter()
+        vectors = np.asarray(model.encode(texts, batch_size=batch_size), dtype=np.float32)
+        elapsed = time.perf_counter() - start
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        entry = {"texts_per_second": round(len(texts) / elapsed, 1)}
+        if reference is None:
+            reference = vectors
+        else:
+            # Compare the score the matcher would compute: cosine against every other text
+            max_gap = float(np.abs(vectors @ vectors.T - reference @ reference.T).max())
+            entry["max_cosine_gap"] = max_gap
+            entry["within_tolerance"] = max_gap <= PARITY_TOLERANCE.get(backend, 0.0)
+        report[backend] = entry
+    return report
+
+
+if __name__ == "__main__":
+    # Usage: python models/onnx_export.py [--no-quantize] [--compare FILE]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX and check parity")
+    parser.add_argument("--output-dir", default=ONNX_MODEL_DIR)
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="text file with one document per line to compare backends on")
+    args = parser.parse_args()
+
+    export_onnx(args.output_dir, quantize=not args.no_quantize)
+    print(f"✅ ONNX model exported to {args.output_dir}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            documents = [line.strip() for line in f if line.strip()]
+        report = compare_backends(documents, onnx_dir=args.output_dir)
+        print(json.dumps(report, indent=2))
+        if not all(entry.get("within_tolerance", True) for entry in report.values()):
+            sys.exit(1)
@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+import types
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class StubSupabase:
+    """Accepts inserts and rpc calls without a network, keeping inserted rows"""
+
+    def __init__(self):
+        self.rows = []
+
+    def table(self, name):
+        return self
+
+    def insert(self, rows):
+        self.rows.extend(rows if isinstance(rows, list) else [rows])
+        return self
+
+    def rpc(self, name, params=None):
+        return self
+
+    def execute(self):
+        return types.SimpleNamespace(data=[], count=0)
+
+
+# Tests never touch the real database or the local stores under data/;
+# this has to happen before any backend module is imported
+_scratch = tempfile.mkdtemp(prefix="ats-tests-")
+os.environ["RESUME_INDEX_PATH"] = ""
+os.environ["JOB_LIBRARY_PATH"] = ""
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+os.environ["BATCH_JOBS_PATH"] = os.path.join(_scratch, "batch_jobs.sqlite")
+os.environ["PREDICTION_JOURNAL_PATH"] = os.path.join(_scratch, "pending_predictions.jsonl")
+
+_stub = types.ModuleType("utils.supabase_client")
+_stub.supabase = StubSupabase()
+sys.modules["utils.supabase_client"] = _stub
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from backend.matcher import detect_domain, detect_domains, domain_matcher
+from backend.role_classifier import classify_resume_role, classify_resume_roles, role_matcher
+from benchmarks.corpus import DOMAIN_PHRASES, job_text, resume_text
+
+EDGE_CASES = [
+    "",
+    "   \n\t ",
+    "Curriculum vitae of a person with no listed skills.",
+    # Keywords listed under more than one role or domain
+    "python",
+    "CSS and HTML",
+    "Python, pandas and numpy; HTML, CSS and JavaScript with React.",
+    "Business development, sales and marketing.",
+    "Sales targets, CRM and revenue growth through marketing campaigns.",
+    # Ties between roles, resolved in ROLE_KEYWORDS order
+    "react git figma adobe",
+    "agile scrum excel seo social media brand",
+    "negotiation crm b2b seo advertising brand",
+    # Ties between domains, resolved in the order detect_domain checks them
+    "python software developer sales marketing business",
+    "payroll hiring onboarding patient clinical nursing",
+    "sales retail profit payroll benefits workforce",
+    # Exactly at and just below MIN_DOMAIN_KEYWORDS
+    "docker aws cloud",
+    "docker aws",
+    # Repeats count once, and keywords inside longer words still match
+    "python python python PYTHON",
+    "mlops engineers ship apis",
+]
+
+
+def mixed_corpus(count=60, seed=0):
+    rng = random.Random(seed)
+    domains = list(DOMAIN_PHRASES)
+    documents = list(EDGE_CASES)
+    for i in range(count):
+        domain = domains[i % len(domains)]
+        words = rng.choice([5, 20, 80, 300])
+        documents.append(resume_text(rng, domain, words) if i % 2 else job_text(rng, domain, words))
+    return documents
+
+
+@pytest.mark.parametrize("matcher", [role_matcher, domain_matcher], ids=["roles", "domains"])
+def test_count_matrix_matches_count(matcher):
+    documents = mixed_corpus()
+    counts = matcher.count_matrix(documents)
+
+    assert counts.shape == (len(documents), len(matcher.categories))
+    for row, text in zip(counts, documents):
+        expected = matcher.count(text)
+        assert dict(zip(matcher.categories, row.tolist())) == {
+            category: expected.get(category, 0) for category in matcher.categories
+        }, text
+
+
+def test_classify_resume_roles_matches_per_document():
+    documents = mixed_corpus()
+    assert classify_resume_roles(documents) == [classify_resume_role(text) for text in documents]
+
+
+def test_detect_domains_matches_per_document():
+    documents = mixed_corpus()
+    assert detect_domains(documents) == [detect_domain(text) for text in documents]
+
+
+def test_ties_and_empty_documents():
+    assert classify_resume_roles(["", "python", "CSS and HTML"]) == [
+        "General", "Software Developer", "Software Developer"]
+    assert detect_domains(["", "docker aws", "python software developer sales marketing business"]) == [
+        "general", "general", "technology"]
+
+
+def test_empty_batch():
+    assert classify_resume_roles([]) == []
+    assert detect_domains(iter([])) == []
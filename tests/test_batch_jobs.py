@@ -0,0 +1,124 @@
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("fitz")
+
+import backend.batch_jobs as batch_jobs
+from backend.batch_jobs import BatchJobManager
+
+
+def fake_results(batch, job_text, workers=None, cache=None):
+    for tag, pdf in batch:
+        yield {"filename": tag, "match_score": float(len(pdf))}
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def manager_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_jobs, "iter_batch_results", fake_results)
+    return str(tmp_path / "jobs.sqlite")
+
+
+def test_unknown_job_has_no_status(manager_path):
+    manager = BatchJobManager(manager_path)
+    assert manager.status("missing") is None
+    manager.close()
+
+
+def test_job_runs_to_completion(manager_path):
+    manager = BatchJobManager(manager_path)
+    job_id = manager.submit([("a.pdf", b"12"), ("a.pdf", b"1234")], "job")
+
+    assert wait_for(lambda: manager.status(job_id)["status"] == "completed")
+    results, errors = manager.results(job_id)
+    assert [r["match_score"] for r in results] == [2.0, 4.0]
+    assert errors == []
+    manager.close()
+
+
+def test_jobs_are_listed_only_for_their_owner(manager_path):
+    manager = BatchJobManager(manager_path)
+    mine = manager.submit([], "job", title="mine", owner="session-a")
+    theirs = manager.submit([], "job", title="theirs", owner="session-b")
+    manager.submit([], "job", title="ownerless")
+
+    assert [job["id"] for job in manager.list_jobs("session-a")] == [mine]
+    assert [job["id"] for job in manager.list_jobs("session-b")] == [theirs]
+    assert manager.list_jobs(None) == []
+    # The job id itself still opens the job, e.g. from a shared link
+    assert manager.status(theirs)["title"] == "theirs"
+    manager.close()
+
+
+def test_close_releases_the_lease(manager_path, monkeypatch):
+    release = threading.Event()
+
+    def stalled_results(batch, job_text, workers=None, cache=None):
+        for tag, pdf in batch:
+            release.wait(5)
+            yield {"filename": tag, "match_score": 1.0}
+
+    monkeypatch.setattr(batch_jobs, "iter_batch_results", stalled_results)
+    manager = BatchJobManager(manager_path)
+    job_id = manager.submit([("a.pdf", b"1"), ("b.pdf", b"2")], "job")
+    assert wait_for(lambda: manager.status(job_id)["status"] == "running")
+
+    release.set()
+    manager.close()
+    lease_until, owner = manager._conn.execute(
+        "SELECT lease_until, lease_owner FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    assert owner is None
+    assert lease_until == 0
+
+
+def test_lease_of_dead_process_is_reclaimed(manager_path):
+    manager = BatchJobManager(manager_path)
+    job_id = manager.submit([], "job")
+    assert wait_for(lambda: manager.status(job_id)["status"] == "completed")
+
+    # A lease held by a process on this host that has exited
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    with manager._lock:
+        manager._conn.execute(
+            "UPDATE jobs SET status = 'running', lease_until = ?, lease_owner = ? WHERE id = ?",
+            (time.time() + 3600, f"{socket.gethostname()}:{dead.pid}", job_id))
+        manager._conn.commit()
+    manager.close()
+
+    restarted = BatchJobManager(manager_path)
+    assert wait_for(lambda: restarted.status(job_id)["status"] == "completed")
+    restarted.close()
+
+
+def test_lease_of_live_process_is_kept(manager_path):
+    manager = BatchJobManager(manager_path)
+    job_id = manager.submit([], "job")
+    assert wait_for(lambda: manager.status(job_id)["status"] == "completed")
+
+    # The test process itself stands in for a live runner
+    owner = f"{socket.gethostname()}:{batch_jobs.os.getppid()}"
+    with manager._lock:
+        manager._conn.execute(
+            "UPDATE jobs SET status = 'running', lease_until = ?, lease_owner = ? WHERE id = ?",
+            (time.time() + 3600, owner, job_id))
+        manager._conn.commit()
+
+    restarted = BatchJobManager(manager_path)
+    time.sleep(0.5)
+    assert restarted.status(job_id)["status"] == "running"
+    restarted.close()
@@ -0,0 +1,106 @@
+import os
+import signal
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.embedding_cache import EmbeddingCache
+from backend.vector_index import VectorIndex
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+
+
+def in_child(work):
+    """Run work() in a forked child; return its exit code"""
+    pid = os.fork()
+    if pid == 0:
+        signal.alarm(10)  # a hang ends the child with SIGALRM instead
+        code = 1
+        try:
+            work()
+            code = 0
+        finally:
+            os._exit(code)
+    return os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+
+
+def test_stores_opened_before_fork_work_in_the_child(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), "model")
+    index = VectorIndex(str(tmp_path / "index.sqlite"))
+    cache.put_many(["parent"], [np.ones(4)])
+    parent_connections = (cache._conn, index._conn)
+
+    def work():
+        assert cache._conn is not parent_connections[0]
+        assert index._conn is not parent_connections[1]
+        assert cache.get_many(["parent"])[0] is not None
+        cache.put_many(["child"], [np.zeros(4)])
+        index.add(["resume"], [np.ones(4)], [{"role": "child"}])
+
+    assert in_child(work) == 0
+    # The parent's connections were left alone and see the child's writes
+    assert cache._conn is parent_connections[0]
+    assert cache.get_many(["child"])[0] is not None
+    assert [hit[0] for hit in index.search(np.ones(4))] == ["resume"]
+
+
+def test_closed_store_reopens_on_next_use(tmp_path):
+    index = VectorIndex(str(tmp_path / "index.sqlite"))
+    index.add(["a"], [np.ones(4)])
+    index.close()
+
+    assert in_child(lambda: index.add(["b"], [np.ones(4)])) == 0
+    assert len(index) == 2
+
+
+def test_stage_metrics_work_in_a_child_forked_while_a_lock_is_held():
+    from utils.metrics import STAGE_SECONDS, stage
+
+    taken, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with STAGE_SECONDS._lock:
+            taken.set()
+            release.wait(10)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    taken.wait(5)
+    try:
+        def work():
+            with stage("pdf_extraction"):
+                pass
+
+        # Without fresh locks the child would block forever in stage()
+        assert in_child(work) == 0
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_onnx_export_publishes_complete_files_only(tmp_path, monkeypatch):
+    import models.onnx_export as onnx_export
+
+    def fake_export(directory, quantize, fail=False):
+        for name in ("tokenizer.json", onnx_export.CONFIG_FILE, "model.onnx"):
+            if fail and name == "model.onnx":
+                raise RuntimeError("export failed")
+            with open(os.path.join(directory, name), "w") as f:
+                f.write(name)
+
+    output_dir = tmp_path / "onnx"
+    monkeypatch.setattr(onnx_export, "_export_to", lambda d, q: fake_export(d, q, fail=True))
+    with pytest.raises(RuntimeError):
+        onnx_export.export_onnx(str(output_dir))
+    assert os.listdir(output_dir) == []
+
+    # Concurrent exports into one directory leave one complete copy behind
+    monkeypatch.setattr(onnx_export, "_export_to", fake_export)
+    threads = [threading.Thread(target=onnx_export.export_onnx, args=(str(output_dir),)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(os.listdir(output_dir)) == sorted(["tokenizer.json", onnx_export.CONFIG_FILE, "model.onnx"])
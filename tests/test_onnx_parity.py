@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("fitz")
+
+from benchmarks.corpus import DOMAIN_PHRASES, job_text, resume_text
+from models.onnx_export import PARITY_TOLERANCE, compare_backends, export_onnx
+
+
+@pytest.fixture(scope="module")
+def onnx_dir(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("onnx")
+    try:
+        export_onnx(str(directory), quantize=True)
+    except OSError as e:
+        # The PyTorch model comes from the Hugging Face hub
+        pytest.skip(f"embedding model unavailable: {e}")
+    return str(directory)
+
+
+def sample_documents(count=24, seed=0):
+    rng = random.Random(seed)
+    domains = list(DOMAIN_PHRASES)
+    documents = []
+    for i in range(count):
+        domain = domains[i % len(domains)]
+        documents.append(resume_text(rng, domain, 300) if i % 2 else job_text(rng, domain, 200))
+    return documents
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_onnx_scores_match_torch(onnx_dir, backend):
+    report = compare_backends(sample_documents(), onnx_dir=onnx_dir, backends=("torch", backend), batch_size=8)
+
+    assert report[backend]["max_cosine_gap"] <= PARITY_TOLERANCE[backend]
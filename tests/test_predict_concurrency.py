@@ -0,0 +1,140 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("fitz")
+httpx = pytest.importorskip("httpx")
+
+from benchmarks.corpus import render_pdf, resume_text
+
+# Synthetic resume domain -> label id in data/label_mapping.txt
+DOMAIN_LABELS = {"technology": 20, "hr": 12, "healthcare": 14}
+
+# Blocking time added to every classification
+SLOW_SECONDS = 0.2
+CONCURRENT_REQUESTS = 16
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    """backend.app serving a tiny classifier trained on synthetic resumes"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from models.classifier_artifacts import save_classifier
+    import backend.app as api
+
+    rng = random.Random(0)
+    texts, labels = [], []
+    for domain, label in DOMAIN_LABELS.items():
+        for _ in range(10):
+            texts.append(resume_text(rng, domain, 200))
+            labels.append(label)
+    vectorizer = TfidfVectorizer(stop_words="english")
+    model = LogisticRegression(max_iter=1000).fit(vectorizer.fit_transform(texts), labels)
+    directory = tmp_path_factory.mktemp("classifier") / "resume_classifier"
+    save_classifier(str(directory), model, vectorizer)
+
+    original_dir = api.classifier_dir
+    api.classifier_dir = str(directory)
+    api.classifier.reset()
+    yield api
+    api.classifier_dir = original_dir
+    api.classifier.reset()
+
+
+def make_uploads(count, seed=1):
+    rng = random.Random(seed)
+    domains = list(DOMAIN_LABELS)
+    uploads = []
+    for i in range(count):
+        domain = domains[i % len(domains)]
+        uploads.append((f"resume_{i}_{domain}.pdf", render_pdf(resume_text(rng, domain, 200)), DOMAIN_LABELS[domain]))
+    return uploads
+
+
+async def post_concurrently(app, uploads):
+    """Send every upload at once while a heartbeat measures event-loop stalls"""
+    lags = []
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        beat = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post("/predict/", files={"file": (name, pdf, "application/pdf")})
+            for name, pdf, _ in uploads
+        ))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await beat
+    return responses, elapsed, max(lags)
+
+
+def test_concurrent_predictions_get_their_own_label(api):
+    uploads = make_uploads(CONCURRENT_REQUESTS)
+    responses, _, _ = asyncio.run(post_concurrently(api.app, uploads))
+
+    for response, (name, _, label) in zip(responses, uploads):
+        assert response.status_code == 200, name
+        assert response.json()["predicted_label"] == api.label_map[label], name
+
+
+def test_slow_classification_does_not_block_the_event_loop(api, monkeypatch):
+    original = api.classify_pdf
+
+    def slow_classify(pdf_bytes):
+        time.sleep(SLOW_SECONDS)  # blocking work, like a long PDF
+        return original(pdf_bytes)
+
+    monkeypatch.setattr(api, "classify_pdf", slow_classify)
+    uploads = make_uploads(CONCURRENT_REQUESTS)
+    responses, elapsed, max_lag = asyncio.run(post_concurrently(api.app, uploads))
+
+    assert all(response.status_code == 200 for response in responses)
+    # On the event loop, every request would stall the heartbeat for SLOW_SECONDS
+    assert max_lag < SLOW_SECONDS
+    if api.PREDICT_WORKERS > 1:
+        assert elapsed < CONCURRENT_REQUESTS * SLOW_SECONDS
+
+
+def test_app_serves_again_after_a_shutdown(api, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(api.embedding_model, "warmup", lambda: None)
+    name, pdf, label = make_uploads(1)[0]
+    # Each block runs startup and shutdown; the second must get fresh pools
+    for _ in range(2):
+        with TestClient(api.app) as client:
+            response = client.post("/predict/", files={"file": (name, pdf, "application/pdf")})
+            assert response.status_code == 200
+            assert response.json()["predicted_label"] == api.label_map[label]
+
+
+def test_batch_reports_unreadable_files_and_labels_the_rest(api):
+    from fastapi.testclient import TestClient
+
+    uploads = make_uploads(3)
+    files = [("files", (name, pdf, "application/pdf")) for name, pdf, _ in uploads]
+    files.insert(1, ("files", ("corrupt.pdf", b"%PDF-1.4 not really a pdf", "application/pdf")))
+
+    with TestClient(api.app) as client:
+        response = client.post("/predict/batch/", files=files)
+    assert response.status_code == 200
+    results = response.json()["results"]
+
+    assert [result["filename"] for result in results] == [
+        uploads[0][0], "corrupt.pdf", uploads[1][0], uploads[2][0]]
+    assert "error" in results[1] and "predicted_label" not in results[1]
+    for result, (_, _, label) in zip(results[:1] + results[2:], uploads):
+        assert "error" not in result
+        assert result["predicted_label"] == api.label_map[label]
@@ -0,0 +1,93 @@
+import backend.prediction_history as prediction_history
+from backend.prediction_history import HistorySync, apply_filters, make_filters
+
+ROWS = [
+    {"id": 1, "predicted_label": "HR", "user_email": "a@example.com", "created_at": "2026-01-01T10:00:00"},
+    {"id": 2, "predicted_label": "Python Developer", "user_email": "b@example.com", "created_at": "2026-01-02T10:00:00"},
+]
+
+STATS = {"total": 99, "role_counts": {"HR": 99}, "user_counts": {"a@example.com": 99},
+         "daily_counts": {}, "first_at": None, "last_at": None, "max_id": 99}
+
+
+class RpcError(Exception):
+    """Shaped like postgrest's APIError: the error dict is the first argument"""
+
+    def __init__(self, code):
+        super().__init__({"code": code, "message": "rpc failed"})
+        self.code = code
+
+
+class FakeQuery:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, args))
+            return self
+        return record
+
+    def execute(self):
+        self.client.queries.append(self.calls)
+        rows = ROWS
+        for name, args in self.calls:
+            if name == "gt":
+                rows = [row for row in rows if row["id"] > args[1]]
+        return type("Response", (), {"data": rows})()
+
+
+class FakeClient:
+    """Table queries return ROWS; the stats RPC returns the next of ``stats_outcomes``.
+
+    The filtered summary function is never installed.
+    """
+
+    def __init__(self, stats_outcomes):
+        self.stats_outcomes = list(stats_outcomes)
+        self.rpc_calls = []
+        self.queries = []
+
+    def table(self, name):
+        return FakeQuery(self)
+
+    def rpc(self, name, params):
+        self.rpc_calls.append(name)
+        outcome = RpcError("PGRST202")
+        if name == prediction_history.STATS_FUNCTION and self.stats_outcomes:
+            outcome = self.stats_outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return type("Call", (), {"execute": lambda _: type("Response", (), {"data": outcome})()})()
+
+
+def stats_calls(client):
+    return client.rpc_calls.count(prediction_history.STATS_FUNCTION)
+
+
+def test_transient_stats_error_falls_back_then_retries():
+    client = FakeClient([ConnectionError("network down"), STATS])
+    history = HistorySync(client)
+
+    assert history.summary()["total"] == len(ROWS)
+    # Within the retry delay the scan is used without asking again
+    history.summary()
+    assert stats_calls(client) == 1
+
+    history._stats_retry_at = 0.0  # the delay has passed
+    assert history.summary()["total"] == 99
+
+
+def test_missing_stats_function_disables_the_tables():
+    client = FakeClient([RpcError("PGRST202")])
+    history = HistorySync(client)
+
+    assert history.summary()["total"] == len(ROWS)
+    history.summary()
+    assert stats_calls(client) == 1
+
+
+def test_search_wildcards_match_literally():
+    query = apply_filters(FakeQuery(FakeClient([])), make_filters(search=r"50%_off\draft"))
+    assert ("ilike", ("filename", r"%50\%\_off\\draft%")) in query.calls
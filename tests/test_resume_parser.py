@@ -0,0 +1,25 @@
+import random
+
+import pytest
+
+pytest.importorskip("fitz")
+
+from backend.resume_parser import clean_text, parse_resume_bytes
+from benchmarks.corpus import render_pdf, resume_text
+from utils.metrics import STAGE_SECONDS
+
+
+def stage_counts():
+    return {name: total for (name,), (_, total, _) in STAGE_SECONDS.snapshot().items()}
+
+
+def test_each_stage_is_recorded_once_per_resume():
+    pdf = render_pdf(resume_text(random.Random(0), "technology", 200))
+    before = stage_counts()
+
+    text, _ = parse_resume_bytes(pdf)
+    clean_text(text)
+
+    after = stage_counts()
+    recorded = {name: count - before.get(name, 0) for name, count in after.items() if count != before.get(name, 0)}
+    assert recorded == {"pdf_extraction": 1, "markup_stripping": 1, "skill_matching": 1, "text_cleaning": 1}
@@ -0,0 +1,211 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import backend.write_behind as write_behind
+from backend.write_behind import MAX_REPLAY_ATTEMPTS, WriteBehindQueue
+
+
+class FakeClient:
+    """Stands in for the Supabase client; rows with "bad" set are always rejected"""
+
+    def __init__(self, delay=0.0):
+        self.rows = []
+        self.down = False
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def table(self, name):
+        return self
+
+    def insert(self, rows):
+        self._pending = list(rows)
+        return self
+
+    def execute(self):
+        rows = self._pending
+        time.sleep(self.delay)
+        if self.down or any(row.get("bad") for row in rows):
+            raise ConnectionError("insert failed")
+        with self._lock:
+            self.rows.extend(rows)
+
+
+def make_queue(client, tmp_path, **kwargs):
+    options = dict(batch_size=2, flush_interval=0.05, max_retries=0, backoff=0,
+                   journal_path=str(tmp_path / "journal.jsonl"))
+    options.update(kwargs)
+    return WriteBehindQueue(client, "resumes", **options)
+
+
+def write_journal(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(line + "\n" for line in lines))
+
+
+def test_rows_journaled_while_down_are_replayed(tmp_path):
+    client = FakeClient()
+    writer = make_queue(client, tmp_path)
+    client.down = True
+    for i in range(3):
+        writer.put({"id": i})
+    writer.flush()
+    assert client.rows == []
+    assert writer.stats()["journaled"] == 3
+
+    client.down = False
+    writer.put({"id": 3})
+    writer.flush()
+    assert sorted(row["id"] for row in client.rows) == [0, 1, 2, 3]
+    assert not os.path.exists(writer.journal_path)
+    assert not os.path.exists(writer.journal_path + ".replay")
+    writer.close()
+
+
+def test_undecodable_lines_are_skipped(tmp_path):
+    client = FakeClient()
+    writer = make_queue(client, tmp_path)
+    write_journal(writer.journal_path, [
+        json.dumps({"id": 1}),  # bare row, as older versions journaled them
+        "not json",
+        json.dumps({"attempts": 1, "row": {"id": 2}}),
+        '{"attempts": 0, "row": {"id": 3',  # cut short by a crash
+    ])
+
+    writer._replay_journal()
+    assert [row["id"] for row in client.rows] == [1, 2]
+    assert not os.path.exists(writer.journal_path + ".replay")
+
+
+def test_interrupted_replay_resumes_after_the_written_rows(tmp_path):
+    client = FakeClient()
+    writer = make_queue(client, tmp_path)
+    replay_path = writer.journal_path + ".replay"
+    write_journal(replay_path, [json.dumps({"attempts": 0, "row": {"id": i}}) for i in range(5)])
+    with open(replay_path + ".done", "w") as f:
+        f.write("2")
+
+    writer._replay_journal()
+    assert [row["id"] for row in client.rows] == [2, 3, 4]
+    assert not os.path.exists(replay_path)
+    assert not os.path.exists(replay_path + ".done")
+
+
+def test_failed_replay_keeps_the_rows(tmp_path):
+    client = FakeClient()
+    writer = make_queue(client, tmp_path)
+    write_journal(writer.journal_path, [json.dumps({"id": i}) for i in range(3)])
+
+    client.down = True
+    writer._replay_journal()
+    client.down = False
+    writer._replay_journal()
+    assert sorted(row["id"] for row in client.rows) == [0, 1, 2]
+
+
+def test_rejected_row_goes_to_dead_letter(tmp_path):
+    client = FakeClient()
+    writer = make_queue(client, tmp_path, batch_size=1)
+    write_journal(writer.journal_path, [json.dumps({"id": 0, "bad": True}), json.dumps({"id": 1})])
+
+    # Rows behind the rejected one wait until it has been moved aside
+    for _ in range(MAX_REPLAY_ATTEMPTS + 1):
+        writer._replay_journal()
+    assert [row["id"] for row in client.rows] == [1]
+    assert not os.path.exists(writer.journal_path)
+    with open(writer.journal_path + ".dead", encoding="utf-8") as f:
+        dead = [json.loads(line) for line in f]
+    assert dead == [{"attempts": MAX_REPLAY_ATTEMPTS, "row": {"id": 0, "bad": True}}]
+    assert writer.stats()["dead_lettered"] == 1
+
+
+def test_concurrent_replays_write_each_row_once(tmp_path):
+    client = FakeClient(delay=0.05)
+    writers = [make_queue(client, tmp_path) for _ in range(4)]
+    write_journal(writers[0].journal_path, [json.dumps({"id": i}) for i in range(10)])
+
+    threads = [threading.Thread(target=writer._replay_journal) for writer in writers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(row["id"] for row in client.rows) == list(range(10))
+
+
+def test_writer_survives_a_failed_flush(tmp_path, monkeypatch):
+    client = FakeClient()
+    writer = make_queue(client, tmp_path)
+    client.down = True
+
+    def broken_journal(rows):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(writer, "_journal", broken_journal)
+    writer.put({"id": 0})
+    writer.flush()
+    thread = writer._thread
+    assert thread.is_alive()
+
+    client.down = False
+    writer.put({"id": 1})
+    writer.flush()
+    assert writer._thread is thread
+    assert [row["id"] for row in client.rows] == [1]
+    writer.close()
+
+
+def test_restart_keeps_queued_rows(tmp_path):
+    client = FakeClient()
+    writer = make_queue(client, tmp_path)
+    writer.put({"id": 0})
+    writer.flush()
+    writer._stop.set()
+    writer._queue.put(threading.Event())
+    writer._thread.join(5)
+    # A row the writer never picked up before its thread went away
+    original = writer._queue
+    original.put_nowait({"id": 1})
+
+    writer.put({"id": 2})
+    assert writer._queue is original
+    writer.close()
+    assert sorted(row["id"] for row in client.rows) == [0, 1, 2]
+
+
+def test_process_journals_of_exited_workers_are_replayed(tmp_path):
+    client = FakeClient()
+    writer = make_queue(client, tmp_path)
+    writer.journal_per_process()
+    assert writer.journal_path == str(tmp_path / f"journal.{os.getpid()}.jsonl")
+
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    write_journal(writer.shared_journal_path, [json.dumps({"id": 0})])
+    write_journal(str(tmp_path / f"journal.{exited.pid}.jsonl"), [json.dumps({"id": 1})])
+    live_journal = str(tmp_path / f"journal.{os.getppid()}.jsonl")
+    write_journal(live_journal, [json.dumps({"id": 2})])
+
+    writer.put({"id": 3})
+    writer.flush()
+    assert sorted(row["id"] for row in client.rows) == [0, 1, 3]
+    # Another running process still owns its journal
+    assert os.path.exists(live_journal)
+    writer.close()
+
+
+@pytest.mark.skipif(write_behind.fcntl is None, reason="needs fcntl")
+def test_replay_is_skipped_while_another_process_holds_it(tmp_path):
+    client = FakeClient()
+    writer = make_queue(client, tmp_path)
+    write_journal(writer.journal_path, [json.dumps({"id": 0})])
+
+    with write_behind._file_lock(writer.journal_path + ".replay.lock"):
+        writer._replay_journal()
+    assert client.rows == []
+    writer._replay_journal()
+    assert [row["id"] for row in client.rows] == [0]
@@ -1,15 +1,109 @@
 # Smart Resume Analysis System
 # No external API dependencies - fast, reliable, and personalized
 
+from utils.keyword_engine import KeywordMatcher
+from utils.metrics import timed
+
+# Keyword lists used by the suggestion engine, grouped by what they detect
+SUGGESTION_KEYWORDS = {
+    'project': ['project', 'built', 'developed', 'created', 'implemented'],
+    'leadership': ['led', 'managed', 'coordinated', 'collaborated', 'team'],
+    'certification': ['certified', 'certification', 'certificate'],
+    'action_verbs': ['developed', 'implemented', 'designed', 'optimized', 'managed', 'created'],
+    'full_stack': ['full stack', 'fullstack'],
+    'senior': ['senior', 'lead'],
+    'startup': ['startup', 'fast-paced'],
+    'remote': ['remote'],
+    'skills': [
+        'Python', 'JavaScript', 'Java', 'React', 'Node.js', 'Express.js', 
+        'MongoDB', 'MySQL', 'PostgreSQL', 'AWS', 'Docker', 'Git', 'HTML', 
+        'CSS', 'TypeScript', 'Angular', 'Vue.js', 'Django', 'Flask', 'REST API',
+        'GraphQL', 'Kubernetes', 'Jenkins', 'Azure', 'GCP', 'Redis', 'Postman'
+    ],
+    # Common important job keywords
+    'important': [
+        'experience', 'development', 'software', 'application', 'system',
+        'design', 'implementation', 'testing', 'deployment', 'maintenance',
+        'collaboration', 'agile', 'scrum', 'problem-solving', 'optimization',
+        'scalable', 'performance', 'security', 'architecture', 'integration'
+    ]
+}
+
+# Comprehensive skill categories covering multiple domains
+ALL_SKILLS = {
+    # Technology Skills
+    "tech": [
+        "Python", "JavaScript", "Java", "TypeScript", "C++", "C#", "PHP", "Ruby",
+        "React", "Angular", "Vue.js", "HTML", "CSS", "Bootstrap", "Tailwind",
+        "Node.js", "Express.js", "Django", "Flask", "Spring", "Laravel",
+        "MySQL", "PostgreSQL", "MongoDB", "Redis", "SQLite",
+        "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Git", "GitHub",
+        "REST API", "GraphQL", "Postman", "Jenkins", "CI/CD"
+    ],
+    
+    # Business & Commerce Skills
+    "business": [
+        "Sales", "Marketing", "Business Development", "Account Management",
+        "Customer Service", "CRM", "Lead Generation", "Negotiation",
+        "Market Research", "Business Analysis", "Project Management",
+        "Excel", "PowerBI", "Tableau", "Analytics", "Reporting",
+        "E-commerce", "Digital Marketing", "SEO", "SEM", "Social Media",
+        "Content Marketing", "Email Marketing", "Brand Management"
+    ],
+    
+    # Finance & Accounting Skills
+    "finance": [
+        "Accounting", "Financial Analysis", "Budgeting", "Forecasting",
+        "Tax Preparation", "Audit", "Compliance", "Risk Management",
+        "Investment Analysis", "Portfolio Management", "Banking",
+        "QuickBooks", "SAP", "Oracle", "Financial Modeling"
+    ],
+    
+    # HR & Management Skills
+    "hr": [
+        "Human Resources", "Recruitment", "Talent Acquisition", "Hiring",
+        "Employee Relations", "Performance Management", "Training",
+        "Onboarding", "Payroll", "Benefits Administration", "HR Policies",
+        "Leadership", "Team Management", "Coaching", "Mentoring"
+    ],
+    
+    # Design & Creative Skills
+    "design": [
+        "Graphic Design", "UI/UX Design", "Web Design", "Photoshop",
+        "Illustrator", "Figma", "Sketch", "InDesign", "After Effects",
+        "Branding", "Typography", "Color Theory", "Wireframing", "Prototyping"
+    ]
+}
+
+# Common requirement patterns for jobs without specific skills
+REQUIREMENT_KEYWORDS = {
+    'experience': ['experience'],
+    'sales': ['sales', 'selling', 'revenue'],
+    'marketing': ['marketing', 'promotion', 'campaign'],
+    'management': ['management', 'leadership', 'team'],
+    'customer': ['customer', 'client', 'service'],
+    'education': ['degree', 'bachelor', 'master', 'education'],
+    'communication': ['communication', 'presentation', 'writing'],
+    'analytical': ['analysis', 'analytical', 'data', 'report'],
+    'computer': ['software', 'computer', 'microsoft', 'excel']
+}
+
+# Compiled once at import; each document is then scanned in a single pass
+suggestion_matcher = KeywordMatcher(SUGGESTION_KEYWORDS)
+skill_gap_matcher = KeywordMatcher(ALL_SKILLS)
+requirement_matcher = KeywordMatcher(REQUIREMENT_KEYWORDS)
+
 def get_resume_suggestions(resume_text, job_text, api_key=None):
     """Get intelligent resume suggestions using smart rule-based analysis"""
     return generate_smart_suggestions(resume_text, job_text)
 
+@timed("suggestions")
 def generate_smart_suggestions(resume_text, job_text):
     """Generate intelligent suggestions by analyzing resume vs job description"""
     
-    resume_lower = resume_text.lower()
-    job_lower = job_text.lower()
+    # Scan each document once for every keyword list used below
+    resume_hits = suggestion_matcher.find_by_category(resume_text)
+    job_hits = suggestion_matcher.find_by_category(job_text)
     
     suggestions = []
     
@@ -22,14 +116,12 @@ def generate_smart_suggestions(resume_text, job_text):
         suggestions.append("• **Add quantifiable achievements**: Include specific numbers, percentages, and metrics (e.g., 'Improved performance by 25%', 'Managed team of 5 developers')")
     
     # Check for project mentions
-    project_keywords = ['project', 'built', 'developed', 'created', 'implemented']
-    project_mentions = sum(1 for keyword in project_keywords if keyword in resume_lower)
+    project_mentions = len(resume_hits.get('project', []))
     if project_mentions < 3:
         suggestions.append("• **Highlight more projects**: Add 2-3 relevant projects that demonstrate your technical skills")
     
     # Check for leadership/teamwork
-    leadership_keywords = ['led', 'managed', 'coordinated', 'collaborated', 'team']
-    leadership_mentions = sum(1 for keyword in leadership_keywords if keyword in resume_lower)
+    leadership_mentions = len(resume_hits.get('leadership', []))
     if leadership_mentions < 2:
         suggestions.append("• **Emphasize teamwork**: Include examples of collaboration, leadership, or team projects")
     
@@ -37,16 +129,15 @@ def generate_smart_suggestions(resume_text, job_text):
     suggestions.append("\n## 🛠️ Skills Enhancement")
     
     # Find job-required skills missing from resume
-    job_skills = extract_skills_from_text(job_text)
-    resume_skills = extract_skills_from_text(resume_text)
+    job_skills = job_hits.get('skills', [])
+    resume_skills = resume_hits.get('skills', [])
     missing_skills = [skill for skill in job_skills if skill not in [rs.lower() for rs in resume_skills]]
     
     if missing_skills:
         suggestions.append(f"• **Learn these in-demand skills**: {', '.join(missing_skills[:5])}")
     
     # Check for certifications
-    cert_keywords = ['certified', 'certification', 'certificate']
-    has_certs = any(keyword in resume_lower for keyword in cert_keywords)
+    has_certs = bool(resume_hits.get('certification'))
     if not has_certs:
         suggestions.append("• **Add relevant certifications**: Consider getting certified in technologies mentioned in the job description")
     
@@ -54,15 +145,15 @@ def generate_smart_suggestions(resume_text, job_text):
     suggestions.append("\n## 🔍 Keywords & ATS Optimization")
     
     # Find important job keywords missing from resume
-    important_job_words = extract_important_keywords(job_text)
-    missing_keywords = [word for word in important_job_words if word.lower() not in resume_lower]
+    important_job_words = [keyword.title() for keyword in job_hits.get('important', [])][:8]
+    resume_important = set(resume_hits.get('important', []))
+    missing_keywords = [word for word in important_job_words if word.lower() not in resume_important]
     
     if missing_keywords:
         suggestions.append(f"• **Include these job keywords**: {', '.join(missing_keywords[:6])}")
     
     # Check for action verbs
-    action_verbs = ['developed', 'implemented', 'designed', 'optimized', 'managed', 'created']
-    action_verb_count = sum(1 for verb in action_verbs if verb in resume_lower)
+    action_verb_count = len(resume_hits.get('action_verbs', []))
     if action_verb_count < 4:
         suggestions.append("• **Use more action verbs**: Start bullet points with strong verbs like 'Developed', 'Implemented', 'Optimized'")
     
@@ -85,16 +176,16 @@ def generate_smart_suggestions(resume_text, job_text):
     suggestions.append("\n## 🎯 Specific Recommendations for This Role")
     
     # Role-specific suggestions based on job description
-    if 'full stack' in job_lower or 'fullstack' in job_lower:
+    if job_hits.get('full_stack'):
         suggestions.append("• **Highlight full-stack projects**: Showcase projects that demonstrate both frontend and backend skills")
     
-    if 'senior' in job_lower or 'lead' in job_lower:
+    if job_hits.get('senior'):
         suggestions.append("• **Emphasize leadership**: Add examples of mentoring, code reviews, or technical decision-making")
     
-    if 'startup' in job_lower or 'fast-paced' in job_lower:
+    if job_hits.get('startup'):
         suggestions.append("• **Show adaptability**: Highlight experience with rapid development, multiple technologies, or wearing multiple hats")
     
-    if 'remote' in job_lower:
+    if job_hits.get('remote'):
         suggestions.append("• **Mention remote experience**: If you have remote work experience, highlight your self-management and communication skills")
     
     # 6. FINAL TIPS
@@ -108,96 +199,26 @@ def generate_smart_suggestions(resume_text, job_text):
 
 def extract_skills_from_text(text):
     """Extract technical skills from text"""
-    skills = [
-        'Python', 'JavaScript', 'Java', 'React', 'Node.js', 'Express.js', 
-        'MongoDB', 'MySQL', 'PostgreSQL', 'AWS', 'Docker', 'Git', 'HTML', 
-        'CSS', 'TypeScript', 'Angular', 'Vue.js', 'Django', 'Flask', 'REST API',
-        'GraphQL', 'Kubernetes', 'Jenkins', 'Azure', 'GCP', 'Redis', 'Postman'
-    ]
-    
-    found_skills = []
-    text_lower = text.lower()
-    for skill in skills:
-        if skill.lower() in text_lower:
-            found_skills.append(skill)
-    
-    return found_skills
+    return suggestion_matcher.find_by_category(text).get('skills', [])
 
 def extract_important_keywords(job_text):
     """Extract important keywords from job description"""
-    # Common important job keywords
-    keywords = [
-        'experience', 'development', 'software', 'application', 'system',
-        'design', 'implementation', 'testing', 'deployment', 'maintenance',
-        'collaboration', 'agile', 'scrum', 'problem-solving', 'optimization',
-        'scalable', 'performance', 'security', 'architecture', 'integration'
-    ]
+    found_keywords = suggestion_matcher.find_by_category(job_text).get('important', [])
     
-    found_keywords = []
-    job_lower = job_text.lower()
-    for keyword in keywords:
-        if keyword in job_lower:
-            found_keywords.append(keyword.title())
-    
-    return found_keywords[:8]  # Return top 8 most relevant
+    return [keyword.title() for keyword in found_keywords][:8]  # Return top 8 most relevant
 
+@timed("skill_gap_analysis")
 def analyze_skill_gaps(resume_skills, job_text):
     """Analyze skill gaps between resume and job requirements"""
-    # Comprehensive skill categories covering multiple domains
-    all_skills = {
-        # Technology Skills
-        "tech": [
-            "Python", "JavaScript", "Java", "TypeScript", "C++", "C#", "PHP", "Ruby",
-            "React", "Angular", "Vue.js", "HTML", "CSS", "Bootstrap", "Tailwind",
-            "Node.js", "Express.js", "Django", "Flask", "Spring", "Laravel",
-            "MySQL", "PostgreSQL", "MongoDB", "Redis", "SQLite",
-            "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Git", "GitHub",
-            "REST API", "GraphQL", "Postman", "Jenkins", "CI/CD"
-        ],
-        
-        # Business & Commerce Skills
-        "business": [
-            "Sales", "Marketing", "Business Development", "Account Management",
-            "Customer Service", "CRM", "Lead Generation", "Negotiation",
-            "Market Research", "Business Analysis", "Project Management",
-            "Excel", "PowerBI", "Tableau", "Analytics", "Reporting",
-            "E-commerce", "Digital Marketing", "SEO", "SEM", "Social Media",
-            "Content Marketing", "Email Marketing", "Brand Management"
-        ],
-        
-        # Finance & Accounting Skills
-        "finance": [
-            "Accounting", "Financial Analysis", "Budgeting", "Forecasting",
-            "Tax Preparation", "Audit", "Compliance", "Risk Management",
-            "Investment Analysis", "Portfolio Management", "Banking",
-            "QuickBooks", "SAP", "Oracle", "Financial Modeling"
-        ],
-        
-        # HR & Management Skills
-        "hr": [
-            "Human Resources", "Recruitment", "Talent Acquisition", "Hiring",
-            "Employee Relations", "Performance Management", "Training",
-            "Onboarding", "Payroll", "Benefits Administration", "HR Policies",
-            "Leadership", "Team Management", "Coaching", "Mentoring"
-        ],
-        
-        # Design & Creative Skills
-        "design": [
-            "Graphic Design", "UI/UX Design", "Web Design", "Photoshop",
-            "Illustrator", "Figma", "Sketch", "InDesign", "After Effects",
-            "Branding", "Typography", "Color Theory", "Wireframing", "Prototyping"
-        ]
-    }
-    
-    job_text_lower = job_text.lower()
-    resume_skills_lower = [skill.lower() for skill in resume_skills]
-    
+    return compare_skills(resume_skills, extract_required_skills(job_text))
+
+def extract_required_skills(job_text):
+    """Skills a job description asks for, most important first"""
     # Find all skills mentioned in job description across all categories
+    job_hits = skill_gap_matcher.find_by_category(job_text)
     job_required_skills = []
-    for category, skills in all_skills.items():
-        for skill in skills:
-            if skill.lower() in job_text_lower:
-                job_required_skills.append(skill)
+    for category in ALL_SKILLS:
+        job_required_skills.extend(job_hits.get(category, []))
     
     # Remove duplicates and limit to top 10 most important
     job_required_skills = list(dict.fromkeys(job_required_skills))[:10]
@@ -208,6 +229,12 @@ def analyze_skill_gaps(resume_skills, job_text):
         general_requirements = extract_general_requirements(job_text)
         job_required_skills = general_requirements[:5]
     
+    return job_required_skills
+
+def compare_skills(resume_skills, job_required_skills):
+    """Split a job's required skills into the ones a resume has and lacks"""
+    resume_skills_lower = [skill.lower() for skill in resume_skills]
+    
     # Find missing skills
     missing_skills = []
     for skill in job_required_skills:
@@ -232,36 +259,36 @@ def analyze_skill_gaps(resume_skills, job_text):
 
 def extract_general_requirements(job_text):
     """Extract general requirements when specific skills aren't found"""
-    job_lower = job_text.lower()
+    job_hits = requirement_matcher.count(job_text)
     
     # Common requirement patterns
     general_requirements = []
     
     # Look for experience requirements
-    if 'experience' in job_lower:
-        if any(word in job_lower for word in ['sales', 'selling', 'revenue']):
+    if job_hits.get('experience'):
+        if job_hits.get('sales'):
             general_requirements.append("Sales Experience")
-        if any(word in job_lower for word in ['marketing', 'promotion', 'campaign']):
+        if job_hits.get('marketing'):
             general_requirements.append("Marketing Experience")
-        if any(word in job_lower for word in ['management', 'leadership', 'team']):
+        if job_hits.get('management'):
             general_requirements.append("Management Experience")
-        if any(word in job_lower for word in ['customer', 'client', 'service']):
+        if job_hits.get('customer'):
             general_requirements.append("Customer Service")
     
     # Look for education requirements
-    if any(word in job_lower for word in ['degree', 'bachelor', 'master', 'education']):
+    if job_hits.get('education'):
         general_requirements.append("Relevant Degree")
     
     # Look for communication requirements
-    if any(word in job_lower for word in ['communication', 'presentation', 'writing']):
+    if job_hits.get('communication'):
         general_requirements.append("Communication Skills")
     
     # Look for analytical requirements
-    if any(word in job_lower for word in ['analysis', 'analytical', 'data', 'report']):
+    if job_hits.get('analytical'):
         general_requirements.append("Analytical Skills")
     
     # Look for software requirements
-    if any(word in job_lower for word in ['software', 'computer', 'microsoft', 'excel']):
+    if job_hits.get('computer'):
         general_requirements.append("Computer Skills")
     
-    return general_requirements if general_requirements else ["Domain Knowledge", "Professional Experience"]
\ No newline at end of file
+    return general_requirements if general_requirements else ["Domain Knowledge", "Professional Experience"]
@@ -0,0 +1,181 @@
+# Multi-keyword matcher shared by the classifier, domain matcher and suggestions
+# Builds one Aho-Corasick automaton per taxonomy so a document is scanned once,
+# no matter how many keywords the taxonomy holds.
+
+from collections import deque
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """Find every keyword of a categorized taxonomy in a single pass over text.
+
+    ``categories`` maps a category name to its keywords. Matching is
+    case-insensitive. With ``whole_words=True`` a keyword only matches when it
+    is not glued to surrounding letters or digits (like regex ``\\b`` on the
+    keyword's alphanumeric edges); otherwise it behaves like ``keyword in text``.
+    """
+
+    def __init__(self, categories, whole_words=False):
+        self.whole_words = whole_words
+        self.categories = list(categories)
+        self.keywords = []          # original spelling, indexed by keyword id
+        self.categories_of = []     # (category, position, spelling) per keyword id
+        self._ids = {}              # lowercased keyword -> keyword id
+
+        for category, keywords in categories.items():
+            seen = set()
+            for position, keyword in enumerate(keywords):
+                key = keyword.lower()
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                if key not in self._ids:
+                    self._ids[key] = len(self.keywords)
+                    self.keywords.append(keyword)
+                    self.categories_of.append([])
+                self.categories_of[self._ids[key]].append((category, position, keyword))
+
+        self._lengths = [len(keyword) for keyword in self.keywords]
+        self._edges = [
+            (_is_word_char(keyword[0]), _is_word_char(keyword[-1]))
+            for keyword in self.keywords
+        ]
+        self._category_matrix = None
+        self._build()
+
+    def _build(self):
+        goto = [{}]
+        out = [[]]
+        for key, kid in self._ids.items():
+            state = 0
+            for ch in key:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(kid)
+
+        # Breadth-first pass to wire failure links and merge their outputs
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(o) for o in out]
+
+    def iter_matches(self, text):
+        """Yield (start, end, keyword) for every occurrence, overlapping included.
+
+        Offsets refer to ``text.lower()``, which equals ``text`` in length for
+        ASCII input.
+        """
+        for start, end, kid in self._scan(text.lower()):
+            yield start, end, self.keywords[kid]
+
+    def iter_category_matches(self, text):
+        """Yield (start, end, category) for every occurrence of a category's keyword"""
+        for start, end, kid in self._scan(text.lower()):
+            for category, _, _ in self.categories_of[kid]:
+                yield start, end, category
+
+    def matched_ids(self, text):
+        """Ids of the distinct keywords present in text, in taxonomy order"""
+        return sorted({kid for _, _, kid in self._scan(text.lower())})
+
+    def matched_keywords(self, text):
+        """Distinct keywords present in text, in taxonomy order"""
+        return [self.keywords[kid] for kid in self.matched_ids(text)]
+
+    def count(self, text):
+        """Number of distinct keywords present per category (zero counts omitted)"""
+        counts = {}
+        for kid in self.matched_ids(text):
+            for category, _, _ in self.categories_of[kid]:
+                counts[category] = counts.get(category, 0) + 1
+        return counts
+
+    def presence_matrix(self, texts):
+        """Sparse (documents x keywords) matrix with a 1 for each distinct keyword in each text"""
+        import numpy as np
+        from scipy import sparse
+
+        indptr, indices = [0], []
+        for text in texts:
+            indices.extend(self.matched_ids(text))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.int32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(self.keywords)))
+
+    def category_matrix(self):
+        """Sparse (keywords x categories) membership matrix, columns in ``categories`` order"""
+        if self._category_matrix is None:
+            import numpy as np
+            from scipy import sparse
+
+            column = {category: i for i, category in enumerate(self.categories)}
+            rows, cols = [], []
+            for kid, memberships in enumerate(self.categories_of):
+                for category, _, _ in memberships:
+                    rows.append(kid)
+                    cols.append(column[category])
+            self._category_matrix = sparse.csr_matrix(
+                (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                shape=(len(self.keywords), len(self.categories))
+            )
+        return self._category_matrix
+
+    def count_matrix(self, texts):
+        """count() for many texts as a dense (documents x categories) array.
+
+        One sparse product turns keyword presence into per-category counts;
+        row i holds the same numbers as count(texts[i]), zeros included.
+        """
+        return (self.presence_matrix(texts) @ self.category_matrix()).toarray()
+
+    def find_by_category(self, text):
+        """Keywords present per category, in the order the category lists them"""
+        found = {}
+        for kid in self.matched_ids(text):
+            for category, position, spelling in self.categories_of[kid]:
+                found.setdefault(category, []).append((position, spelling))
+        return {
+            category: [spelling for _, spelling in sorted(hits)]
+            for category, hits in found.items()
+        }
+
+    def _scan(self, text):
+        goto, fail, out = self._goto, self._fail, self._out
+        lengths, edges = self._lengths, self._edges
+        whole_words = self.whole_words
+        size = len(text)
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            for kid in out[state]:
+                start = i - lengths[kid] + 1
+                if whole_words:
+                    left_word, right_word = edges[kid]
+                    if left_word and start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    if right_word and i + 1 < size and _is_word_char(text[i + 1]):
+                        continue
+                yield start, i + 1, kid
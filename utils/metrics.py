@@ -0,0 +1,236 @@
+import bisect
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_text(label_names, values, extra=None):
+    pairs = list(zip(label_names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label set"""
+
+    type = "counter"
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.label_names), 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_label_text(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label set, in Prometheus' layout"""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[slot] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        """{label values: (per-bucket counts incl. +Inf, count, sum)}"""
+        with self._lock:
+            return {key: (series[:-1], sum(series[:-1]), series[-1]) for key, series in self._series.items()}
+
+    def quantile(self, counts, q):
+        """Estimate a quantile from bucket counts as the upper bound of its bucket"""
+        total = sum(counts)
+        if not total:
+            return None
+        rank, seen = q * total, 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            seen += count
+            if seen >= rank:
+                return bound if bound != float("inf") else self.buckets[-1]
+        return self.buckets[-1]
+
+    def render(self):
+        lines = []
+        for key, (counts, total, value_sum) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_label_text(self.label_names, key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.label_names, key)} {_format_value(value_sum)}")
+            lines.append(f"{self.name}_count{_label_text(self.label_names, key)} {total}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide store of counters, histograms and gauge collectors.
+
+    Gauges come from collectors: callables returning
+    ``[(name, documentation, [(labels dict, value), ...]), ...]`` that are
+    read at render time, e.g. to report cache hit rates.
+    """
+
+    def __init__(self, recent_size=200):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self.recent = deque(maxlen=recent_size)  # (stage, seconds, unix time) of the latest stage runs
+
+    def counter(self, name, documentation, label_names=()):
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets)
+
+    def add_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        # Several collectors may report the same gauge with different labels
+        gauges = {}
+        for collector in collectors:
+            try:
+                collected = collector()
+            except Exception:
+                continue
+            for name, documentation, samples in collected:
+                gauges.setdefault(name, (documentation, []))[1].extend(samples)
+        for name, (documentation, samples) in gauges.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                names = tuple(labels)
+                lines.append(f"{name}{_label_text(names, [labels[n] for n in names])} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _get_or_create(self, cls, name, documentation, label_names, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, label_names, *args)
+            return metric
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram("ats_stage_seconds", "Time spent in each processing stage", ["stage"])
+STAGE_ERRORS = registry.counter("ats_stage_errors_total", "Stage runs that raised an exception", ["stage"])
+
+
+def _reset_locks_after_fork():
+    # A lock another thread held at fork time stays held forever in the
+    # child, so a forked worker that records a stage would hang; the child
+    # gets fresh locks instead (its metrics are never scraped anyway)
+    registry._lock = threading.Lock()
+    for metric in registry._metrics.values():
+        metric._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as one run of a named stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        registry.recent.append((name, elapsed, time.time()))
+
+
+def timed(name):
+    """Decorator form of stage()"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def stage_summary():
+    """Per-stage count, total and mean time, and bucket-estimated p50/p95, in ms"""
+    rows = []
+    for (name,), (counts, total, value_sum) in sorted(STAGE_SECONDS.snapshot().items()):
+        rows.append({
+            "stage": name,
+            "count": total,
+            "errors": STAGE_ERRORS.value(stage=name),
+            "total_ms": round(value_sum * 1000, 2),
+            "mean_ms": round(value_sum / total * 1000, 2) if total else 0.0,
+            "p50_ms": round(STAGE_SECONDS.quantile(counts, 0.50) * 1000, 2),
+            "p95_ms": round(STAGE_SECONDS.quantile(counts, 0.95) * 1000, 2),
+        })
+    return rows
+
+
+def cache_collector(name, cache):
+    """Collector reporting a cache's stats() as ats_cache_* gauges"""
+    def collect():
+        if cache is None:
+            return []
+        stats = cache.stats()
+        labels = {"cache": name}
+        return [
+            (f"ats_cache_{field}", f"Cache {field.replace('_', ' ')}", [(labels, stats[field])])
+            for field in ("hits", "misses", "hit_rate", "entries", "bytes")
+            if field in stats
+        ]
+    return collect